@@ -0,0 +1,84 @@
+import numpy as np
+
+from benchmarks import timing
+from lib.tom_model.fis_support_functions import fis_membership_functions as msf
+
+MAX_ERROR = 1e-9        # maximum difference to the memberships computed by skfuzzy
+CASES = [('default', ['low', 'medium', 'high']), ('default', ['a', 'b', 'c', 'd', 'e']),
+         ('binary', ['no', 'yes']), ('binary', ['no', 'maybe', 'yes']),
+         ('neg and pos', [['very negative', 'negative'], ['neutral'], ['positive', 'very positive']]),
+         ('sig and bell', ['a', 'b', 'c', 'd', 'e'])]
+RANGES = [(-1, 1), (0, 1), (0, 10)]
+
+
+def get_memberships_of_skfuzzy(values, terms, value_range, mf_type):
+    """ returns the membership of each value in each term as computed by skfuzzy: the membership functions are built
+    with the skfuzzy functions, and each value is fuzzified as the skfuzzy control system does (clipped to the universe,
+    and interpolated with interp_membership)
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+    terms : list
+    value_range : Tuple[float, float]
+    mf_type : str
+
+    Returns
+    -------
+    numpy.ndarray
+        n terms x number of values
+    """
+    import skfuzzy as fuzz     # skfuzzy is only needed by FIS
+    universe = np.arange(value_range[0], value_range[1], msf.config.STEP)
+    mf_array = msf.create_membership_functions(terms, value_range, mf_type)
+    values = np.clip(values, universe.min(), universe.max())
+    memberships = []
+    for i in range(len(mf_array)):
+        if mf_type == 'binary':
+            mf = fuzz.trapmf(universe, mf_array[i])
+        elif mf_type == 'sig and bell' and i in (0, len(mf_array) - 1):
+            mf = fuzz.sigmf(universe, mf_array[i][0], mf_array[i][1])
+        elif mf_type == 'sig and bell':
+            mf = fuzz.gbellmf(universe, mf_array[i][0], mf_array[i][1], mf_array[i][2])
+        else:
+            mf = fuzz.trimf(universe, mf_array[i])
+        memberships.append(fuzz.interp_membership(universe, mf, values))
+    return np.array(memberships)
+
+
+def run_membership_benchmarks(n_repeats, n_values=1000, seed=0):
+    """ checks that the memberships given by fis_membership_functions.evaluate_memberships are the ones of skfuzzy for
+    each type of membership function, and times both for "n_values" values
+
+    Parameters
+    ----------
+    n_repeats : int
+    n_values : int
+    seed : int
+
+    Returns
+    -------
+    Tuple[Dict[str, Dict[str, Any]], List[str]]
+        statistics of the times, under the name "memberships/<mf type>/<n terms>/<range>", and the cases whose
+        memberships differ from the ones of skfuzzy
+    """
+    results, failures = {}, []
+    random = np.random.default_rng(seed)
+    for mf_type, terms in CASES:
+        for value_range in RANGES:
+            margin = 0.1 * (value_range[1] - value_range[0])        # also values outside the range
+            values = random.uniform(value_range[0] - margin, value_range[1] + margin, n_values)
+            name = 'memberships/{}/{}/{}'.format(mf_type, sum(msf.get_shape_of_terms(terms)), value_range)
+            error = np.abs(msf.evaluate_memberships(values, terms, value_range, mf_type) -
+                           get_memberships_of_skfuzzy(values, terms, value_range, mf_type)).max()
+            results[name] = timing.time_function(lambda: msf.evaluate_memberships(values, terms, value_range, mf_type),
+                                                 n_repeats)
+            results[name]['skfuzzy (ms)'] = timing.time_function(
+                lambda: get_memberships_of_skfuzzy(values, terms, value_range, mf_type), n_repeats)['median (ms)']
+            results[name]['max error'] = float(error)
+            print('{:<70} median: {:10.3f} ms (skfuzzy: {:.3f} ms)'.format(name, results[name]['median (ms)'],
+                                                                          results[name]['skfuzzy (ms)']))
+            if not error <= MAX_ERROR:
+                print('    memberships differ from skfuzzy by ', error)
+                failures.append(name)
+    return results, failures
@@ -0,0 +1,102 @@
+import os
+import sys
+import subprocess
+
+import numpy as np
+
+import path_config
+
+MAX_IMPORT_TIME = 1000      # ms, budget of the import of each entry point
+OPTIONAL_BACKENDS = ('skfuzzy', 'matplotlib', 'tkinter', 'speech_recognition', 'torch', 'whisper', 'pyaudio',
+                     'pyttsx3', 'stockfish', 'chess', 'grpc')
+ENTRY_POINTS = {        # entry point -> optional backends that it uses
+    'main_identification': (),
+    'main_batch_identification': (),
+    'main_closed_loop_simulation': (),
+    'main_policy_table': (),
+    'main_model_artifact': (),
+    'main_benchmarks': (),
+    'main_controller_server': ('grpc', ),
+}
+
+
+def get_imported_modules(module):
+    """ imports "module" in a new interpreter, and returns the time of the import and the modules imported by it
+
+    Parameters
+    ----------
+    module : str
+
+    Returns
+    -------
+    Tuple[float, List[str]]
+        time of the import of "module" (in ms), and modules imported
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (str(path_config.repo_root),
+                                                                    os.environ.get('PYTHONPATH')))))
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module], cwd=path_config.repo_root,
+                            env=env, capture_output=True, text=True, check=True).stderr
+    import_time, modules = None, []
+    for line in output.splitlines():     # "import time: <self [us]> | <cumulative [us]> | <module>"
+        if not line.startswith('import time:') or line.endswith('| imported package'):
+            continue
+        _, cumulative_time, name = line.split('|')
+        modules.append(name.strip())
+        if name.strip() == module:
+            import_time = int(cumulative_time) / 1000
+    return import_time, modules
+
+
+def time_import(module, n_repeats, optional_backends=()):
+    """ times the import of "module" in new interpreters, and checks which optional backends it imports
+
+    Parameters
+    ----------
+    module : str
+    n_repeats : int
+    optional_backends : Tuple[str]
+        optional backends that "module" uses (and so can import)
+
+    Returns
+    -------
+    Dict[str, Any]
+        times in ms, and optional backends imported that "module" does not use
+    """
+    times = []
+    for _ in range(n_repeats):
+        import_time, modules = get_imported_modules(module)
+        times.append(import_time)
+    times = np.array(times)
+    backends = sorted({name.split('.')[0] for name in modules} & set(OPTIONAL_BACKENDS) - set(optional_backends))
+    return {'n repeats': n_repeats, 'n calls': 1, 'mean (ms)': float(times.mean()),
+            'median (ms)': float(np.median(times)), 'p95 (ms)': float(np.percentile(times, 95)),
+            'min (ms)': float(times.min()), 'max (ms)': float(times.max()), 'unused backends imported': backends}
+
+
+def run_import_benchmarks(n_repeats, max_import_time=MAX_IMPORT_TIME):
+    """ times the import of each entry point of ENTRY_POINTS, and checks it against the budget
+
+    Parameters
+    ----------
+    n_repeats : int
+    max_import_time : Union[None, float]
+        budget (in ms) of the median time of the import of each entry point. If None, it is not checked
+
+    Returns
+    -------
+    Tuple[Dict[str, Dict[str, Any]], List[str]]
+        statistics of the times of each import, under the name "imports/<entry point>", and the entry points over the
+        budget or that import optional backends that they do not use
+    """
+    results, failures = {}, []
+    for module, optional_backends in ENTRY_POINTS.items():
+        name = 'imports/' + module
+        results[name] = time_import(module, n_repeats, optional_backends)
+        print('{:<70} median: {:10.3f} ms'.format(name, results[name]['median (ms)']))
+        if len(results[name]['unused backends imported']) > 0:
+            print('    imports unused backends: ', results[name]['unused backends imported'])
+            failures.append(module)
+        elif max_import_time is not None and results[name]['median (ms)'] > max_import_time:
+            print('    import time above the budget of {} ms'.format(max_import_time))
+            failures.append(module)
+    return results, failures
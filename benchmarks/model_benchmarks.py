@@ -0,0 +1,276 @@
+import random
+
+import numpy as np
+
+from benchmarks import synthetic_data, timing
+from experimentNao.behaviour_controllers.mbc import model_based_controller as mbc
+from experimentNao.behaviour_controllers.mbc.aux_functions import get_all_fast_dyn_vars
+from experimentNao.declare_model import chess_interaction_data as ci_data
+from experimentNao.model_ID.cognitive import parameters_manager as pm, set_values_of_variables_cog as set_values_cog
+from experimentNao.model_ID.cognitive.cost_management import Cost
+from experimentNao.model_ID.configs import model_configs
+from lib import excel_files
+from lib.algorithms.genetic_algorithm import settings as ga_set, genetic_algorithm_opt as ga
+from lib.algorithms.genetic_algorithm.select_parents_for_operatorions import ParentSelection
+from lib.algorithms.gradient_descent import settings as gd_set, gradient_descent_opt as gd
+from lib.tom_model.model_elements.linkage import scheduled_weight
+
+
+class ModelBenchmarks:
+    def __init__(self, id_config, folder, seed=0, n_sessions=2, n_puzzles=10, n_steps_per_puzzle=2,
+                 ga_n_solutions=20):
+        """ benchmarks of the hot paths of the ToM model (ticks of the model, cost function, iterations of the
+        optimisers of the identification, action selection of the model-based controller, and loading of the data of
+        the participants) of the model with configuration "id_config", with synthetic participant data and a
+        synthetic identified model
+
+        Parameters
+        ----------
+        id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+        folder : pathlib.Path
+            folder where the synthetic files are written
+        seed : int
+        n_sessions : int
+            number of (synthetic) interactions of the participant
+        n_puzzles : int
+            number of puzzles in each interaction
+        n_steps_per_puzzle : int
+            number of data points collected in each puzzle
+        ga_n_solutions : int
+            number of solutions of each generation of the genetic algorithm
+        """
+        self.id_config = id_config
+        self.random = random.Random(seed)
+        self.n_puzzles = [n_puzzles] * n_sessions
+        self.n_horizon = id_config.n_horizon if id_config.simple_dynamics else 2
+        self.included_variables = model_configs.get_model_configuration(id_config.model_config, id_config.incremental)
+        # Participant data
+        self.tom_model = synthetic_data.declare_model(id_config)
+        self.participant_files = synthetic_data.write_participant_files(folder, self.tom_model, n_sessions, n_puzzles,
+                                                                        n_steps_per_puzzle, self.random)
+        self.vars_2_id, self.hidden_vars = self.tom_model.cognitive_module.get_vars_2_id_and_hidden_vars(
+            self.included_variables)
+        time_steps = self.load_participant_data(self.tom_model)
+        self.train_steps, offset = [], 0
+        for steps_of_session in time_steps:     # the 1st step of each interaction has no previous step
+            self.train_steps += list(range(offset + 1, offset + len(steps_of_session)))
+            offset += len(steps_of_session)
+        rld = self.tom_model.perception_module.perceptual_access.inputs
+        rld.set_current_input_from_sequence(len(rld.sequence_of_inputs) - 1)    # input of the ticks
+        # Identification
+        self.parameters, _, self.vars_w_links_to_id = synthetic_data.get_parameters(self.tom_model, id_config,
+                                                                                    self.random)
+        self.initial_values = [par.value for par in self.parameters]
+        self.parameters_manager = pm.ParametersManager(self.tom_model, self.random, include_slow_dyn=False)
+        self.parameters_manager.set_values_of_parameters(self.parameters, self.vars_w_links_to_id)
+        self.cost = Cost(self.tom_model.cognitive_module.state_vars, self.vars_2_id, self.vars_w_links_to_id,
+                         self.tom_model, self.n_horizon, id_config.simple_dynamics)
+        self.gd_settings = gd_set.Settings(n_iterations=1, initial_learning_rate=0.01, changing_learning_rate=True,
+                                           learning_rate_decay=-0.005, differentiation_step=0.01,
+                                           max_differentiation_step=0.01, verbose=0, boundary_values=(-1, 1),
+                                           multiprocess=False, compute_cost_at_end_of_iteration=True,
+                                           write_to_excel=False)
+        self.ga_settings = ga_set.Settings(n_iterations=1, n_solutions=ga_n_solutions, verbose=0, mutation_range=1.0,
+                                           percentage_crossover=0.25, percentage_mutation=0.25,
+                                           arithmetic_crossover_weight=0.6, n_solutions_in_tournament=4,
+                                           parent_selection_method=ParentSelection.TOURNAMENT)
+        self.ga_solutions = None
+        # Intentions compiled into arrays
+        self.compiled_intentions = self.tom_model.decision_making_module.intention_selector.compile_intentions()
+        self.intention_input_values = np.random.default_rng(seed).uniform(-1, 1, (len(
+            self.compiled_intentions.inputs), 100))
+        # Scheduled weights
+        self.scheduled_weights = [inf.influencer_linkage for var in get_all_fast_dyn_vars(self.tom_model)
+                                  for inf in getattr(var, 'influencers', [])
+                                  if isinstance(inf.influencer_linkage, scheduled_weight.ScheduledWeight)]
+        self.influencer_values = np.random.default_rng(seed).uniform(-1, 1, (len(self.scheduled_weights), 100))
+        # Model-based controller
+        files = synthetic_data.write_identified_model_files(folder, self.tom_model, id_config, self.random)
+        self.controller = mbc.ModelBasedController(id_config, verbose=0, for_interaction=False, files=files)
+        self.controller.initialize_controller(puzzle_difficulty=2, nao_helping=True, nao_offering_reward=False)
+        self.current_rld = ci_data.ChessInteractionData()
+        self.current_rld.fill_data(number_of_hints=1, number_of_wrong_attempts=[1, 2], puzzle_difficulty=2,
+                                   prop_moves_revealed=0.5, time_2_solve=60, nao_helping=True,
+                                   nao_offering_reward=False, reward_given=False, skipped=False)
+        self.controller.model_propagator.update_model_for_action_selection(self.current_rld)
+
+    def get_benchmarks(self):
+        """ returns the benchmarks: for each one, the function timed and the keyword arguments of
+        benchmarks.timing.time_function
+
+        Returns
+        -------
+        Dict[str, Dict[str, Any]]
+        """
+        return {'model tick': {'function': self.tick, 'n_calls': 100},
+                'model tick (sequential update)': {'function': self.tick_sequential, 'n_calls': 100},
+                'intention selection': {'function': self.select_intentions, 'n_calls': 1000},
+                'intention selection (fast)': {'function': self.select_intentions_fast, 'n_calls': 1000},
+                'intention selection (batched)': {'function': self.select_intentions_batched, 'n_calls': 100},
+                'scheduled weights': {'function': self.get_scheduled_weights, 'n_calls': 10},
+                'scheduled weights (batched)': {'function': self.get_scheduled_weights_batched, 'n_calls': 10},
+                'cost function': {'function': self.evaluate_cost},
+                'GD iteration': {'function': self.run_gd_iteration, 'setup': self.reset_parameters},
+                'GA generation': {'function': self.run_ga_generation, 'setup': self.initialize_ga_solutions},
+                'MBC get_next_action': {'function': self.get_next_action},
+                'participant data loading': {'function': self.load_participant_data_from_scratch,
+                                             'setup': excel_files.sheets_cache.clear}}
+
+    def load_participant_data(self, tom_model):
+        """ opens the files of the participant and sets the values of the variables of "tom_model" from them
+
+        Parameters
+        ----------
+        tom_model : Union[experimentNao.declare_model.declare_entire_model.ToMModelChessSimpleDyn, experimentNao.declare_model.declare_entire_model.ToMModelChess]
+
+        Returns
+        -------
+        List[List[float]]
+        """
+        files = [excel_files.get_excel_file(str(path)) for path in self.participant_files]
+        hidden_vars = tom_model.cognitive_module.get_vars_2_id_and_hidden_vars(self.included_variables)[1]
+        return set_values_cog.set_values_of_vars_for_cognitive_module(tom_model, files, self.n_puzzles, hidden_vars,
+                                                                      self.id_config.simple_dynamics,
+                                                                      self.id_config.normalise_rld_mid_steps)
+
+    def load_participant_data_from_scratch(self):
+        """ loads the participant data in a new model
+
+        """
+        self.load_participant_data(synthetic_data.declare_model(self.id_config))
+
+    def tick(self):
+        """ updates the model once (as in the propagation of the model by the controller)
+
+        """
+        self.tom_model.update_entire_model_in_1_go(compute_optimal_action=True)
+
+    def tick_sequential(self):
+        """ updates the model once, computing all the modules before updating them
+
+        """
+        self.tom_model.update_entire_model(compute_optimal_action=True)
+
+    def select_intentions(self):
+        """ selects the intentions of the model by their thresholds
+
+        """
+        self.tom_model.decision_making_module.intention_selector.activate_intentions_by_threshold()
+
+    def select_intentions_fast(self):
+        """ selects the intentions of the model by their thresholds, without checking the inputs of the selector
+
+        """
+        self.tom_model.decision_making_module.intention_selector.activate_intentions_by_threshold_fast()
+
+    def select_intentions_batched(self):
+        """ selects the intentions of the model by their thresholds for a batch of 100 values of the goals and beliefs,
+        all at once
+
+        """
+        self.compiled_intentions.get_active_intentions(self.intention_input_values)
+
+    def get_scheduled_weights(self):
+        """ resolves the active weight of each scheduled weight of the model for a batch of values of its influencer,
+        one by one
+
+        """
+        for sw, values in zip(self.scheduled_weights, self.influencer_values):
+            for value in values:
+                sw.get_weight(value)
+
+    def get_scheduled_weights_batched(self):
+        """ resolves the active weight of each scheduled weight of the model for a batch of values of its influencer,
+        all at once
+
+        """
+        scheduled_weight.get_active_weights(self.scheduled_weights, self.influencer_values)
+
+    def evaluate_cost(self):
+        """ evaluates the cost function of the identification of the cognitive module in all the training steps
+
+        """
+        self.cost.cost_function(self.parameters, self.train_steps, self.parameters_manager)
+
+    def evaluate_cost_of_parameters(self, parameters):
+        """ cost function given to the optimisers
+
+        Parameters
+        ----------
+        parameters : List[lib.algorithms.gradient_descent.parameters2optimise.Parameter2Optimise]
+
+        Returns
+        -------
+        float
+        """
+        return self.cost.cost_function(parameters, self.train_steps, self.parameters_manager)
+
+    def reset_parameters(self):
+        """ resets the values of the parameters being identified to their initial values
+
+        """
+        for par, value in zip(self.parameters, self.initial_values):
+            par.value = value
+
+    def run_gd_iteration(self):
+        """ runs one iteration of the gradient descent of the identification of the cognitive module
+
+        """
+        gd.run_gradient_descent(self.gd_settings, self.parameters, self.evaluate_cost_of_parameters)
+
+    def initialize_ga_solutions(self):
+        """ generates and evaluates the first generation of the genetic algorithm
+
+        """
+        self.reset_parameters()
+        self.ga_solutions = ga.evaluate_solutions(ga.generate_solutions(self.ga_settings.n_solutions, self.parameters),
+                                                  self.parameters, self.evaluate_cost_of_parameters, self.ga_settings)
+
+    def run_ga_generation(self):
+        """ runs one generation of the genetic algorithm (as in lib.algorithms.genetic_algorithm.genetic_algorithm_opt.
+        run_ga) on the parameters of the cognitive module
+
+        """
+        ranked_solutions = ga.rank_solutions(self.ga_solutions)
+        elite_sols, crossover_sols, mutation_sols = ga.apply_evolution_operations(ranked_solutions.copy(),
+                                                                                  self.parameters, self.ga_settings)
+        self.ga_solutions = elite_sols + ga.evaluate_solutions(crossover_sols + mutation_sols, self.parameters,
+                                                               self.evaluate_cost_of_parameters, self.ga_settings)
+
+    def get_next_action(self):
+        """ selects the next action of the model-based controller
+
+        """
+        self.controller.get_next_action(puzzle_counter=1, current_rld=self.current_rld)
+
+
+def run_benchmarks(id_configs, folder, n_repeats, benchmark_names=None, seed=0, **kwargs):
+    """ runs the benchmarks of each configuration of "id_configs"
+
+    Parameters
+    ----------
+    id_configs : List[experimentNao.model_ID.configs.overall_config.IDConfig]
+    folder : pathlib.Path
+    n_repeats : int
+    benchmark_names : Union[None, List[str]]
+        benchmarks that are run (e.g., 'cost function'). If None, all of them are run
+    seed : int
+    kwargs :
+        keyword arguments of ModelBenchmarks
+
+    Returns
+    -------
+    Dict[str, Dict[str, float]]
+        statistics of the times of each benchmark, under the name "<model config>/<dynamics>/<benchmark>"
+    """
+    results = {}
+    for id_config in id_configs:
+        benchmarks = ModelBenchmarks(id_config, folder, seed=seed, **kwargs)
+        dynamics = 'simple dynamics' if id_config.simple_dynamics else 'complex dynamics'
+        for name, benchmark in benchmarks.get_benchmarks().items():
+            if benchmark_names is not None and name not in benchmark_names:
+                continue
+            full_name = '/'.join((id_config.model_config.name, dynamics, name))
+            results[full_name] = timing.time_function(n_repeats=n_repeats, **benchmark)
+            print('{:<70} median: {:10.3f} ms'.format(full_name, results[full_name]['median (ms)']))
+    return results
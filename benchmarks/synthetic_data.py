@@ -0,0 +1,211 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+from experimentNao.data_analysis.pre_process_data import file_names
+from experimentNao.declare_model import declare_entire_model as dem
+from experimentNao.declare_model.chess_interaction_data import ChessInteractionData
+from experimentNao.interaction.performance_of_participant.participant_feedback import SheetNamesExtras
+from experimentNao.model_ID.cognitive import parameters_manager as pm
+from experimentNao.model_ID.configs import model_configs, overall_config, id_cog_modes, train_test_config
+from experimentNao.model_ID.decision_making.parameters_manager import ParametersManagerDM
+from lib import excel_files
+from lib.algorithms.gradient_descent import settings as s_gd
+
+PARTICIPANT_ID = 'synthetic'
+N_DIFFICULTIES = 6
+
+
+def get_id_config(model_config, simplified_dynamics=True, n_horizon=1):
+    """ returns the identification configuration of a synthetic participant with the model configuration "model_config"
+
+    Parameters
+    ----------
+    model_config : experimentNao.model_ID.configs.model_configs.ModelConfigs
+    simplified_dynamics : bool
+    n_horizon : int
+
+    Returns
+    -------
+    experimentNao.model_ID.configs.overall_config.IDConfig
+    """
+    return overall_config.IDConfig(model_config, PARTICIPANT_ID, id_cog_modes.IdCogModes.ALL,
+                                   train_test_config.TrainingSets.A, simplified_dynamics=simplified_dynamics,
+                                   incremental=True, n_horizon=n_horizon, cog_2_id=True)
+
+
+def declare_model(id_config):
+    """ declares the model of "id_config", with the default normalisation values of the real life data
+
+    Parameters
+    ----------
+    id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+
+    Returns
+    -------
+    Union[experimentNao.declare_model.declare_entire_model.ToMModelChessSimpleDyn, experimentNao.declare_model.declare_entire_model.ToMModelChess]
+    """
+    included_variables = model_configs.get_model_configuration(id_config.model_config, id_config.incremental)
+    return dem.declare_model(included_variables, dem.get_normalization_values_of_rld(None), id_config)
+
+
+def get_parameters(tom_model, id_config, random):
+    """ returns random parameters of the perception, cognitive and decision-making modules of "tom_model" (in the
+    order in which they are identified)
+
+    Parameters
+    ----------
+    tom_model : Union[experimentNao.declare_model.declare_entire_model.ToMModelChessSimpleDyn, experimentNao.declare_model.declare_entire_model.ToMModelChess]
+    id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+    random : random.Random
+
+    Returns
+    -------
+    Tuple[List[lib.algorithms.gradient_descent.parameters2optimise.Parameter2Optimise], List[lib.algorithms.gradient_descent.parameters2optimise.Parameter2Optimise], Tuple]
+        parameters of the perception and cognitive modules, parameters of the decision-making module, and variables
+        with linkages to identify
+    """
+    included_variables = model_configs.get_model_configuration(id_config.model_config, id_config.incremental)
+    vars_2_id, _ = tom_model.cognitive_module.get_vars_2_id_and_hidden_vars(included_variables)
+    vars_w_links_to_id = tom_model.cognitive_module.get_vars_w_link_to_id(vars_2_id, id_config.simple_dynamics)
+    parameters_manager = pm.ParametersManager(tom_model, random, include_slow_dyn=False)
+    parameters_cog = parameters_manager.initialize_parameters(vars_w_links_to_id, s_gd.Settings(0, 0, False, 0, 0))
+    parameters_dm = ParametersManagerDM(None, (-1, 1), random).initialize_parameters(
+        tom_model.decision_making_module.intention_selector.outputs)
+    return parameters_cog, parameters_dm, vars_w_links_to_id
+
+
+def get_participant_data(tom_model, n_puzzles, n_steps_per_puzzle, random):
+    """ returns the sheets of the reply file of a synthetic interaction (as written by the interaction): the
+    'Performance' sheet with the real life data of each step, and one sheet per step with the answers of the participant
+    to the questions about the state variables of "tom_model"
+
+    Parameters
+    ----------
+    tom_model : Union[experimentNao.declare_model.declare_entire_model.ToMModelChessSimpleDyn, experimentNao.declare_model.declare_entire_model.ToMModelChess]
+    n_puzzles : int
+    n_steps_per_puzzle : int
+    random : random.Random
+
+    Returns
+    -------
+    Dict[str, pandas.core.frame.DataFrame]
+    """
+    sheet_names_extras = SheetNamesExtras()
+    cognitive = tom_model.cognitive_module
+    var_names = [var.name for var in cognitive.get_beliefs() + cognitive.get_goals() + cognitive.get_emotions()]
+    performance, sheets = [], {}
+    for puzzle in range(1, n_puzzles + 1):
+        difficulty = random.randrange(N_DIFFICULTIES)
+        nao_helping, nao_offering_reward = random.random() < 0.5, random.random() < 0.5
+        for step in range(n_steps_per_puzzle):
+            puzzle_end = step == n_steps_per_puzzle - 1
+            step_name = round(puzzle + 0.1 * step, 1)
+            n_wrong_attempts = [random.randrange(4) for _ in range(step + 1)]
+            performance.append([step_name, random.randrange(3) if nao_helping else 0, str(n_wrong_attempts),
+                                difficulty, random.random() if puzzle_end else 0, random.uniform(10, 150),
+                                nao_helping, nao_offering_reward, nao_offering_reward and puzzle_end, False, False])
+            sheet_name = sheet_names_extras.step + str(step_name) + (sheet_names_extras.puzzle_end if puzzle_end else '')
+            sheets[sheet_name] = pd.DataFrame({'Var Name': var_names,
+                                               'Value': [random.randint(0, 10) for _ in var_names]})
+    columns = ('Step', ) + ChessInteractionData().df_columns + ('Quit', )
+    return {'Performance': pd.DataFrame(performance, columns=columns), **sheets}
+
+
+def get_identified_model_data(parameters_cog, parameters_dm, random):
+    """ returns the sheets of the files of an identified model (as written by the identification and by the pre
+    processing of the data before the model-based controller) with the parameters "parameters_cog" and
+    "parameters_dm"
+
+    Parameters
+    ----------
+    parameters_cog : List[lib.algorithms.gradient_descent.parameters2optimise.Parameter2Optimise]
+    parameters_dm : List[lib.algorithms.gradient_descent.parameters2optimise.Parameter2Optimise]
+    random : random.Random
+
+    Returns
+    -------
+    Tuple[Dict[str, pandas.core.frame.DataFrame], Dict[str, pandas.core.frame.DataFrame], Dict[str, pandas.core.frame.DataFrame]]
+        sheets of the files with the parameters of the cognitive and decision-making modules, and of the file with the
+        metrics of the participant
+    """
+    sheets_cog = {'List of Parameters': pd.DataFrame({'Influencer': ['synthetic'] * len(parameters_cog),
+                                                      'Values': [par.value for par in parameters_cog]}),
+                  'Overall Performance': pd.DataFrame({'IDed Params': [len(parameters_cog)],
+                                                       'N params': [len(parameters_cog)]})}
+    sheets_dm = {'List of Parameters': pd.DataFrame({'Name of parameter': [par.name for par in parameters_dm],
+                                                     'Value': [par.value for par in parameters_dm]})}
+    difficulties = np.arange(N_DIFFICULTIES)
+    rld_per_diff = pd.DataFrame({'Belief difficulty': np.linspace(-1, 1, N_DIFFICULTIES),
+                                 'n_hints': difficulties / 2,
+                                 'n_wrong_attempts': difficulties + random.random(),
+                                 'time_2_solve': 20 + 25 * difficulties * (1 + random.random())})
+    max_values = dem.get_normalization_values_of_rld(None)
+    sheets_metrics = {file_names.get_names_of_sheets(normalisation=False): rld_per_diff,
+                      file_names.get_names_of_sheets(normalisation=True):
+                          pd.DataFrame({'Name': list(max_values.keys()), 'Value': list(max_values.values())})}
+    return sheets_cog, sheets_dm, sheets_metrics
+
+
+def write_excel_file(path, sheets):
+    """ writes the "sheets" in the excel file "path", and returns the file opened for reading
+
+    Parameters
+    ----------
+    path : pathlib.Path
+    sheets : Dict[str, pandas.core.frame.DataFrame]
+
+    Returns
+    -------
+    pandas.io.excel._base.ExcelFile
+    """
+    with pd.ExcelWriter(path) as writer:
+        for sheet_name, df in sheets.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=sheet_name == 'Performance')
+    return excel_files.get_excel_file(str(path))
+
+
+def write_participant_files(folder, tom_model, n_sessions, n_puzzles, n_steps_per_puzzle, random):
+    """ writes the reply files of "n_sessions" synthetic interactions in "folder"
+
+    Parameters
+    ----------
+    folder : pathlib.Path
+    tom_model : Union[experimentNao.declare_model.declare_entire_model.ToMModelChessSimpleDyn, experimentNao.declare_model.declare_entire_model.ToMModelChess]
+    n_sessions : int
+    n_puzzles : int
+    n_steps_per_puzzle : int
+    random : random.Random
+
+    Returns
+    -------
+    List[pathlib.Path]
+    """
+    paths = []
+    for session in range(1, n_sessions + 1):
+        paths.append(pathlib.Path(folder) / 'Reply_{}_{}.xlsx'.format(PARTICIPANT_ID, session))
+        write_excel_file(paths[-1], get_participant_data(tom_model, n_puzzles, n_steps_per_puzzle, random))
+    return paths
+
+
+def write_identified_model_files(folder, tom_model, id_config, random):
+    """ writes the files of a synthetic identified model of "id_config" in "folder", with random parameters
+
+    Parameters
+    ----------
+    folder : pathlib.Path
+    tom_model : Union[experimentNao.declare_model.declare_entire_model.ToMModelChessSimpleDyn, experimentNao.declare_model.declare_entire_model.ToMModelChess]
+    id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+    random : random.Random
+
+    Returns
+    -------
+    Tuple[pandas.io.excel._base.ExcelFile, pandas.io.excel._base.ExcelFile, pandas.io.excel._base.ExcelFile]
+        files with the parameters of the cognitive and decision-making modules, and with the metrics of the participant
+    """
+    parameters_cog, parameters_dm, _ = get_parameters(tom_model, id_config, random)
+    sheets = get_identified_model_data(parameters_cog, parameters_dm, random)
+    name = '{}_{}_{}'.format(PARTICIPANT_ID, id_config.model_config.name, 'simple' if id_config.simple_dynamics else 'cmp')
+    return tuple(write_excel_file(pathlib.Path(folder) / '{}_{}.xlsx'.format(prefix, name), sheets_of_file)
+                 for prefix, sheets_of_file in zip(('model_id_cog', 'model_id_dm', 'metrics'), sheets))
@@ -0,0 +1,123 @@
+import time
+import json
+import platform
+import subprocess
+
+import numpy as np
+
+import path_config
+from experimentNao import folder_path
+
+
+def time_function(function, n_repeats, n_warm_up=1, n_calls=1, setup=None):
+    """ times "function", and returns the statistics of the time of one call
+
+    Parameters
+    ----------
+    function : function
+        function without arguments to time
+    n_repeats : int
+        number of times that the function is timed
+    n_warm_up : int
+        number of calls before the timing (not timed)
+    n_calls : int
+        number of calls timed together in each repetition (for functions that are too fast to be timed alone)
+    setup : Union[None, function]
+        function without arguments run (and not timed) before each repetition
+
+    Returns
+    -------
+    Dict[str, float]
+        times in ms
+    """
+    for _ in range(n_warm_up):
+        if setup is not None:
+            setup()
+        function()
+    times = []
+    for _ in range(n_repeats):
+        if setup is not None:
+            setup()
+        start_time = time.perf_counter()
+        for _ in range(n_calls):
+            function()
+        times.append((time.perf_counter() - start_time) / n_calls)
+    times = np.array(times) * 1000
+    return {'n repeats': n_repeats, 'n calls': n_calls, 'mean (ms)': float(times.mean()),
+            'median (ms)': float(np.median(times)), 'p95 (ms)': float(np.percentile(times, 95)),
+            'min (ms)': float(times.min()), 'max (ms)': float(times.max())}
+
+
+def get_environment():
+    """ returns the information that identifies the code and the machine that ran the benchmarks
+
+    Returns
+    -------
+    Dict[str, str]
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=path_config.repo_root, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': platform.python_version(),
+            'numpy': np.__version__, 'machine': platform.platform(), 'processor': platform.processor()}
+
+
+def save_results(path, results, settings):
+    """ saves the results of the benchmarks in a json file, together with the settings of the run and the environment
+
+    Parameters
+    ----------
+    path : pathlib.Path
+    results : Dict[str, Dict[str, float]]
+    settings : Dict[str, Any]
+    """
+    with open(path, 'w') as file:
+        json.dump({'environment': get_environment(), 'settings': settings, 'results': results}, file, indent=2)
+
+
+def load_results(path):
+    """ loads the results of the benchmarks saved with save_results
+
+    Parameters
+    ----------
+    path : pathlib.Path
+
+    Returns
+    -------
+    Dict[str, Any]
+    """
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare_results(results, reference_results, max_regression):
+    """ compares the median times of the benchmarks with the ones of a reference run (e.g., of a previous commit)
+
+    Parameters
+    ----------
+    results : Dict[str, Dict[str, float]]
+    reference_results : Dict[str, Dict[str, float]]
+    max_regression : float
+        maximum ratio between the median time and the reference median time that is not considered a regression
+
+    Returns
+    -------
+    Tuple[Dict[str, float], List[str]]
+        ratio between the median time and the reference one for each benchmark in both runs, and benchmarks that
+        regressed
+    """
+    ratios = {name: results[name]['median (ms)'] / reference_results[name]['median (ms)']
+              for name in results if name in reference_results and reference_results[name]['median (ms)'] > 0}
+    return ratios, [name for name, ratio in ratios.items() if ratio > max_regression]
+
+
+def get_results_folder():
+    """ returns the folder where the results of the benchmarks are saved
+
+    Returns
+    -------
+    pathlib.Path
+    """
+    return folder_path.output_folder_path / 'benchmarks'
@@ -1,6 +1,6 @@
 from experimentNao.model_ID.configs.model_configs import ModelConfigs as mc_new
 from experimentNao.model_ID.configs.id_cog_modes import IdCogModes as id_modes
-from experimentNao.model_ID.configs import train_test_config as tc
+from experimentNao.model_ID.configs import train_test_config as tc, overall_config as oc
 
 
 def get_best_configs_per_participant(participant_identifier):
@@ -35,3 +35,20 @@ def get_best_configs_per_participant(participant_identifier):
     if participant_identifier == '7cPNcE':
         return id_modes.SEP_PER_3, mc_new.SIMPLEST_W_BIAS, tc.TrainingSets.A, 1
     return id_modes.SEP_PER_3, mc_new.DEFAULT, tc.TrainingSets.B, 1
+
+
+def get_best_id_config(participant_identifier):
+    """ returns the identification configuration of the best model of the participant, which is the configuration used
+    by the model-based controller
+
+    Parameters
+    ----------
+    participant_identifier : str
+
+    Returns
+    -------
+    experimentNao.model_ID.configs.overall_config.IDConfig
+    """
+    id_mode, model_config, train_set, n_h = get_best_configs_per_participant(participant_identifier)
+    return oc.IDConfig(model_config, participant_identifier, id_mode, train_set,
+                       simplified_dynamics=True, incremental=True, n_horizon=n_h, cog_2_id=True)
@@ -54,6 +54,30 @@ class Controller(ABC):
         self.when_are_time_steps_in_puzzle = self.time_steps_mapping.when_are_time_steps_of_puzzle(n_moves)
         return self.when_are_time_steps_in_puzzle is not None
 
+    def get_allowed_numbers_of_moves(self, numbers_of_moves):
+        """ returns which of the "numbers_of_moves" allow to ask the questions that should be asked in the next puzzle,
+        so that only puzzles with those numbers of moves are selected
+
+        Parameters
+        ----------
+        numbers_of_moves : List[int]
+
+        Returns
+        -------
+        List[int]
+        """
+        return [n_moves for n_moves in numbers_of_moves
+                if self.time_steps_mapping.when_are_time_steps_of_puzzle(n_moves) is not None]
+
+    def get_candidate_difficulties(self):
+        """ returns the difficulties that the controller can choose for the next puzzle
+
+        Returns
+        -------
+        List[int]
+        """
+        return self.puzzle_difficulty_levels
+
     def check_if_it_is_discrete_time_step(self, current_move):
         """ check if the current move of the players coincides with a discrete time step of our controller
 
@@ -1,21 +1,23 @@
 import copy
 
-from experimentNao.declare_model import load_model
+from experimentNao.declare_model import load_model, model_artifact
 from experimentNao.model_ID.configs import model_configs
-from lib import excel_files
+from lib import profiling
 
 from experimentNao.behaviour_controllers.mbc import aux_functions, controller_writer as wce, \
-    model_propagator as mp, model_propagator_simple as mps, questions_manager as qm
+    model_propagator as mp, model_propagator_simple as mps, questions_manager as qm, policy_table as pt
 from experimentNao.behaviour_controllers.mbc.aux_functions import print_values_of_computed_variables, \
     get_all_fast_dyn_vars, get_rpks_of_model
 from experimentNao.behaviour_controllers.robot_action import RobotAction
 from experimentNao.behaviour_controllers.controller import Controller
 from experimentNao.declare_model import declare_entire_model as dem
 from experimentNao.model_ID.cognitive import set_values_of_variables_cog
+from experimentNao.model_ID.data_processing import questionnaire_answers
 
 
 class ModelBasedController(Controller):
-    def __init__(self, id_config, verbose=2, extra_predictive_step=True, for_interaction=True):
+    def __init__(self, id_config, verbose=2, extra_predictive_step=True, for_interaction=True, policy_table=None,
+                 prediction_cache=None, files=None):
         """ Model-based controller used to control the behaviour of NAO in the third session, based on the model
         identified for the participant
 
@@ -25,6 +27,14 @@ class ModelBasedController(Controller):
         verbose : int
         extra_predictive_step : bool
         for_interaction : bool
+        policy_table : experimentNao.behaviour_controllers.mbc.policy_table.PolicyTable
+            pre-computed policy used to select the actions. If None, or if the table is not confident about the
+            action, the actions are evaluated by propagating the predictive model
+        prediction_cache : experimentNao.behaviour_controllers.mbc.prediction_cache.PredictionCache
+            memo cache of the predictions of the model. If None, the predictive model is always propagated
+        files : Tuple[pandas.io.excel._base.ExcelFile, pandas.io.excel._base.ExcelFile, pandas.io.excel._base.ExcelFile]
+            files with the parameters of the cognitive and decision-making modules, and with the metrics of the
+            participant. If None, the files of the participant of "id_config" (in the output folder) are used
         """
         super().__init__()
         # decision variables
@@ -45,18 +55,21 @@ class ModelBasedController(Controller):
             self.soft_constraints = ['ask for easier game', 'ask for more difficult game']
         # Participant and models
         self.id_config = id_config
-        self.file_cog, self.file_dm, self.file_metrics, self.included_variables \
-            = load_model.get_files_with_parameters_and_metrics(self.id_config)
-        rld_max_values = dem.get_normalization_values_of_rld(self.file_metrics, from_id=True)
-        self.tom_model = dem.declare_model(self.included_variables, rld_max_values, id_config)
-        self.tom_model_predictive = dem.declare_model(self.included_variables, rld_max_values, id_config)
+        self.model_artifact = model_artifact.get_model_artifact(id_config) if files is None \
+            else model_artifact.build_model_artifact(id_config, files)
+        self.included_variables = model_configs.get_model_configuration(id_config.model_config, id_config.incremental)
+        self.rld_max_values = self.model_artifact.rld_max_values
+        self.tom_model = dem.declare_model(self.included_variables, self.rld_max_values, id_config)
+        self.tom_model_predictive = dem.declare_model(self.included_variables, self.rld_max_values, id_config)
+        self.model_artifact.check_structure(self.tom_model)
+        rld_per_diff = self.model_artifact.get_rld_per_diff()
         self.rld = self.tom_model.perception_module.perceptual_access.inputs
         if self.id_config.simple_dynamics:
             self.model_propagator = mps.ModelPropagationSimple(self.tom_model, self.tom_model_predictive, self.rld,
-                                                               verbose, self.file_metrics, extra_predictive_step)
+                                                               verbose, rld_per_diff, extra_predictive_step)
         else:
             self.model_propagator = mp.ModelPropagation(self.tom_model, self.tom_model_predictive, self.rld, verbose,
-                                                        self.file_metrics, extra_predictive_step)
+                                                        rld_per_diff, extra_predictive_step)
         self.ided_vars, self.hidden_vars = None, None
         self.load_model_parameters()
         self.n_horizon = id_config.n_horizon if id_config.simple_dynamics else 2
@@ -66,6 +79,10 @@ class ModelBasedController(Controller):
         self.for_interaction = for_interaction
         self.questions_manager = qm.QuestionsManagerMBC(puzzle_periodic_questions=True, time_periodic_questions=True)
         self.controller_writer = wce.WriteControllerToExcel(self.tom_model, self.actions, self.id_config)
+        self.policy_table = policy_table
+        if self.policy_table is not None:
+            self.policy_table.check_compatibility(self.tom_model, self.actions)
+        self.prediction_cache = prediction_cache
 
     def initialize_controller(self, puzzle_difficulty, nao_helping, nao_offering_reward):
         """ initializes the variables of the controller
@@ -96,6 +113,7 @@ class ModelBasedController(Controller):
         self.questions_manager.reset_beginning_of_puzzle()  # for questions to be asked
         return super().reset_beginning_of_puzzle(n_moves)
 
+    @profiling.profiled('MBC update middle of puzzle', 'controller')
     def update_model_middle_of_question(self, current_rld, participant_answers, puzzle_counter, write=True):
         """ updates the values of the state variables of the model, either by asking the values to the participant
         or by using the model to estimate them. This is done depending on the output from self.questions_manager
@@ -125,6 +143,7 @@ class ModelBasedController(Controller):
             self.controller_writer.write_mid_puzzle(puzzle_counter, self.get_puzzle_difficulty_status(),
                                                     updated_w_values_from_question)
 
+    @profiling.profiled('MBC update end of puzzle', 'controller')
     def update_end_of_puzzle_and_get_action(self, current_rld, puzzle_counter, write=True):
         """ updates the controller at the end of a puzzle (including the model) and gets the action chosen by the
         controller.
@@ -151,6 +170,7 @@ class ModelBasedController(Controller):
             self.controller_writer.write_end_of_puzzle(self.actions, action, puzzle_counter)
         return action
 
+    @profiling.profiled('MBC get_next_action', 'controller')
     def get_next_action(self, puzzle_counter, current_rld):
         """ gets the next action chosen by the controller
 
@@ -163,8 +183,11 @@ class ModelBasedController(Controller):
         -------
         experimentNao.behaviour_controllers.robot_action.RobotAction
         """
-        for action in self.actions:                                         # 1. Get cost and constraints of each action
-            self.get_action_cost_and_constraints(action, current_rld)
+        if not self.get_actions_cost_from_policy_table(current_rld):        # 1. Get cost and constraints of each action
+            for action in self.actions:
+                self.get_action_cost_and_constraints(action, current_rld)
+            if self.prediction_cache is not None and self.verbose > 1:
+                self.print_control_information(self.prediction_cache.get_report())
         sorted_actions = sorted(self.actions, key=lambda act: act.cost)     # 2. sort actions by cost
         self.print_actions(sorted_actions)
         for action in sorted_actions:                                 # 3. The 1st action that satisfies all constraints
@@ -185,10 +208,56 @@ class ModelBasedController(Controller):
         action : experimentNao.behaviour_controllers.robot_action.RobotAction
         current_rld : experimentNao.declare_model.chess_interaction_data.ChessInteractionData
         """
+        cached_prediction, key = None, None
+        if self.prediction_cache is not None:       # 0. Look for the prediction in the cache (before u is changed)
+            key = self.prediction_cache.get_key(self.tom_model, current_rld, action)
+            cached_prediction = self.prediction_cache.get(key)
+            if cached_prediction is not None and not self.prediction_cache.is_time_to_verify():
+                current_rld.nao_offering_rewards = action.give_reward       # same side effect on u as propagating
+                current_rld.reward_given = action.give_reward
+                action.set_cost(cached_prediction[0])
+                action.set_respected_constraints(*cached_prediction[1:])
+                return
         self.reset_predictive_model()                                   # 1. Reset the predictive model to current model
         self.model_propagator.run_predictive_model_w_action(action, current_rld)    # 2. Run model with the action
         action.set_cost(self.cost_function())                                       # 3. Save cost of action
         action.set_respected_constraints(*self.check_constraints())
+        if cached_prediction is not None:
+            self.prediction_cache.add_verification(cached_prediction, action.cost, action.respects_hard_constraints,
+                                                   action.respects_soft_constraints)
+        elif key is not None:
+            self.prediction_cache.put(key, action.cost, action.respects_hard_constraints,
+                                      action.respects_soft_constraints)
+
+    def get_actions_cost_from_policy_table(self, current_rld):
+        """ gets the cost and constraints of all the actions from the policy table, if there is one. The table is only
+        used if it can answer the query and if the selected action is better than the runner-up by more than the error
+        bound measured when the table was validated.
+
+        Parameters
+        ----------
+        current_rld : experimentNao.declare_model.chess_interaction_data.ChessInteractionData
+
+        Returns
+        -------
+        bool
+            whether the costs and constraints of the actions were set from the policy table
+        """
+        if self.policy_table is None:
+            return False
+        state_values = [var.value for var in self.tom_model.cognitive_module.state_vars]
+        answer = self.policy_table.query(state_values, current_rld)
+        if answer is None:
+            self.print_control_information('Policy table cannot answer: live rollout')
+            return False
+        costs, respects_hard, respects_soft = answer
+        for i, action in enumerate(self.actions):
+            action.set_cost(float(costs[i]))
+            action.set_respected_constraints(bool(respects_hard[i]), bool(respects_soft[i]))
+        if pt.get_margin_of_selected_action(self.actions) <= self.policy_table.error_bound:
+            self.print_control_information('Policy table margin too small: live rollout')
+            return False
+        return True
 
     def reset_predictive_model(self):
         """ resets the values of the predictive model from the values saved in the current model. The predictive model
@@ -323,9 +392,7 @@ class ModelBasedController(Controller):
         predictive model used by the controller
 
         """
-        sheet_name = ('List of Parameters', )
-        parameters_cog_df = excel_files.get_sheets_from_excel(None, input_file=self.file_cog, sheet_names=sheet_name)[0]
-        parameters_dm_df = excel_files.get_sheets_from_excel(None, input_file=self.file_dm, sheet_names=sheet_name)[0]
+        parameters_cog_df, parameters_dm_df = self.model_artifact.get_parameters_dfs()
         for model in (self.tom_model_predictive, self.tom_model):
             self.ided_vars, self.hidden_vars = \
                 load_model.load_parameters_in_a_model(model, self.included_variables, self.id_config,
@@ -369,10 +436,11 @@ class ModelBasedController(Controller):
         ----------
         participant_answers :
         """
+        answers = questionnaire_answers.QuestionnaireAnswers([participant_answers[-1]]) \
+            if participant_answers is not None else None
         for var in self.ided_vars:          # update state vars from questions
             if participant_answers is not None:
-                set_values_of_variables_cog.fill_values_of_variable(var, [participant_answers[-1]],
-                                                                    self.id_config.simple_dynamics)
+                set_values_of_variables_cog.fill_values_of_variable(var, answers, self.id_config.simple_dynamics)
             elif self.for_interaction:
                 print('\n My warning: NOT ABLE TO FILL VALUES FROM PARTICIPANTS ANSWERS!!!')
             var.value = var.values[-1]
@@ -397,10 +465,11 @@ class ModelBasedController(Controller):
         ----------
         participant_answers : List[pandas.core.frame.DataFrame]
         """
+        answers = questionnaire_answers.QuestionnaireAnswers([participant_answers[-1]]) \
+            if participant_answers is not None else None
         for var in self.ided_vars:  # update state vars from questions
             if participant_answers is not None:
-                set_values_of_variables_cog.fill_values_of_variable(var, [participant_answers[-1]],
-                                                                    self.id_config.simple_dynamics)
+                set_values_of_variables_cog.fill_values_of_variable(var, answers, self.id_config.simple_dynamics)
             elif self.for_interaction:
                 print('\n My warning: NOT ABLE TO FILL VALUES FROM PARTICIPANTS ANSWERS!!!')
             var.value = var.values[-1]
@@ -1,13 +1,11 @@
 from experimentNao.behaviour_controllers.mbc.aux_functions import print_values_of_computed_variables, \
     get_all_fast_dyn_vars
-from experimentNao.data_analysis.pre_process_data import file_names
 from experimentNao.declare_model import chess_interaction_data as cid
 from experimentNao.model_ID.cognitive import set_values_of_variables_cog as set_values
-from lib import excel_files
 
 
 class ModelPropagation:
-    def __init__(self, tom_model, predictive_model, rld, verbose, file_metrics, extra_predictive_step=False):
+    def __init__(self, tom_model, predictive_model, rld, verbose, rld_per_diff, extra_predictive_step=False):
         """ Object that manages the propagation of the predictive model in order to allow assessing the consequences
         of taking certain actions into the future. Assumes complex dynamics.
 
@@ -17,7 +15,8 @@ class ModelPropagation:
         predictive_model : experimentNao.declare_model.declare_entire_model.ToMModelChess
         rld : experimentNao.declare_model.modules.declare_perception_module.ChessRLD
         verbose : int
-        file_metrics : pandas.io.excel._base.ExcelFile
+        rld_per_diff : pandas.core.frame.DataFrame
+            average real life data of the participant for each difficulty
         extra_predictive_step : bool
         """
         self.tom_model = tom_model
@@ -25,8 +24,7 @@ class ModelPropagation:
         self.predictive_model = predictive_model
         self.verbose = verbose
         self.extra_predictive_step = extra_predictive_step
-        self.rld_per_diff = None
-        self.load_rld_per_diff(file_metrics)
+        self.rld_per_diff = rld_per_diff
 
     def update_model_w_n_horizon(self, u_minus_1, same_puzzle):
         """ updates the model twice (for n_horizon=2). It gets the previous u (u_minus_3) from the current rld and the
@@ -112,16 +110,6 @@ class ModelPropagation:
         if self.verbose > 1:
             print(' [C]\tu_k-1: {}   u_k-2: {}   u_k-3: {}'.format(u_m_1.time_2_solve, u_m_2.time_2_solve, u_m_3.time_2_solve))
 
-    def load_rld_per_diff(self, file_metrics):
-        """ loads the real life data average values for each difficulty
-
-        Parameters
-        ----------
-        file_metrics :
-        """
-        sheet_name = file_names.get_names_of_sheets(normalisation=False)
-        self.rld_per_diff = excel_files.get_sheets_from_excel(None, [sheet_name], input_file=file_metrics)[0]
-
 
 def update_a_model_once(tom_model, u, compute_optimal_action):
     """ this function updates the 'tom_model' using input 'u'
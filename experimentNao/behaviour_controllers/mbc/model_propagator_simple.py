@@ -2,7 +2,7 @@ from experimentNao.behaviour_controllers.mbc import model_propagator
 
 
 class ModelPropagationSimple(model_propagator.ModelPropagation):
-    def __init__(self, tom_model, predictive_model, rld, verbose, file_metrics, extra_predictive_step=False):
+    def __init__(self, tom_model, predictive_model, rld, verbose, rld_per_diff, extra_predictive_step=False):
         """ Object that manages the propagation of the predictive model in order to allow assessing the consequences
         of taking certain actions into the future. Assumes simplified dynamics.
 
@@ -12,10 +12,11 @@ class ModelPropagationSimple(model_propagator.ModelPropagation):
         predictive_model : experimentNao.declare_model.declare_entire_model.ToMModelChessSimpleDyn
         rld : experimentNao.declare_model.modules.declare_perception_module.ChessRLD
         verbose : int
-        file_metrics : pandas.io.excel._base.ExcelFile
+        rld_per_diff : pandas.core.frame.DataFrame
+            average real life data of the participant for each difficulty
         extra_predictive_step : bool
         """
-        super().__init__(tom_model, predictive_model, rld, verbose, file_metrics, extra_predictive_step)
+        super().__init__(tom_model, predictive_model, rld, verbose, rld_per_diff, extra_predictive_step)
 
     def update_model_w_n_horizon(self, u_minus_1, same_puzzle):
         """ updates the model (for n_horizon=1). It gets the previous u (u_minus_2) from the current rld and the
@@ -0,0 +1,485 @@
+import itertools
+
+import numpy as np
+
+from experimentNao import folder_path
+from experimentNao.declare_model import chess_interaction_data as cid
+
+MAX_N_EVALUATIONS = 10 ** 6     # propagations of the predictive model (about 0.5 ms each) allowed to build a table
+N_VALIDATION_POINTS = 200       # held-out points where the table is compared with the propagation of the model
+
+
+class PolicyTable:
+    def __init__(self, axes_names, axes_points, actions, costs, respects_hard, respects_soft, fixed_rld,
+                 error_bound=float('inf'), validation=None, file_name=''):
+        """ Pre-computed control policy of the model-based controller. For each node of a grid of (model state,
+        real life data u_{k-1}) the cost and constraints of every action are stored, so that at session time the
+        controller can interpolate them instead of propagating the predictive model once per action.
+
+        Parameters
+        ----------
+        axes_names : List[str]
+            names of the axes of the grid. The state axes are named 'state:<variable name>' and the real life data
+            axes are named 'rld:<attribute of ChessInteractionData>'
+        axes_points : List[numpy.ndarray]
+            sorted points of each axis of the grid
+        actions : List[Tuple[int, bool]]
+            (puzzle difficulty, give reward) of each action, in the order of the last dimension of "costs"
+        costs : numpy.ndarray
+            cost of each action in each node of the grid, with shape (*grid shape, number of actions)
+        respects_hard : numpy.ndarray
+            whether each action respects the hard constraints in each node of the grid (same shape as "costs")
+        respects_soft : numpy.ndarray
+            whether each action respects the soft constraints in each node of the grid (same shape as "costs")
+        fixed_rld : Dict[str, Union[bool, int, float]]
+            values of the real life data that were kept fixed when building the table. Queries with different values
+            are not answered by the table
+        error_bound : float
+            largest error of the interpolated difference between the costs of two actions, measured against the
+            propagation of the model in held-out points (see "validate_policy_table"). The table is only trusted if the
+            selected action is better than the runner-up by more than this bound
+        validation : Dict[str, float]
+            results of the validation of the table (see "validate_policy_table")
+        file_name : str
+            name of the identification file of the model used to build the table
+        """
+        self.axes_names = list(axes_names)
+        self.axes_points = [np.asarray(points, dtype=float) for points in axes_points]
+        self.actions = [(int(diff), bool(reward)) for diff, reward in actions]
+        self.costs = costs
+        self.respects_hard = respects_hard
+        self.respects_soft = respects_soft
+        self.fixed_rld = fixed_rld
+        self.error_bound = error_bound
+        self.validation = {} if validation is None else validation
+        self.file_name = file_name
+        self.n_state_axes = sum(1 for name in self.axes_names if name.startswith('state:'))
+        assert self.costs.shape == tuple(len(points) for points in self.axes_points) + (len(self.actions), )
+
+    def query(self, state_values, current_rld):
+        """ returns the (interpolated) cost and the constraints of each action for the current state of the model and
+        the current real life data. If the query falls outside the grid, if the fixed real life data differ, or if the
+        constraints are not the same in all the nodes around the query, None is returned (i.e., the table is not
+        able to answer, and the actions should be evaluated by propagating the predictive model).
+
+        Parameters
+        ----------
+        state_values : List[float]
+        current_rld : experimentNao.declare_model.chess_interaction_data.ChessInteractionData
+
+        Returns
+        -------
+        Union[None, Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]]
+        """
+        for name, value in self.fixed_rld.items():
+            if getattr(current_rld, name) != value:
+                return None
+        point = list(state_values) + [get_rld_value(current_rld, name[len('rld:'):])
+                                      for name in self.axes_names[self.n_state_axes:]]
+        brackets = []
+        for value, points in zip(point, self.axes_points):
+            bracket = get_bracket(value, points)
+            if bracket is None:
+                return None
+            brackets.append(bracket)
+        costs = np.zeros(len(self.actions))
+        respects_hard, respects_soft = None, None
+        for corner in itertools.product(*brackets):
+            weight = np.prod([w for _, w in corner])
+            node = tuple(i for i, _ in corner)
+            costs += weight * self.costs[node]
+            if respects_hard is None:
+                respects_hard, respects_soft = self.respects_hard[node], self.respects_soft[node]
+            elif not (np.array_equal(respects_hard, self.respects_hard[node])
+                      and np.array_equal(respects_soft, self.respects_soft[node])):
+                return None
+        return costs, respects_hard, respects_soft
+
+    def check_compatibility(self, tom_model, actions):
+        """ asserts that the table was built for a model with the same state variables and for the same actions
+
+        Parameters
+        ----------
+        tom_model : experimentNao.declare_model.declare_entire_model.ToMModelChessSimpleDyn
+        actions : List[experimentNao.behaviour_controllers.robot_action.RobotAction]
+        """
+        state_names = ['state:' + var.name for var in tom_model.cognitive_module.state_vars]
+        assert self.axes_names[:self.n_state_axes] == state_names
+        assert self.actions == [(action.puzzle_difficulty_level, action.give_reward) for action in actions]
+
+    def save(self, path):
+        """ saves the table to a compressed numpy file
+
+        Parameters
+        ----------
+        path : Union[str, pathlib.Path]
+        """
+        axes = {'axis_{}'.format(i): points for i, points in enumerate(self.axes_points)}
+        np.savez_compressed(path, costs=self.costs.astype(np.float32), respects_hard=self.respects_hard,
+                            respects_soft=self.respects_soft, axes_names=np.array(self.axes_names),
+                            actions=np.array(self.actions, dtype=int),
+                            fixed_rld_names=np.array(list(self.fixed_rld.keys()), dtype=str),
+                            fixed_rld_values=np.array(list(self.fixed_rld.values()), dtype=float),
+                            validation_names=np.array(list(self.validation.keys()), dtype=str),
+                            validation_values=np.array(list(self.validation.values()), dtype=float),
+                            error_bound=self.error_bound, file_name=self.file_name, **axes)
+
+    @staticmethod
+    def load(path):
+        """ loads a table saved with "PolicyTable.save". Tables saved without an error bound (i.e., not validated) are
+        never trusted, so the controller always falls back to the propagation of the model
+
+        Parameters
+        ----------
+        path : Union[str, pathlib.Path]
+
+        Returns
+        -------
+        PolicyTable
+        """
+        with np.load(path, allow_pickle=False) as data:
+            axes_names = [str(name) for name in data['axes_names']]
+            axes_points = [data['axis_{}'.format(i)] for i in range(len(axes_names))]
+            fixed_rld = dict(zip([str(name) for name in data['fixed_rld_names']], data['fixed_rld_values'].tolist()))
+            validation, error_bound = {}, float('inf')
+            if 'error_bound' in data:
+                validation = dict(zip([str(name) for name in data['validation_names']],
+                                      data['validation_values'].tolist()))
+                error_bound = float(data['error_bound'])
+            return PolicyTable(axes_names, axes_points, data['actions'].tolist(), data['costs'].astype(float),
+                               data['respects_hard'], data['respects_soft'], fixed_rld, error_bound=error_bound,
+                               validation=validation, file_name=str(data['file_name']))
+
+
+def build_policy_table(controller, n_state_points=None, rld_axes=None, fixed_rld=None,
+                       n_validation_points=N_VALIDATION_POINTS, max_n_evaluations=MAX_N_EVALUATIONS, seed=0):
+    """ builds the policy table of a model-based controller by propagating its predictive model, with each action, from
+    every node of a grid of model states and real life data. The state axes are the state variables of the cognitive
+    module (beliefs, goals, and emotions) and are evenly spaced in [-1, 1]. The biases are computed from the state
+    variables, and the rationally perceived knowledge from the real life data. The attributes of the real life data
+    that are not in "rld_axes" nor in "fixed_rld" are taken as in the beginning of a puzzle. The size of the grid grows
+    exponentially with the number of state variables, so the table is only built if the number of propagations
+    (nodes x actions, plus the ones of the validation) is within "max_n_evaluations"; otherwise, a ValueError is raised
+    before propagating the model. Once built, the table is validated against the propagation of the model in
+    "n_validation_points" held-out points, which gives the error bound of the table.
+
+    Parameters
+    ----------
+    controller : experimentNao.behaviour_controllers.mbc.model_based_controller.ModelBasedController
+    n_state_points : Union[None, int]
+        number of points of the grid in each state axis. If None, the largest number of points (at least 2) whose grid
+        is within "max_n_evaluations" is used
+    rld_axes : Dict[str, List[float]]
+        points of the grid for each attribute of the real life data u_{k-1}
+    fixed_rld : Dict[str, Union[bool, int, float]]
+        attributes of the real life data that are kept fixed
+    n_validation_points : int
+    max_n_evaluations : Union[None, int]
+        if None, the size of the grid is not checked
+    seed : int
+        seed of the held-out points
+
+    Returns
+    -------
+    PolicyTable
+    """
+    if rld_axes is None:
+        rld_axes = get_default_rld_axes(controller)
+    if fixed_rld is None:
+        fixed_rld = {'nao_helping': True}
+    state_vars = controller.tom_model_predictive.cognitive_module.state_vars
+    n_rld_nodes = int(np.prod([len(points) for points in rld_axes.values()]))
+    n_validation_evaluations = n_validation_points * len(controller.actions)
+    if n_state_points is None:
+        n_state_points = get_default_n_state_points(len(state_vars), n_rld_nodes * len(controller.actions),
+                                                    n_validation_evaluations, max_n_evaluations)
+    axes_names = ['state:' + var.name for var in state_vars] + ['rld:' + name for name in rld_axes.keys()]
+    axes_points = [np.linspace(-1, 1, n_state_points) for _ in state_vars] + \
+                  [np.asarray(sorted(points), dtype=float) for points in rld_axes.values()]
+    grid_shape = tuple(len(points) for points in axes_points)
+    n_evaluations = int(np.prod(grid_shape, dtype=float)) * len(controller.actions) + n_validation_evaluations
+    if max_n_evaluations is not None and n_evaluations > max_n_evaluations:
+        raise ValueError('The policy table needs {} propagations of the model ({} state axes of {} points, real life '
+                         'data axes of {} points, and {} validation points), more than the {} allowed: reduce the '
+                         'number of points of the axes'.format(n_evaluations, len(state_vars), n_state_points,
+                                                               [len(points) for points in rld_axes.values()],
+                                                               n_validation_points, max_n_evaluations))
+    costs = np.zeros(grid_shape + (len(controller.actions), ))
+    respects_hard = np.zeros(grid_shape + (len(controller.actions), ), dtype=bool)
+    respects_soft = np.zeros(grid_shape + (len(controller.actions), ), dtype=bool)
+    for node in np.ndindex(*grid_shape):
+        values = [axes_points[i][j] for i, j in enumerate(node)]
+        rld_values = dict(zip(rld_axes.keys(), values[len(state_vars):]))
+        costs[node], respects_hard[node], respects_soft[node] = \
+            evaluate_actions(controller, values[:len(state_vars)], rld_values, fixed_rld)
+    actions = [(action.puzzle_difficulty_level, action.give_reward) for action in controller.actions]
+    table = PolicyTable(axes_names, axes_points, actions, costs, respects_hard, respects_soft, fixed_rld,
+                        file_name=controller.id_config.get_model_id_file_name())
+    table.validation = validate_policy_table(table, controller, n_validation_points, rld_axes, seed)
+    table.error_bound = table.validation['error bound']
+    return table
+
+
+def get_default_n_state_points(n_state_vars, n_evaluations_per_state_node, n_validation_evaluations,
+                               max_n_evaluations):
+    """ returns the largest number of points per state axis (at least 2) whose grid is built within
+    "max_n_evaluations" propagations of the model
+
+    Parameters
+    ----------
+    n_state_vars : int
+    n_evaluations_per_state_node : int
+        number of propagations of the model per node of the state axes (nodes of the real life data x actions)
+    n_validation_evaluations : int
+    max_n_evaluations : Union[None, int]
+        if None, 3 points are used
+
+    Returns
+    -------
+    int
+    """
+    if max_n_evaluations is None:
+        return 3
+    n_points = 2
+    while (n_points + 1) ** n_state_vars * n_evaluations_per_state_node + n_validation_evaluations \
+            <= max_n_evaluations:
+        n_points += 1
+    return n_points
+
+
+def evaluate_actions(controller, state_values, rld_values, fixed_rld):
+    """ returns the cost and constraints of each action of the controller, by propagating its predictive model from the
+    state "state_values" and with the real life data given by "rld_values" and "fixed_rld"
+
+    Parameters
+    ----------
+    controller : experimentNao.behaviour_controllers.mbc.model_based_controller.ModelBasedController
+    state_values : List[float]
+    rld_values : Dict[str, float]
+    fixed_rld : Dict[str, Union[bool, int, float]]
+
+    Returns
+    -------
+    Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+        costs, whether the hard constraints are respected, and whether the soft constraints are respected
+    """
+    costs = np.zeros(len(controller.actions))
+    respects_hard = np.zeros(len(controller.actions), dtype=bool)
+    respects_soft = np.zeros(len(controller.actions), dtype=bool)
+    for i, action in enumerate(controller.actions):
+        set_state_of_predictive_model(controller, state_values)
+        u_minus_1 = get_rld_of_node(rld_values, fixed_rld)
+        controller.model_propagator.run_predictive_model_w_action(action, u_minus_1)
+        costs[i] = controller.cost_function()
+        respects_hard[i], respects_soft[i] = controller.check_constraints()
+    return costs, respects_hard, respects_soft
+
+
+def validate_policy_table(table, controller, n_validation_points, rld_axes, seed=0):
+    """ compares the table with the propagation of the model in "n_validation_points" held-out points, drawn at random
+    inside the grid (the state axes and the time to solve are continuous, and the other real life data are integers).
+    The points that the table does not answer are skipped, since the controller propagates the model there anyway.
+    The error bound is the largest error of the interpolated difference between the costs of two actions: if the
+    selected action is better than the runner-up by more than this bound, the propagation of the model would have
+    ranked them in the same way in all the held-out points.
+
+    Parameters
+    ----------
+    table : PolicyTable
+    controller : experimentNao.behaviour_controllers.mbc.model_based_controller.ModelBasedController
+    n_validation_points : int
+    rld_axes : Dict[str, List[float]]
+    seed : int
+
+    Returns
+    -------
+    Dict[str, float]
+        'error bound', median and max 'cost error', number of points 'answered' by the table (out of 'n points'), and
+        number of them where the constraints or the action selected with the error bound 'differ' from the
+        propagation of the model
+    """
+    random = np.random.default_rng(seed)
+    n_state_axes = table.n_state_axes
+    errors, selections = [], []
+    for _ in range(n_validation_points):
+        state_values = list(random.uniform(-1, 1, n_state_axes))
+        rld_values = {}
+        for name, points in rld_axes.items():
+            if name == 'time_2_solve':
+                rld_values[name] = float(random.uniform(min(points), max(points)))
+            else:
+                rld_values[name] = int(random.integers(int(np.ceil(min(points))), int(np.floor(max(points))) + 1))
+        answer = table.query(state_values, get_rld_of_node(rld_values, table.fixed_rld))
+        if answer is None:
+            continue
+        live = evaluate_actions(controller, state_values, rld_values, table.fixed_rld)
+        error = answer[0] - live[0]
+        errors.append(error)
+        selections.append((get_selection(*answer), get_selection(*live)[0],
+                           np.array_equal(answer[1], live[1]) and np.array_equal(answer[2], live[2])))
+    error_bound = max([error.max() - error.min() for error in errors], default=float('inf'))
+    n_differ = sum(1 for (selected, margin), selected_live, same_constraints in selections
+                   if margin > error_bound and (selected != selected_live or not same_constraints))
+    abs_errors = np.abs(np.concatenate(errors)) if len(errors) > 0 else np.array([np.nan])
+    return {'error bound': float(error_bound), 'median cost error': float(np.median(abs_errors)),
+            'max cost error': float(abs_errors.max()), 'n points': n_validation_points, 'answered': len(errors),
+            'differ': n_differ}
+
+
+def get_default_rld_axes(controller):
+    """ returns the default points of the grid for the real life data, based on the values used to normalise the real
+    life data of the participant. Each puzzle difficulty has its own points, while the time to solve and the number
+    of wrong attempts only have their extremes, so that the grid of the state axes can be finer within the budget of
+    propagations
+
+    Parameters
+    ----------
+    controller : experimentNao.behaviour_controllers.mbc.model_based_controller.ModelBasedController
+
+    Returns
+    -------
+    Dict[str, List[float]]
+    """
+    max_values = controller.rld_max_values
+    return {'puzzle_difficulty': controller.puzzle_difficulty_levels,
+            'time_2_solve': [0, max_values['time_2_solve']],
+            'n_wrong_attempts': [0, max_values['n_wrong_attempts']],
+            'n_hints': [0, 1],
+            'skipped_puzzle': [0, 1]}
+
+
+def set_state_of_predictive_model(controller, state_values):
+    """ resets the predictive model of the controller to the current model (as before each propagation during the
+    session, which also copies the history of values of the variables), and then sets its state variables to
+    "state_values" and computes its biases
+
+    Parameters
+    ----------
+    controller : experimentNao.behaviour_controllers.mbc.model_based_controller.ModelBasedController
+    state_values : List[float]
+    """
+    controller.reset_predictive_model()
+    cognitive_module = controller.tom_model_predictive.cognitive_module
+    for var, value in zip(cognitive_module.state_vars, state_values):
+        var.value = value
+    cognitive_module.compute_and_update_biases()
+
+
+def get_rld_of_node(rld_values, fixed_rld):
+    """ returns the real life data u_{k-1} that corresponds to one node of the grid
+
+    Parameters
+    ----------
+    rld_values : Dict[str, float]
+    fixed_rld : Dict[str, Union[bool, int, float]]
+
+    Returns
+    -------
+    experimentNao.declare_model.chess_interaction_data.ChessInteractionData
+    """
+    u = cid.ChessInteractionData()
+    u.fill_data(number_of_hints=0, number_of_wrong_attempts=[0], prop_moves_revealed=0, time_2_solve=0,
+                nao_offering_reward=False, reward_given=False, skipped=False)
+    for name, value in list(rld_values.items()) + list(fixed_rld.items()):
+        if name == 'n_wrong_attempts':
+            u.n_wrong_attempts = [value]
+        elif name in ('puzzle_difficulty', 'n_hints'):
+            setattr(u, name, int(value))
+        elif name in ('skipped_puzzle', 'nao_helping'):
+            setattr(u, name, bool(value))
+        else:
+            setattr(u, name, value)
+    return u
+
+
+def get_rld_value(rld, name):
+    """ returns the value of the attribute "name" of the real life data as a number
+
+    Parameters
+    ----------
+    rld : experimentNao.declare_model.chess_interaction_data.ChessInteractionData
+    name : str
+
+    Returns
+    -------
+    float
+    """
+    if name == 'n_wrong_attempts':
+        return float(sum(rld.n_wrong_attempts))
+    return float(getattr(rld, name))
+
+
+def get_bracket(value, points):
+    """ returns the nodes of one axis around "value", together with their interpolation weights. Only the nodes with
+    non-zero weight are returned. If the value is outside the axis, None is returned.
+
+    Parameters
+    ----------
+    value : float
+    points : numpy.ndarray
+
+    Returns
+    -------
+    Union[None, List[Tuple[int, float]]]
+    """
+    if value < points[0] or value > points[-1]:
+        return None
+    i = int(np.searchsorted(points, value, side='right')) - 1
+    if i == len(points) - 1 or value == points[i]:
+        return [(i, 1.0)]
+    t = (value - points[i]) / (points[i + 1] - points[i])
+    return [(i, 1 - t), (i + 1, t)]
+
+
+def get_margin_of_selected_action(actions):
+    """ returns the difference between the cost of the action that the controller selects and the cost of the next
+    best action that respects the same constraints. The selection follows the same rules as
+    "ModelBasedController.get_next_action".
+
+    Parameters
+    ----------
+    actions : List[experimentNao.behaviour_controllers.robot_action.RobotAction]
+
+    Returns
+    -------
+    float
+    """
+    return get_selection(np.array([act.cost for act in actions]),
+                         np.array([act.respects_hard_constraints for act in actions]),
+                         np.array([act.respects_soft_constraints for act in actions]))[1]
+
+
+def get_selection(costs, respects_hard, respects_soft):
+    """ returns the index of the action that the controller selects, with the same rules as
+    "ModelBasedController.get_next_action", and the difference between its cost and the cost of the next best action
+    that respects the same constraints
+
+    Parameters
+    ----------
+    costs : numpy.ndarray
+    respects_hard : numpy.ndarray
+    respects_soft : numpy.ndarray
+
+    Returns
+    -------
+    Tuple[int, float]
+    """
+    for candidates in (respects_hard & respects_soft, respects_hard, np.ones(len(costs), dtype=bool)):
+        if candidates.any():
+            indexes = np.flatnonzero(candidates)[np.argsort(costs[candidates], kind='stable')]
+            margin = costs[indexes[1]] - costs[indexes[0]] if len(indexes) > 1 else float('inf')
+            return int(indexes[0]), float(margin)
+
+
+def get_policy_table_path(id_config):
+    """ returns the path of the policy table of the model identified with "id_config"
+
+    Parameters
+    ----------
+    id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+
+    Returns
+    -------
+    pathlib.Path
+    """
+    return folder_path.output_folder_path / 'policy_tables' / (id_config.get_model_id_file_name() + '.npz')
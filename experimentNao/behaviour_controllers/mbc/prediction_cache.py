@@ -0,0 +1,154 @@
+from collections import OrderedDict
+
+from experimentNao.behaviour_controllers.mbc.aux_functions import get_all_fast_dyn_vars
+
+
+class PredictionCache:
+    def __init__(self, max_size=5000, state_tolerance=0.01, rld_tolerance=1.0, verify_every=0):
+        """ Memo cache of the predictions of the model-based controller. It maps the (quantised) state of the model,
+        the (quantised) real life data u_{k-1}, and the action to the cost and constraints predicted by propagating the
+        predictive model with that action. Consecutive decision points with (nearly) the same state and inputs are then
+        answered by a lookup instead of a propagation of the predictive model.
+
+        Parameters
+        ----------
+        max_size : int
+            maximum number of predictions stored. When it is exceeded, the least recently used prediction is evicted
+        state_tolerance : float
+            quantisation step of the values of the fast dynamics variables (rational perceptual knowledge, state variables
+            and biases)
+        rld_tolerance : float
+            quantisation step of the continuous real life data (e.g., time to solve)
+        verify_every : int
+            every "verify_every" hits, the prediction is also computed by propagating the model and the error of the
+            cached cost is recorded. If 0, cached predictions are never verified
+        """
+        self.max_size = max_size
+        self.state_tolerance = state_tolerance
+        self.rld_tolerance = rld_tolerance
+        self.verify_every = verify_every
+        self.predictions = OrderedDict()
+        self.hits, self.misses, self.evictions = 0, 0, 0
+        self.cost_errors = []
+        self.constraints_mismatches = 0
+
+    def get_key(self, tom_model, current_rld, action):
+        """ returns the key of the cache for propagating "tom_model" with "action", given the real life data
+        "current_rld". The attributes of the real life data that are set by the action (the rewards) are not part of
+        the key.
+
+        Parameters
+        ----------
+        tom_model : experimentNao.declare_model.declare_entire_model.ToMModelChessSimpleDyn
+        current_rld : experimentNao.declare_model.chess_interaction_data.ChessInteractionData
+        action : experimentNao.behaviour_controllers.robot_action.RobotAction
+
+        Returns
+        -------
+        Tuple
+        """
+        state = tuple(quantise(var.value, self.state_tolerance) for var in get_all_fast_dyn_vars(tom_model))
+        rld = (current_rld.n_hints, quantise(sum(current_rld.n_wrong_attempts), self.rld_tolerance),
+               current_rld.puzzle_difficulty, quantise(current_rld.proportion_of_moves_revealed, self.state_tolerance),
+               quantise(current_rld.time_2_solve, self.rld_tolerance), bool(current_rld.nao_helping),
+               bool(current_rld.skipped_puzzle))
+        return state, rld, action.puzzle_difficulty_level, action.give_reward
+
+    def get(self, key):
+        """ returns the prediction (cost, respects hard constraints, respects soft constraints) stored for "key", or
+        None if there is none. Hits and misses are counted.
+
+        Parameters
+        ----------
+        key : Tuple
+
+        Returns
+        -------
+        Union[None, Tuple[float, bool, bool]]
+        """
+        prediction = self.predictions.get(key)
+        if prediction is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.predictions.move_to_end(key)
+        return prediction
+
+    def put(self, key, cost, respects_hard, respects_soft):
+        """ stores a prediction, evicting the least recently used one if the cache is full
+
+        Parameters
+        ----------
+        key : Tuple
+        cost : float
+        respects_hard : bool
+        respects_soft : bool
+        """
+        self.predictions[key] = (cost, respects_hard, respects_soft)
+        self.predictions.move_to_end(key)
+        if len(self.predictions) > self.max_size:
+            self.predictions.popitem(last=False)
+            self.evictions += 1
+
+    def is_time_to_verify(self):
+        """ whether the last hit should be verified against the propagation of the model
+
+        Returns
+        -------
+        bool
+        """
+        return self.verify_every > 0 and self.hits % self.verify_every == 0
+
+    def add_verification(self, cached_prediction, cost, respects_hard, respects_soft):
+        """ records the error of a cached prediction with respect to the propagation of the model
+
+        Parameters
+        ----------
+        cached_prediction : Tuple[float, bool, bool]
+        cost : float
+        respects_hard : bool
+        respects_soft : bool
+        """
+        self.cost_errors.append(abs(cached_prediction[0] - cost))
+        if cached_prediction[1:] != (respects_hard, respects_soft):
+            self.constraints_mismatches += 1
+
+    def get_hit_rate(self):
+        """ returns the proportion of lookups that were answered by the cache
+
+        Returns
+        -------
+        float
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def get_report(self):
+        """ returns the statistics of the cache as text
+
+        Returns
+        -------
+        str
+        """
+        report = 'Prediction cache: hit rate {:.2f} ({} hits, {} misses, {} evictions, size {})'.format(
+            self.get_hit_rate(), self.hits, self.misses, self.evictions, len(self.predictions))
+        if len(self.cost_errors) > 0:
+            report += '\tcost error mean {:.4f} max {:.4f} ({} verified, {} constraint mismatches)'.format(
+                sum(self.cost_errors) / len(self.cost_errors), max(self.cost_errors), len(self.cost_errors),
+                self.constraints_mismatches)
+        return report
+
+
+def quantise(value, tolerance):
+    """ returns the index of the quantisation interval of "value" with step "tolerance"
+
+    Parameters
+    ----------
+    value : float
+    tolerance : float
+
+    Returns
+    -------
+    int
+    """
+    return int(round(value / tolerance))
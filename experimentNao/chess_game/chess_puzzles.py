@@ -1,54 +1,109 @@
 import random
 
 import path_config
+from experimentNao.chess_game import puzzle_database, puzzle_query
 from experimentNao.interaction import verbose
-from lib import excel_files
 
 
 class Puzzles:
-    def __init__(self, lichess_db=True, interaction_number=None):
+    def __init__(self, lichess_db=True, interaction_number=None, participant_id=None):
         self.lichess_db = lichess_db
-        self.puzzles = []    # list of lists with puzzles; each list as puzzles with a different difficulty
+        self.database = None
+        self.puzzles = []    # indexes (in the database) of the puzzles of each difficulty
         self.get_puzzles_from_file(interaction_number)
-        # Not shown puzzles
+        self.index = puzzle_query.PuzzleIndex(self.database)
+        # Not shown puzzles (if participant_id is given, the puzzles shown in previous sessions are not shown again)
         self.not_shown_puzzles = []
         self.set_not_shown_puzzles()
+        self.shown_puzzles = puzzle_query.ShownPuzzles(self.database, participant_id)
 
     def get_puzzles_from_file(self, interaction_number=None):
         path = path_config.repo_root / 'experimentNao' / 'chess_game'
-        puzzles_dfs = excel_files.get_data_from_excel(path / ('all_puzzles.xlsx' if self.lichess_db else 'all_puzzles_old.xlsx'))
-        for difficulty in range(len(puzzles_dfs)):
-            self.puzzles.append([])             # add new list with a new difficulty to puzzles
-            df = puzzles_dfs[difficulty]
-            if interaction_number is not None:
-                if interaction_number == 1 or interaction_number == 2:
-                    df = df.head(100)
-                elif interaction_number == 3:
-                    df = df.iloc[100:200]
-                elif interaction_number == 4:
-                    df = df.iloc[200:300]
-            for i in range(df.shape[0]):
-                if self.lichess_db:
-                    self.puzzles[difficulty].append(
-                        ChessPuzzle(fen=df.at[i, 'FEN'], number_of_moves=int(df.at[i, 'N moves']),
-                                    type_=df.at[i, 'Themes'], difficulty=difficulty, tag=i,
-                                    sequence_of_moves=df.at[i, 'Moves'], url=df.at[i, 'PuzzleId']))
-                else:
-                    self.puzzles[difficulty].append(ChessPuzzle(fen=df.at[i, 'FEN'], number_of_moves=int(df.at[i, 'N moves']),
-                                                                type_=df.at[i, 'Themes'], difficulty=difficulty, tag=i))
+        self.database = puzzle_database.get_database(path / ('all_puzzles.xlsx' if self.lichess_db
+                                                             else 'all_puzzles_old.xlsx'))
+        first_row, n_rows = 0, None     # only the puzzles of the interaction are used
+        if interaction_number is not None:
+            if interaction_number == 1 or interaction_number == 2:
+                first_row, n_rows = 0, 100
+            elif interaction_number == 3:
+                first_row, n_rows = 100, 100
+            elif interaction_number == 4:
+                first_row, n_rows = 200, 100
+        for difficulty in range(self.database.get_n_difficulties()):
+            puzzles_of_difficulty = self.database.get_puzzles_of_difficulty(difficulty)
+            self.puzzles.append(puzzles_of_difficulty[first_row:first_row + n_rows if n_rows is not None else None])
 
     def set_not_shown_puzzles(self):
         for i in range(len(self.puzzles)):
-            self.not_shown_puzzles.append([i for i in range(0, len(self.puzzles[i]))])
+            self.not_shown_puzzles.append(puzzle_database.PuzzleSampler(self.puzzles[i]))
 
     def get_new_random_puzzle(self, difficulty):
-        puzzle2show = random.choice(self.not_shown_puzzles[difficulty])
-        self.not_shown_puzzles[difficulty].remove(puzzle2show)
-        return self.puzzles[difficulty][puzzle2show]
+        puzzle2show = self.not_shown_puzzles[difficulty].draw()
+        while self.shown_puzzles.was_shown(puzzle2show):     # shown in a previous session or selected by a query
+            puzzle2show = self.not_shown_puzzles[difficulty].draw()
+        self.shown_puzzles.add(puzzle2show)
+        return self.database.get_puzzle(puzzle2show)
+
+    def get_new_puzzle(self, difficulty, themes=(), n_moves=None, rating_band=None):
+        """ returns a random puzzle (not shown yet) of "difficulty" with the properties given, or None if there is none
+
+        Parameters
+        ----------
+        difficulty : int
+        themes : List[str]
+            themes that the puzzle must have (all of them)
+        n_moves : List[int]
+            numbers of moves allowed
+        rating_band : Tuple[int, int]
+            minimum (included) and maximum (excluded) rating
+
+        Returns
+        -------
+        Union[None, ChessPuzzle]
+        """
+        puzzle2show = self.select_new_puzzle(difficulty, themes, n_moves, rating_band)
+        if puzzle2show is None:
+            return None
+        self.shown_puzzles.add(puzzle2show)
+        return self.database.get_puzzle(puzzle2show)
+
+    def select_new_puzzle(self, difficulty, themes=(), n_moves=None, rating_band=None):
+        """ returns the index of a random puzzle (not shown yet) of "difficulty" with the properties given, or None if
+        there is none. The puzzle is not marked as shown (see get_new_puzzle).
+
+        Parameters
+        ----------
+        difficulty : int
+        themes : List[str]
+        n_moves : List[int]
+        rating_band : Tuple[int, int]
+
+        Returns
+        -------
+        Union[None, int]
+        """
+        candidates = self.index.query(difficulty, themes, n_moves, rating_band, within=self.puzzles[difficulty],
+                                      shown_puzzles=self.shown_puzzles)
+        if len(candidates) == 0:
+            return None
+        return int(candidates[random.randrange(len(candidates))])
+
+    def get_numbers_of_moves(self, difficulty):
+        """ returns the numbers of moves of the puzzles of "difficulty"
+
+        Parameters
+        ----------
+        difficulty : int
+
+        Returns
+        -------
+        List[int]
+        """
+        return self.index.get_numbers_of_moves(self.puzzles[difficulty])
 
 
 class ChessPuzzle:
-    def __init__(self, fen, number_of_moves, difficulty, type_, tag=None, sequence_of_moves=None, url=None):
+    def __init__(self, fen, number_of_moves, difficulty, type_, tag=None, sequence_of_moves=None, url=None, index=None):
         self.fen = fen
         self.difficulty = difficulty
         self.type = type_
@@ -56,3 +111,4 @@ class ChessPuzzle:
         self.tag = tag
         self.sequence_of_moves = sequence_of_moves.split(' ') if sequence_of_moves is not None else sequence_of_moves
         self.url = url
+        self.index = index      # index of the puzzle in the puzzle database
@@ -0,0 +1,308 @@
+import queue
+import threading
+import collections
+from concurrent import futures
+
+import chess
+from stockfish import Stockfish
+
+from experimentNao.folder_path import stockfish_path
+
+STOCKFISH_PATH = stockfish_path + "/stockfish_15.1_win_x64_avx2/stockfish-windows-2022-x86-64-avx2"
+STOCKFISH_PARAMETERS = {"Threads": 2, "Minimum Thinking Time": 30}
+
+
+class EngineService:
+    def __init__(self, n_engines=1, depth=18, parameters=None, max_cache_size=10000, path=STOCKFISH_PATH):
+        """ pool of Stockfish processes, started (and warmed up) once, that analyse positions on request. The requests
+        are asynchronous (they return a future with the best move), and the best move of each position analysed is
+        kept in a bounded transposition table, so that the same position is never analysed twice. One service can be
+        shared by several chess engines (e.g., several sessions).
+
+        Parameters
+        ----------
+        n_engines : int
+            number of Stockfish processes (i.e., of positions analysed at the same time)
+        depth : int
+            default depth of the search
+        parameters : Dict[str, Any]
+            parameters of the Stockfish processes. If None, STOCKFISH_PARAMETERS
+        max_cache_size : int
+            maximum number of positions in the transposition table
+        path : str
+            path of the Stockfish executable
+        """
+        self.depth = depth
+        self.max_cache_size = max_cache_size
+        self.engines = queue.Queue()
+        for _ in range(n_engines):
+            engine = Stockfish(path=path, depth=depth,
+                               parameters=parameters if parameters is not None else STOCKFISH_PARAMETERS)
+            engine.get_best_move_time(10)       # warm up (loads the network and allocates the hash table)
+            self.engines.put(engine)
+        self.executor = futures.ThreadPoolExecutor(max_workers=n_engines)
+        self.lock = threading.Lock()
+        self.cache = collections.OrderedDict()  # FEN -> (depth, time, best move)
+        self.running = {}                       # searches running, to not search the same position twice
+        self.n_requests, self.n_cache_hits = 0, 0
+
+    def submit(self, fen, depth=None, time_ms=None):
+        """ requests the best move of the position "fen". The search stops at "depth", or after "time_ms" milliseconds
+        if "time_ms" is given.
+
+        Parameters
+        ----------
+        fen : str
+        depth : int
+            if None, the default depth of the service
+        time_ms : int
+
+        Returns
+        -------
+        concurrent.futures.Future
+            future with the best move (as a string, e.g., 'e2e4'), or None if there is no legal move
+        """
+        depth = depth if depth is not None else self.depth
+        with self.lock:
+            self.n_requests += 1
+            best_move = self.get_from_cache(fen, depth, time_ms)
+            if best_move is not None:
+                self.n_cache_hits += 1
+                future = futures.Future()
+                future.set_result(best_move)
+                return future
+            if (fen, depth, time_ms) not in self.running:
+                self.running[(fen, depth, time_ms)] = self.executor.submit(self.search, fen, depth, time_ms)
+            return self.running[(fen, depth, time_ms)]
+
+    def get_best_move(self, fen, depth=None, time_ms=None):
+        """ returns the best move of the position "fen" (waiting for the search, see submit)
+
+        Parameters
+        ----------
+        fen : str
+        depth : int
+        time_ms : int
+
+        Returns
+        -------
+        Union[None, str]
+        """
+        return self.submit(fen, depth, time_ms).result()
+
+    def search(self, fen, depth, time_ms):
+        """ searches the best move of the position "fen" with one of the Stockfish processes of the pool
+
+        Parameters
+        ----------
+        fen : str
+        depth : int
+        time_ms : int
+
+        Returns
+        -------
+        Union[None, str]
+        """
+        try:
+            engine = self.engines.get()
+            try:
+                engine.set_fen_position(fen)
+                if time_ms is not None:
+                    best_move = engine.get_best_move_time(time_ms)
+                else:
+                    engine.set_depth(depth)
+                    best_move = engine.get_best_move()
+            finally:
+                self.engines.put(engine)
+            with self.lock:
+                self.cache[fen] = (depth, time_ms, best_move)
+                self.cache.move_to_end(fen)
+                if len(self.cache) > self.max_cache_size:
+                    self.cache.popitem(last=False)
+        finally:    # also when the search fails, so that the position can be searched again
+            with self.lock:
+                del self.running[(fen, depth, time_ms)]
+        return best_move
+
+    def get_from_cache(self, fen, depth, time_ms):
+        """ returns the best move of "fen" in the transposition table, if it was found with a search at least as deep
+        as the one requested (any search is used by time limited requests), or None otherwise
+
+        Parameters
+        ----------
+        fen : str
+        depth : int
+        time_ms : int
+
+        Returns
+        -------
+        Union[None, str]
+        """
+        if fen not in self.cache:
+            return None
+        cached_depth, cached_time_ms, best_move = self.cache[fen]
+        if time_ms is None and (cached_time_ms is not None or cached_depth < depth):
+            return None
+        self.cache.move_to_end(fen)
+        return best_move
+
+    def get_statistics(self):
+        """ returns the statistics of the service
+
+        Returns
+        -------
+        Dict[str, float]
+        """
+        with self.lock:
+            return {'n requests': self.n_requests, 'cache hit rate': self.n_cache_hits / max(self.n_requests, 1),
+                    'cached positions': len(self.cache), 'searches running': len(self.running)}
+
+    def shutdown(self):
+        """ waits for the searches running and stops the Stockfish processes
+
+        """
+        self.executor.shutdown(wait=True)
+        while not self.engines.empty():
+            self.engines.get().send_quit_command()
+
+
+class PooledStockfish:
+    def __init__(self, service, prefetch=False, depth=None, time_ms=None):
+        """ stand-in of stockfish.Stockfish for one chess engine (with the methods used by
+        experimentNao.chess_game.my_chess_engine.MyChessEngine and the graphic board). The position is kept with the
+        chess package, and the searches are done by the engine service. With "prefetch", the search of the best move of
+        each new position starts as soon as the position is set, so that it runs while the board is displayed and the
+        move is usually ready when it is needed.
+
+        Parameters
+        ----------
+        service : EngineService
+        prefetch : bool
+        depth : int
+        time_ms : int
+        """
+        self.service = service
+        self.prefetch = prefetch
+        self.depth = depth
+        self.time_ms = time_ms
+        self.board = chess.Board()
+        self.best_move_future = None
+
+    def is_fen_valid(self, fen):
+        """ checks whether "fen" is a valid position
+
+        Parameters
+        ----------
+        fen : str
+
+        Returns
+        -------
+        bool
+        """
+        try:
+            return chess.Board(fen).is_valid()
+        except ValueError:
+            return False
+
+    def set_fen_position(self, fen):
+        """ sets the current position
+
+        Parameters
+        ----------
+        fen : str
+        """
+        self.board = chess.Board(fen)
+        self.set_new_position()
+
+    def get_fen_position(self):
+        """ returns the current position
+
+        Returns
+        -------
+        str
+        """
+        return self.board.fen()
+
+    def make_moves_from_current_position(self, moves):
+        """ applies the "moves" to the current position
+
+        Parameters
+        ----------
+        moves : List[str]
+        """
+        for move in moves:
+            self.board.push_uci(move)
+        self.set_new_position()
+
+    def get_what_is_on_square(self, square):
+        """ returns the piece in "square"
+
+        Parameters
+        ----------
+        square : str
+
+        Returns
+        -------
+        Union[None, stockfish.models.Stockfish.Piece]
+        """
+        return get_piece_on_square(self.board, square)
+
+    def get_best_move_async(self):
+        """ requests the best move of the current position
+
+        Returns
+        -------
+        concurrent.futures.Future
+        """
+        if self.best_move_future is None:
+            self.best_move_future = self.service.submit(self.board.fen(), self.depth, self.time_ms)
+        return self.best_move_future
+
+    def get_best_move(self):
+        """ returns the best move of the current position
+
+        Returns
+        -------
+        Union[None, str]
+        """
+        return self.get_best_move_async().result()
+
+    def set_new_position(self):
+        """ discards the search of the previous position and, with prefetch, starts the search of the new one
+
+        """
+        self.best_move_future = None
+        if self.prefetch:
+            self.get_best_move_async()
+
+
+def get_piece_on_square(board, square):
+    """ returns the piece in "square" of "board", as given by stockfish.Stockfish.get_what_is_on_square
+
+    Parameters
+    ----------
+    board : chess.Board
+    square : str
+
+    Returns
+    -------
+    Union[None, stockfish.models.Stockfish.Piece]
+    """
+    piece = board.piece_at(chess.parse_square(square))
+    return Stockfish.Piece(piece.symbol()) if piece is not None else None
+
+
+shared_service = None
+
+
+def get_shared_engine_service():
+    """ returns the engine service shared by all the chess engines of the process (started the first time)
+
+    Returns
+    -------
+    EngineService
+    """
+    global shared_service
+    if shared_service is None:
+        shared_service = EngineService()
+    return shared_service
@@ -1,7 +1,7 @@
 import time
 import tkinter as tk
 
-from PIL import ImageTk, Image
+import chess
 
 from path_config import repo_root
 from experimentNao.chess_game.graphic_board.graphic_chess_pieces import GraphicPiece, PieceType
@@ -27,6 +27,8 @@ class GraphicChessBoard:
         self.list_of_graphic_pieces = []     # list of figures and buttons
         self.figures_grid = None             # create figures grid
         self.create_grid_for_figures()
+        self.drawn_pieces = {}               # (x, y) of each cell -> (symbol of the piece, GraphicPiece) drawn in it
+        self.main_window.sprite_cache.preload(self.get_size_of_figures())
         # draw the board
         self.draw_board()
 
@@ -83,6 +85,7 @@ class GraphicChessBoard:
         ----------
         fen : str
         """
+        pieces = {}
         i, j = 0, 0
         for char in fen:
             if char == ' ':           # Reached the end of board configuration in fen
@@ -92,62 +95,112 @@ class GraphicChessBoard:
                 j += 1
             elif char.isnumeric():    # Stay in the row and skip a number of cells
                 i += int(char)
-            else:                     # Stay in the row and draw a piece; at the end, move to next square (aka column)
-                piece_position = (Point(i, j) if not self.chess_engine.computer_color_white else Point(7 - i, 7 - j))
-                self.draw_piece_in_position(char.lower(), piece_position, 'l' if char.isupper() else 'd')
+            else:                     # Stay in the row and add a piece; at the end, move to next square (aka column)
+                pieces[(i, j) if not self.chess_engine.computer_color_white else (7 - i, 7 - j)] = char
                 i += 1
+        self.update_pieces(pieces)
 
     def draw_pieces_from_board_engine(self):
         """ adds (draws) the pieces to the board given what is saved in the board of self.my_chess_engine
 
         """
-        for i in range(8):
-            for j in range(8):
-                chess_position = self.convert_board_index_into_chess_pos(Point(i, j))
-                in_position = self.chess_engine.stockfish.get_what_is_on_square(chess_position)
-                if in_position is not None:
-                    piece = str(in_position).lower()
-                    piece_name = piece[13] if 'knight' in piece else piece[12]
-                    self.draw_piece_in_position(piece_name, Point(i, j), 'l' if piece[6] == 'w' else 'd')
+        self.update_pieces(self.get_pieces_from_board_engine())
 
     def draw_pieces_before_1st_move_from_board_engine(self, first_move):
         """ adds (draws) the pieces to the board given what is saved in the board of self.my_chess_engine before
         the first move of the opponent
 
         """
-        old_pos, new_pos = first_move[0:2], first_move[2:4]
-        piece_moved = self.chess_engine.stockfish.get_what_is_on_square(new_pos)
-        for i in range(8):
-            for j in range(8):
-                chess_position = self.convert_board_index_into_chess_pos(Point(i, j))
-                in_position = self.chess_engine.stockfish.get_what_is_on_square(chess_position)
-                if chess_position == new_pos:   # do not draw the moved_piece in the new position
-                    assert in_position == piece_moved
-                    in_position = self.chess_engine.piece_taken_before_puzzle_start
-                if chess_position == old_pos:
-                    in_position = piece_moved
-                if in_position is not None:
-                    piece = str(in_position).lower()
-                    piece_name = piece[13] if 'knight' in piece else piece[12]
-                    self.draw_piece_in_position(piece_name, Point(i, j), 'l' if piece[6] == 'w' else 'd')
-
-    def draw_piece_in_position(self, piece_name, position, piece_color):
-        """ draws a piece in its position. It is drawn as a button if it is the player's turn and the color of the piece
-        corresponds to the players color. Otherwise, it is drawn as an image
+        old_pos, new_pos = self.convert_move_into_board_indices(first_move)
+        pieces = self.get_pieces_from_board_engine()
+        pieces[(old_pos.x, old_pos.y)] = pieces.pop((new_pos.x, new_pos.y))    # moved piece goes back to the old pos
+        if self.chess_engine.piece_taken_before_puzzle_start is not None:
+            pieces[(new_pos.x, new_pos.y)] = self.chess_engine.piece_taken_before_puzzle_start.value
+        self.update_pieces(pieces)
+
+    def get_pieces_from_board_engine(self):
+        """ returns the pieces saved in the board of self.my_chess_engine
+
+        Returns
+        -------
+        Dict[Tuple[int, int], str]
+            symbol of the piece (as in a FEN) in each occupied cell (x, y)
+        """
+        pieces = {}
+        for square, piece in self.chess_engine.board.piece_map().items():
+            position = self.convert_chess_pos_into_board_index(chess.square_name(square))
+            pieces[(position.x, position.y)] = piece.symbol()
+        return pieces
+
+    def update_pieces(self, pieces):
+        """ updates the pieces drawn on the board to "pieces". Only the cells whose piece changed (e.g., the cells of
+        the last move) are drawn again; the figures of the other pieces are kept. The moves and takes that were shown
+        to the player are removed.
+
+        Parameters
+        ----------
+        pieces : Dict[Tuple[int, int], str]
+            symbol of the piece (as in a FEN) in each occupied cell (x, y)
+        """
+        humans_turn = self.chess_engine.is_humans_turn()
+        for piece in self.list_of_graphic_pieces:   # remove the buttons of the moves and takes
+            if piece.type != PieceType.OWN_PIECE and piece.button is not None:
+                piece.remove_button()
+        for cell in set(self.drawn_pieces) | set(pieces):
+            symbol, piece = self.drawn_pieces.get(cell, (None, None))
+            if symbol != pieces.get(cell):          # piece in the cell changed --> replace figure
+                if piece is not None:
+                    piece.remove_from_canvas(self.canvas)
+                    del self.drawn_pieces[cell]
+                if cell in pieces:
+                    self.drawn_pieces[cell] = (pieces[cell], self.draw_piece_in_position(
+                        pieces[cell].lower(), Point(*cell), 'l' if pieces[cell].isupper() else 'd', humans_turn))
+            elif piece.type == PieceType.OWN_PIECE:  # same piece --> only (de)activate button
+                self.reset_button_of_own_piece(piece, humans_turn)
+        self.create_grid_for_figures()              # keep only the pieces in the grid and list
+        self.list_of_graphic_pieces = []
+        for _, piece in self.drawn_pieces.values():
+            piece.add_to_graphic_board(self)
+
+    def draw_piece_in_position(self, piece_name, position, piece_color, humans_turn=None):
+        """ draws a piece in its position. It is drawn as a button if the color of the piece corresponds to the
+        players color (the button can only be clicked in the player's turn). Otherwise, it is drawn as an image
 
         Parameters
         ----------
         piece_name : Union[str, List[str]]
         position : lib.util.Point
         piece_color : str
+        humans_turn : Union[None, bool]
+            whether it is the player's turn; if None, it is checked in the chess engine
+
+        Returns
+        -------
+        experimentNao.chess_game.graphic_board.graphic_chess_pieces.GraphicPiece
         """
         figure_name = 'Chess_' + piece_name + piece_color + self.get_color_of_square(position) + '45.svg.png'
-        if self.chess_engine.computer_color_white == (piece_color == 'd') and self.chess_engine.is_humans_turn():
-            img = self.create_image_for_cell(figure_name=figure_name)       # if it is player's piece, and player's turn
-            self.draw_button_w_image_in_cell(position, img, PieceType.OWN_PIECE,         # --> draw button
-                                             command=lambda: self.button_select_piece(position))
-        else:                                                  # if the piece belongs to the computer or computer's turn
-            self.draw_image_in_cell(position, self.create_image_for_cell(figure_name))   # --> just draw the piece
+        img = self.create_image_for_cell(figure_name=figure_name)
+        if self.chess_engine.computer_color_white == (piece_color == 'd'):    # if it is player's piece --> button
+            piece = self.draw_button_w_image_in_cell(position, img, PieceType.OWN_PIECE, command=None)
+            self.reset_button_of_own_piece(piece, humans_turn)
+            return piece
+        else:                                               # if the piece belongs to the computer --> just draw it
+            return self.draw_image_in_cell(position, img)
+
+    def reset_button_of_own_piece(self, piece, humans_turn=None):
+        """ activates the button of a piece of the player, so that it selects the piece when clicked, if it is the
+        player's turn. Otherwise, clicking the button does nothing
+
+        Parameters
+        ----------
+        piece : experimentNao.chess_game.graphic_board.graphic_chess_pieces.GraphicPiece
+        humans_turn : Union[None, bool]
+        """
+        if humans_turn is None:
+            humans_turn = self.chess_engine.is_humans_turn()
+        position = piece.position_in_board
+        piece.button.configure(state=tk.NORMAL,
+                               command=(lambda: self.button_select_piece(position)) if humans_turn else '')
 
     def draw_button_w_image_in_cell(self, position, img, piece_type, command, bd=0, bg_color='white'):
         """ draw a button with an image in a cell of the chess board
@@ -166,10 +219,14 @@ class GraphicChessBoard:
             size of the border of the button
         bg_color : str
             color of the border of the button
+
+        Returns
+        -------
+        experimentNao.chess_game.graphic_board.graphic_chess_pieces.GraphicPiece
         """
         button = tk.Button(self.canvas, image=img, command=command, bd=bd, bg=bg_color, disabledforeground='green')
         button.place(x=position.x * self.size_of_each_square, y=position.y * self.size_of_each_square)
-        GraphicPiece(img, position, self, button, piece_type)  # save image and button in object
+        return GraphicPiece(img, position, self, button, piece_type)  # save image and button in object
 
     def draw_image_in_cell(self, position, img, piece_type=PieceType.OPPONENT_PIECE):
         """ draw image in a cell of the chess board
@@ -180,13 +237,19 @@ class GraphicChessBoard:
             position of cell
         img : PIL.ImageTk.PhotoImage
         piece_type : Union[str, experimentNao.chess_game.graphic_board.graphic_chess_pieces.PieceType]
+
+        Returns
+        -------
+        experimentNao.chess_game.graphic_board.graphic_chess_pieces.GraphicPiece
         """
-        self.canvas.create_image(position.x * self.size_of_each_square + self.boundary_pixels,
-                                 position.y * self.size_of_each_square + self.boundary_pixels, image=img, anchor=tk.NW)
-        GraphicPiece(img, position, self, None, piece_type)  # save image (None for button) in grid
+        item = self.canvas.create_image(position.x * self.size_of_each_square + self.boundary_pixels,
+                                        position.y * self.size_of_each_square + self.boundary_pixels, image=img,
+                                        anchor=tk.NW)
+        return GraphicPiece(img, position, self, None, piece_type, item)  # save image (None for button) in grid
 
     def create_image_for_cell(self, figure_name, size_reduction=0):
-        """ create and resize image to be placed in a cell of the chess board
+        """ returns the image to be placed in a cell of the chess board, from the sprite cache of the window (the
+        figure is only read and resized the first time)
 
         Parameters
         ----------
@@ -199,9 +262,20 @@ class GraphicChessBoard:
         -------
         PIL.ImageTk.PhotoImage
         """
-        figs_size = int(self.size_of_each_square - self.boundary_pixels * 2 - size_reduction)
-        img = ImageTk.PhotoImage(Image.open(self.main_window.path4img/figure_name).resize((figs_size, figs_size)))
-        return img
+        return self.main_window.sprite_cache.get_sprite(figure_name, self.get_size_of_figures(size_reduction))
+
+    def get_size_of_figures(self, size_reduction=0):
+        """ returns the size (in pixels) of the figures drawn in the cells of the chess board
+
+        Parameters
+        ----------
+        size_reduction : int
+
+        Returns
+        -------
+        int
+        """
+        return int(self.size_of_each_square - self.boundary_pixels * 2 - size_reduction)
 
     def button_select_piece(self, position_on_board):
         """ command of the button that is run when player clicks in a piece. Shows the possible next moves that start
@@ -300,12 +374,10 @@ class GraphicChessBoard:
             self.chess_engine.number_wrong_attempts_in_move += 1
 
     def re_draw_board(self):
-        """ draws the chess board again. To do that, removes all the buttons and images from the canvas, and draws
-        the pieces from the board engine. Useful after performing a move.
+        """ draws the chess board again, from the board engine. Only the cells that changed (e.g., in the last move)
+        are drawn again, so that the board does not flicker. Useful after performing a move.
 
         """
-        self.remove_all_buttons()
-        self.clear_all_images_and_buttons()     # clear current board
         self.draw_pieces_from_board_engine()    # draw board after the move
 
     def highlight_move(self, move, color='green'):
@@ -385,6 +457,9 @@ class GraphicChessBoard:
         """ clears all images and buttons from the canvas
 
         """
+        for piece in self.list_of_graphic_pieces:
+            piece.remove_from_canvas(self.canvas)
+        self.drawn_pieces = {}
         self.create_grid_for_figures()
         self.list_of_graphic_pieces = []
 
@@ -9,7 +9,7 @@ class PieceType(Enum):
 
 
 class GraphicPiece:
-    def __init__(self, image, position, graphic_board, button=None, type_=PieceType.OWN_PIECE):
+    def __init__(self, image, position, graphic_board, button=None, type_=PieceType.OWN_PIECE, canvas_item=None):
         """ graphic piece of the chess board. Corresponds to an element of the game that has to be visually represented,
         and it can be either a piece (own or of the opponent) or a move. It can be represented by a button or a static
         image.
@@ -27,8 +27,11 @@ class GraphicPiece:
             button that is associated with the element. In case element is a static figure, button is 'None'
         type_ : Union[str, experimentNao.chess_game.graphic_board.graphic_chess_pieces.PieceType]
             type of the element
+        canvas_item : Union[None, int]
+            id of the image in the canvas of the board, in case the element is a static figure
         """
         self.button = button
+        self.canvas_item = canvas_item
         self.image = image
         self.type = type_        # type 'own_piece', 'opponent_piece', 'move'
         self.position_in_board = position
@@ -50,6 +53,19 @@ class GraphicPiece:
         self.button.destroy()
         self.button = None
 
+    def remove_from_canvas(self, canvas):
+        """ destroy the button or delete the image of the Figure element
+
+        Parameters
+        ----------
+        canvas : tkinter.Canvas
+        """
+        if self.button is not None:
+            self.remove_button()
+        if self.canvas_item is not None:
+            canvas.delete(self.canvas_item)
+            self.canvas_item = None
+
     def add_to_graphic_board(self, graphic_board):
         graphic_board.figures_grid[self.position_in_board.x][self.position_in_board.y] = self
         graphic_board.list_of_graphic_pieces.append(self)
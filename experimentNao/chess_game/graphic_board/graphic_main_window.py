@@ -1,5 +1,7 @@
 import time
 
+from PIL import ImageTk, Image
+
 from experimentNao.chess_game.graphic_board import monitors_info
 from lib import graphic_interface
 from lib.util import Point
@@ -13,6 +15,7 @@ class MainWindowChess(graphic_interface.MainWindow):
         self.side_panel_size = Point(self.window_size.x - self.chess_board_size.x, self.chess_board_size.y)
         self.colors = ColorPalette()
         self.path4img = repo_root/'experimentNao'/'chess_game'/'graphic_board'/'pieces_figures'
+        self.sprite_cache = SpriteCache(self.path4img)      # shared by the boards of all the puzzles
         # Types of texts:
         self.texts = [None] * 3       # 0: instruction    # 1: what colour to play    # 2: ask for help
         self.instruction = Instruction4Player('Helvetica 20 bold', 'Choose your best move!',
@@ -108,6 +111,47 @@ class ColorPalette:
         self.very_dark = '#7c644c'
 
 
+class SpriteCache:
+    def __init__(self, path4img):
+        """ cache of the figures of the chess board (pieces and moves), which are read and resized only once for each
+        size of the cells, and then reused by all the boards drawn in the window
+
+        Parameters
+        ----------
+        path4img : pathlib.Path
+            folder with the figures
+        """
+        self.path4img = path4img
+        self.sprites = {}       # (name of the figure, size) -> image
+
+    def get_sprite(self, figure_name, size):
+        """ returns the figure resized to "size" x "size" pixels, reading it only the first time
+
+        Parameters
+        ----------
+        figure_name : str
+        size : int
+
+        Returns
+        -------
+        PIL.ImageTk.PhotoImage
+        """
+        if (figure_name, size) not in self.sprites:
+            with Image.open(self.path4img/figure_name) as img:
+                self.sprites[(figure_name, size)] = ImageTk.PhotoImage(img.resize((size, size)))
+        return self.sprites[(figure_name, size)]
+
+    def preload(self, size):
+        """ reads and resizes all the figures for cells of "size" pixels, so that no figure is read during the puzzles
+
+        Parameters
+        ----------
+        size : int
+        """
+        for figure in sorted(self.path4img.glob('*.png')):
+            self.get_sprite(figure.name, size)
+
+
 class Instruction4Player:
     def __init__(self, font, text, y_pos, tag):
         self.font = font
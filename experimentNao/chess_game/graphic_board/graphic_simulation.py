@@ -16,6 +16,7 @@ class GraphicSimulation:
         self.interaction_mode = interaction_mode
         self.microphone_needs_reset = False
         self.counter = counter
+        self.event_loop = None      # if None, the window is updated in loops until the events happen
         self.main_window.update()
 
     def show_board_ask_for_move(self, current_move, last_move):
@@ -61,8 +62,7 @@ class GraphicSimulation:
             self.run_simulation(last_move)                              # Run simulation again
 
     def run_simulation(self, last_move):
-        while not self.chess_engine.move_chosen:
-            self.main_window.update()
+        self.wait_until(lambda: self.chess_engine.move_chosen)
         if last_move:
             self.finish_puzzle_simulation()
 
@@ -80,6 +80,28 @@ class GraphicSimulation:
         self.graphic_chess_board.re_draw_board()
         self.main_window.root.after(100, self.main_window.update())
 
+    def wait_until(self, condition):
+        """ keeps the window running until "condition" is true
+
+        Parameters
+        ----------
+        condition : function
+        """
+        if self.event_loop is not None:
+            self.event_loop.wait_until(condition)
+        else:
+            while not condition():
+                self.main_window.update()
+
+    def set_event_loop(self, event_loop_):
+        """ sets the event loop that runs the window while the simulation waits for the participant
+
+        Parameters
+        ----------
+        event_loop_ : lib.event_loop.TkEventLoop
+        """
+        self.event_loop = event_loop_
+
     def set_counter(self, counter):
         self.counter = counter
 
@@ -89,8 +111,7 @@ class GraphicSimulation:
     def check_for_requests(self):
         self.participant_requests.request_graphic_check_in_progress = True
         self.main_window.show_request_options(self.participant_requests.get_requests(), self.confirm_request)
-        while self.participant_requests.request_graphic_check_in_progress:
-            self.main_window.update()
+        self.wait_until(lambda: not self.participant_requests.request_graphic_check_in_progress)
         self.main_window.remove_canvas()
         self.main_window.update()
 
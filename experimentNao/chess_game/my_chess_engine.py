@@ -1,13 +1,13 @@
-from stockfish import Stockfish
 import chess
 
-from experimentNao.chess_game import chess_puzzles
+from experimentNao.chess_game import chess_puzzles, engine_service
 from experimentNao.chess_game.graphic_board import graphic_simulation
-from experimentNao.folder_path import stockfish_path
+from lib import event_loop
 
 
-class MyChessEngine:
-    def __init__(self, current_difficulty=0, interaction_mode=False, lichess_db=True, interaction_number=None):
+class MyChessEngine(event_loop.FutureWaiter):
+    def __init__(self, current_difficulty=0, interaction_mode=False, lichess_db=True, interaction_number=None,
+                 participant_id=None, engine_service_=None):
         """ my chess engine that combines stockfish and the chess packages. It is optimized to play puzzles.
 
         Parameters
@@ -16,14 +16,19 @@ class MyChessEngine:
             current difficulty of the puzzle
         interaction_mode : bool
             whether we are in interaction mode (for participants) where a graphic board is presented
+        participant_id : str
+            if given, the puzzles shown to the participant are not shown again in the next sessions
+        engine_service_ : experimentNao.chess_game.engine_service.EngineService
+            pool of Stockfish processes that searches the best moves. If None, the pool shared by the process
         """
-        self.path = stockfish_path + "/stockfish_15.1_win_x64_avx2/stockfish-windows-2022-x86-64-avx2"
-        # Engines
-        self.stockfish = Stockfish(path=self.path, depth=18, parameters={"Threads": 2, "Minimum Thinking Time": 30})
+        # Engines (the best moves are only searched when the puzzles do not have their sequence of moves)
+        self.engine_service = engine_service_ if engine_service_ is not None \
+            else engine_service.get_shared_engine_service()
+        self.stockfish = engine_service.PooledStockfish(self.engine_service, prefetch=not lichess_db)
         self.board = chess.Board()
         self.lichess_db = lichess_db
         # Puzzles
-        self.puzzles = chess_puzzles.Puzzles(lichess_db, interaction_number)
+        self.puzzles = chess_puzzles.Puzzles(lichess_db, interaction_number, participant_id)
         self.current_puzzle = None
         self.current_move_in_puzzle = 0
         self.current_difficulty = current_difficulty
@@ -45,11 +50,18 @@ class MyChessEngine:
                 self.graphic_simulation.show_board_ask_for_move(current_move, last_move)
             self.display_engine_best_move = lambda best_move: self.graphic_simulation.run_computer_move(best_move)
 
-    def set_new_puzzle(self):
+    def set_new_puzzle(self, n_moves=None):
         """ sets the puzzle to be played next
 
+        Parameters
+        ----------
+        n_moves : List[int]
+            numbers of moves allowed for the puzzle. If None, any puzzle of the current difficulty can be played
         """
-        self.current_puzzle = self.puzzles.get_new_random_puzzle(self.current_difficulty)
+        self.current_puzzle = self.puzzles.get_new_puzzle(self.current_difficulty, n_moves=n_moves) \
+            if n_moves is not None else None
+        if self.current_puzzle is None:
+            self.current_puzzle = self.puzzles.get_new_random_puzzle(self.current_difficulty)
         self.set_new_board_position(self.current_puzzle.fen)
         if self.lichess_db:
             first_move = self.current_puzzle.sequence_of_moves[0]
@@ -62,6 +74,22 @@ class MyChessEngine:
         self.current_player_legal_moves = []
         self.current_move_in_puzzle = 0
 
+    def set_prepared_puzzle(self, prepared_puzzle):
+        """ sets the puzzle to be played next from a puzzle already prepared (see
+        experimentNao.chess_game.puzzle_prefetcher), which is the same as set_new_puzzle without selecting the puzzle
+        and setting up its board
+
+        Parameters
+        ----------
+        prepared_puzzle : experimentNao.chess_game.puzzle_prefetcher.PreparedPuzzle
+        """
+        self.current_puzzle = prepared_puzzle.puzzle
+        self.set_new_board_position(prepared_puzzle.fen)
+        self.piece_taken_before_puzzle_start = prepared_puzzle.piece_taken_before_puzzle_start
+        self.computer_color_white = prepared_puzzle.computer_color_white
+        self.current_player_legal_moves = []
+        self.current_move_in_puzzle = 0
+
     def run_puzzle(self, select_puzzle=True):
         """ runs a new puzzle: gets a puzzle from the database, and runs it for the right amount of moves.
 
@@ -105,7 +133,7 @@ class MyChessEngine:
         """ get the best move from stockfish and apply it to the board
 
         """
-        best_move = self.stockfish.get_best_move()
+        best_move = self.get_best_move()
         self.apply_move(best_move)
         self.display_engine_best_move(best_move)
         return best_move
@@ -192,7 +220,18 @@ class MyChessEngine:
         if self.lichess_db:
             self.ideal_move = self.user_next_move
         else:
-            self.ideal_move = self.stockfish.get_best_move()
+            self.ideal_move = self.get_best_move()
+
+    def get_best_move(self):
+        """ returns the best move of the current position, searched by the engine service (waiting for it with
+        self.wait_for)
+
+        Returns
+        -------
+        Union[None, str]
+        """
+        future = self.stockfish.get_best_move_async()
+        return self.wait_for(future)
 
     def get_positions_of_ideal_move(self):
         """ converts the ideal move into the positions that are part of the move (position where the moved piece is and
@@ -0,0 +1,433 @@
+import os
+import json
+import random
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from experimentNao.chess_game import chess_puzzles
+from lib import excel_files
+
+DATABASE_VERSION = 2
+STRING_COLUMNS = ('FEN', 'Moves', 'Themes', 'PuzzleId')
+# ranges of lichess ratings of each difficulty (as in all_puzzles.xlsx), used to compile the lichess .csv database
+DIFFICULTY_RATINGS = ((600, 800), (920, 1120), (1241, 1440), (1561, 1760), (1880, 2080), (2200, 2400))
+CSV_CHUNK_SIZE = 200000
+
+
+class PuzzleDatabase:
+    def __init__(self, path):
+        """ compiled (binary) database of puzzles. Each column is stored in its own file, and the files are memory
+        mapped, so that only the puzzles used are read from disk. The strings (FEN, moves, themes and id) are stored as
+        one array of bytes per column and the offsets of each puzzle in that array. The puzzles are sorted by
+        difficulty, and indexed by difficulty and by theme.
+
+        Parameters
+        ----------
+        path : pathlib.Path
+            folder of the database (see compile_database)
+        """
+        self.path = path
+        with open(path / 'header.json') as file:
+            self.header = json.load(file)
+        assert self.header['version'] == DATABASE_VERSION
+        self.strings = {column: load_array(path, column + '.bytes') for column in STRING_COLUMNS}
+        self.offsets = {column: load_array(path, column + '.offsets') for column in STRING_COLUMNS}
+        self.n_moves = load_array(path, 'n_moves')
+        self.ratings = load_array(path, 'ratings')
+        self.rows = load_array(path, 'rows')
+        self.difficulty_offsets = load_array(path, 'difficulty_offsets')
+        self.themes = {theme: i for i, theme in enumerate(self.header['themes'])}
+        self.theme_offsets = load_array(path, 'theme_offsets')
+        self.theme_puzzles = load_array(path, 'theme_puzzles')
+        self.key_hashes = load_array(path, 'key_hashes')      # sorted, to find puzzles by their key
+        self.key_hashes_order = load_array(path, 'key_hashes_order')
+
+    def get_n_puzzles(self):
+        """ returns the number of puzzles of the database
+
+        Returns
+        -------
+        int
+        """
+        return self.header['n_puzzles']
+
+    def get_n_difficulties(self):
+        """ returns the number of difficulties of the puzzles
+
+        Returns
+        -------
+        int
+        """
+        return len(self.difficulty_offsets) - 1
+
+    def get_puzzles_of_difficulty(self, difficulty):
+        """ returns the range of the indexes of the puzzles with "difficulty" (in the order of the source file)
+
+        Parameters
+        ----------
+        difficulty : int
+
+        Returns
+        -------
+        range
+        """
+        return range(int(self.difficulty_offsets[difficulty]), int(self.difficulty_offsets[difficulty + 1]))
+
+    def get_puzzles_of_theme(self, theme):
+        """ returns the indexes of the puzzles with "theme"
+
+        Parameters
+        ----------
+        theme : str
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        if theme not in self.themes:
+            return np.empty(0, dtype=np.int64)
+        i = self.themes[theme]
+        return self.theme_puzzles[self.theme_offsets[i]:self.theme_offsets[i + 1]]
+
+    def get_string(self, column, index):
+        """ returns the string of the column "column" of the puzzle "index"
+
+        Parameters
+        ----------
+        column : str
+        index : int
+
+        Returns
+        -------
+        str
+        """
+        offsets = self.offsets[column]
+        return self.strings[column][offsets[index]:offsets[index + 1]].tobytes().decode('utf-8')
+
+    def get_key(self, index):
+        """ returns the key of the puzzle "index", which identifies it even if the database is compiled again: its id,
+        or its FEN when the puzzles have no id
+
+        Parameters
+        ----------
+        index : int
+
+        Returns
+        -------
+        str
+        """
+        key = self.get_string('PuzzleId', index)
+        return key if key != '' else self.get_string('FEN', index)
+
+    def find_puzzles(self, keys):
+        """ returns the indexes of the puzzles with "keys" (the keys not found in the database are ignored)
+
+        Parameters
+        ----------
+        keys : List[str]
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        hashes = np.array([hash_key(key) for key in keys], dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.key_hashes, hashes), max(len(self.key_hashes) - 1, 0))
+        found = self.key_hashes[positions] == hashes if len(self.key_hashes) > 0 else np.zeros(len(keys), dtype=bool)
+        return np.asarray(self.key_hashes_order[positions[found]], dtype=np.int64)
+
+    def get_difficulty(self, index):
+        """ returns the difficulty of the puzzle "index"
+
+        Parameters
+        ----------
+        index : int
+
+        Returns
+        -------
+        int
+        """
+        return int(np.searchsorted(self.difficulty_offsets, index, side='right')) - 1
+
+    def get_puzzle(self, index):
+        """ returns the puzzle "index"
+
+        Parameters
+        ----------
+        index : int
+
+        Returns
+        -------
+        experimentNao.chess_game.chess_puzzles.ChessPuzzle
+        """
+        moves, url = self.get_string('Moves', index), self.get_string('PuzzleId', index)
+        return chess_puzzles.ChessPuzzle(fen=self.get_string('FEN', index), number_of_moves=int(self.n_moves[index]),
+                                         difficulty=self.get_difficulty(index),
+                                         type_=self.get_string('Themes', index), tag=int(self.rows[index]),
+                                         sequence_of_moves=moves if moves != '' else None,
+                                         url=url if url != '' else None, index=index)
+
+
+class PuzzleSampler:
+    def __init__(self, indexes):
+        """ draws puzzles without replacement from "indexes", in O(1) per draw. It is a Fisher-Yates shuffle done
+        one draw at a time, in which only the swapped positions are stored.
+
+        Parameters
+        ----------
+        indexes : Union[range, numpy.ndarray]
+        """
+        self.indexes = indexes
+        self.n_not_shown = len(indexes)
+        self.swaps = {}
+
+    def draw(self):
+        """ draws one of the puzzles not shown yet (with the random module, as the rest of the interaction)
+
+        Returns
+        -------
+        int
+            index of the puzzle in the database
+        """
+        if self.n_not_shown == 0:
+            raise IndexError('All the puzzles were already shown')
+        position = random.randrange(self.n_not_shown)
+        self.n_not_shown -= 1
+        drawn = self.swaps.get(position, position)
+        self.swaps[position] = self.swaps.pop(self.n_not_shown, self.n_not_shown)
+        return int(self.indexes[drawn])
+
+    def get_n_not_shown(self):
+        """ returns the number of puzzles not shown yet
+
+        Returns
+        -------
+        int
+        """
+        return self.n_not_shown
+
+
+def get_database(source_path):
+    """ returns the compiled database of the puzzles of "source_path", which is compiled first if it does not exist
+    or it is older than the source file
+
+    Parameters
+    ----------
+    source_path : pathlib.Path
+        excel file (one sheet per difficulty) or lichess .csv database
+
+    Returns
+    -------
+    PuzzleDatabase
+    """
+    path = get_database_path(source_path)
+    header_path = path / 'header.json'
+    if not header_path.exists() or os.path.getmtime(header_path) < os.path.getmtime(source_path) or \
+            get_version_of_database(path) != DATABASE_VERSION:
+        compile_database(source_path, path)
+    return PuzzleDatabase(path)
+
+
+def get_database_path(source_path):
+    """ returns the folder of the compiled database of the puzzles of "source_path"
+
+    Parameters
+    ----------
+    source_path : pathlib.Path
+
+    Returns
+    -------
+    pathlib.Path
+    """
+    return source_path.parent / (source_path.stem + '_db')
+
+
+def compile_database(source_path, path):
+    """ compiles the puzzles of "source_path" into a binary database in the folder "path". The source is read in
+    chunks (one sheet of the excel file, or CSV_CHUNK_SIZE rows of the lichess .csv database), so that databases with
+    millions of puzzles do not have to fit in memory.
+
+    Parameters
+    ----------
+    source_path : pathlib.Path
+        excel file (one sheet per difficulty) or lichess .csv database
+    path : pathlib.Path
+    """
+    os.makedirs(path, exist_ok=True)
+    string_files = {column: open(path / (column + '.bytes.tmp'), 'wb') for column in STRING_COLUMNS}
+    lengths = {column: [] for column in STRING_COLUMNS}
+    n_moves, ratings, rows, difficulties, themes, key_hashes = [], [], [], [], [], []
+    for df, difficulty in get_chunks_of_source(source_path):
+        keys = df['PuzzleId'].fillna('').astype(str) if 'PuzzleId' in df.columns else pd.Series([''] * len(df))
+        keys = keys.where(keys != '', df['FEN'].astype(str).to_numpy())
+        key_hashes.append(np.fromiter((hash_key(key) for key in keys), dtype=np.int64, count=len(df)))
+        for column in STRING_COLUMNS:
+            values = [value.encode('utf-8') for value in df[column].fillna('').astype(str)] \
+                if column in df.columns else [b''] * len(df)
+            string_files[column].write(b''.join(values))
+            lengths[column].append(np.fromiter((len(value) for value in values), dtype=np.int64, count=len(values)))
+        n_moves.append(df['N moves'].to_numpy(dtype=np.int16))
+        ratings.append(df['Rating'].to_numpy(dtype=np.int16) if 'Rating' in df.columns
+                       else np.zeros(len(df), dtype=np.int16))
+        rows.append(df.index.to_numpy(dtype=np.int64))
+        difficulties.append(difficulty)
+        themes.append(df['Themes'].fillna('').astype(str).to_numpy() if 'Themes' in df.columns
+                      else np.full(len(df), '', dtype=object))
+    for file in string_files.values():
+        file.close()
+    difficulties, themes = np.concatenate(difficulties), np.concatenate(themes)
+    order = np.argsort(difficulties, kind='stable')     # sorted by difficulty, keeping the order of the source
+    for column in STRING_COLUMNS:
+        write_strings_in_order(path, column, np.concatenate(lengths[column]), order)
+    save_array(path, 'n_moves', np.concatenate(n_moves)[order])
+    save_array(path, 'ratings', np.concatenate(ratings)[order])
+    save_array(path, 'rows', np.concatenate(rows)[order])
+    n_difficulties = int(difficulties.max()) + 1 if len(difficulties) > 0 else 0
+    save_array(path, 'difficulty_offsets',
+               np.concatenate([[0], np.cumsum(np.bincount(difficulties, minlength=n_difficulties))]).astype(np.int64))
+    theme_names = save_theme_index(path, themes[order])
+    key_hashes = np.concatenate(key_hashes)[order]
+    key_hashes_order = np.argsort(key_hashes, kind='stable')
+    save_array(path, 'key_hashes', key_hashes[key_hashes_order])
+    save_array(path, 'key_hashes_order', key_hashes_order.astype(np.int64))
+    with open(path / 'header.json.tmp', 'w') as file:
+        json.dump({'version': DATABASE_VERSION, 'source': str(source_path), 'n_puzzles': len(order),
+                   'themes': theme_names}, file)
+    os.replace(path / 'header.json.tmp', path / 'header.json')      # the database is complete
+
+
+def get_version_of_database(path):
+    """ returns the version of the compiled database in the folder "path"
+
+    Parameters
+    ----------
+    path : pathlib.Path
+
+    Returns
+    -------
+    int
+    """
+    with open(path / 'header.json') as file:
+        return json.load(file)['version']
+
+
+def hash_key(key):
+    """ returns the (64 bits) hash of the key of a puzzle
+
+    Parameters
+    ----------
+    key : str
+
+    Returns
+    -------
+    int
+    """
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little', signed=True)
+
+
+def get_chunks_of_source(source_path):
+    """ iterates over the chunks of puzzles of "source_path", with the difficulty of each puzzle. The index of each chunk
+    is the row of each puzzle in the source (in its sheet, for the excel files).
+
+    Parameters
+    ----------
+    source_path : pathlib.Path
+
+    Returns
+    -------
+    Iterator[Tuple[pandas.core.frame.DataFrame, numpy.ndarray]]
+    """
+    if source_path.suffix == '.xlsx':
+        with excel_files.LazyWorkbook(source_path) as workbook:
+            for difficulty, sheet_name in enumerate(workbook.get_sheet_names()):
+                df = workbook.get_sheet(sheet_name)
+                yield df, np.full(len(df), difficulty, dtype=np.int64)
+    else:
+        row = 0
+        for df in pd.read_csv(source_path, chunksize=CSV_CHUNK_SIZE):
+            df.index = pd.RangeIndex(row, row + len(df))
+            row += len(df)
+            df['N moves'] = df['Moves'].str.count(' ')      # the first move is made by the opponent
+            difficulty = np.full(len(df), -1, dtype=np.int64)
+            for i, (min_rating, max_rating) in enumerate(DIFFICULTY_RATINGS):
+                difficulty[((df['Rating'] >= min_rating) & (df['Rating'] < max_rating)).to_numpy()] = i
+            yield df[difficulty >= 0], difficulty[difficulty >= 0]
+
+
+def write_strings_in_order(path, column, lengths, order):
+    """ writes the strings of "column" (written in the order of the source in a temporary file) sorted by "order", and
+    their offsets
+
+    Parameters
+    ----------
+    path : pathlib.Path
+    column : str
+    lengths : numpy.ndarray
+    order : numpy.ndarray
+    """
+    source_offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths[order])]).astype(np.int64)
+    source = np.memmap(path / (column + '.bytes.tmp'), dtype=np.uint8, mode='r') if source_offsets[-1] > 0 \
+        else np.empty(0, dtype=np.uint8)
+    strings = np.lib.format.open_memmap(path / (column + '.bytes.npy'), mode='w+', dtype=np.uint8,
+                                        shape=(int(offsets[-1]), ))
+    for i, index in enumerate(order):
+        strings[offsets[i]:offsets[i + 1]] = source[source_offsets[index]:source_offsets[index + 1]]
+    strings.flush()
+    del strings, source
+    os.remove(path / (column + '.bytes.tmp'))
+    save_array(path, column + '.offsets', offsets)
+
+
+def save_theme_index(path, themes):
+    """ saves the index of the puzzles per theme (the puzzles of theme i are
+    theme_puzzles[theme_offsets[i]:theme_offsets[i + 1]]), and returns the names of the themes
+
+    Parameters
+    ----------
+    path : pathlib.Path
+    themes : numpy.ndarray
+        themes of each puzzle (separated by spaces)
+
+    Returns
+    -------
+    List[str]
+    """
+    puzzles_per_theme = {}
+    for index, themes_of_puzzle in enumerate(themes):
+        for theme in themes_of_puzzle.split():
+            puzzles_per_theme.setdefault(theme, []).append(index)
+    theme_names = sorted(puzzles_per_theme)
+    save_array(path, 'theme_offsets', np.concatenate(
+        [[0], np.cumsum([len(puzzles_per_theme[theme]) for theme in theme_names])]).astype(np.int64))
+    save_array(path, 'theme_puzzles', np.array([index for theme in theme_names for index in puzzles_per_theme[theme]],
+                                               dtype=np.int64))
+    return theme_names
+
+
+def save_array(path, name, array):
+    """ saves one array of the database
+
+    Parameters
+    ----------
+    path : pathlib.Path
+    name : str
+    array : numpy.ndarray
+    """
+    np.save(path / (name + '.npy'), array)
+
+
+def load_array(path, name):
+    """ loads one array of the database (memory mapped)
+
+    Parameters
+    ----------
+    path : pathlib.Path
+    name : str
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    return np.load(path / (name + '.npy'), mmap_mode='r')
@@ -0,0 +1,123 @@
+from concurrent import futures
+
+import chess
+
+from experimentNao.chess_game import engine_service
+from lib import event_loop
+
+
+class PreparedPuzzle:
+    def __init__(self, index, puzzle, fen, piece_taken_before_puzzle_start, computer_color_white):
+        """ puzzle that is ready to be played: selected, and with the board in the position shown to the participant
+
+        Parameters
+        ----------
+        index : int
+            index of the puzzle in the database
+        puzzle : experimentNao.chess_game.chess_puzzles.ChessPuzzle
+        fen : str
+            position shown to the participant (after the first move, for the puzzles of the lichess database)
+        piece_taken_before_puzzle_start : Union[None, stockfish.models.Stockfish.Piece]
+        computer_color_white : bool
+        """
+        self.index = index
+        self.puzzle = puzzle
+        self.fen = fen
+        self.piece_taken_before_puzzle_start = piece_taken_before_puzzle_start
+        self.computer_color_white = computer_color_white
+
+
+class PuzzlePrefetcher(event_loop.FutureWaiter):
+    def __init__(self, chess_engine, difficulties):
+        """ prepares in the background (while the participant plays the current puzzle) the next puzzle of each
+        difficulty that the controller may choose, so that the next puzzle can be set without waiting, whatever the
+        difficulty chosen. The puzzles prepared are only marked as shown when they are taken, and the ones that are not
+        taken are kept for the next puzzles.
+
+        Parameters
+        ----------
+        chess_engine : experimentNao.chess_game.my_chess_engine.MyChessEngine
+        difficulties : List[int]
+            difficulties that can be chosen for the next puzzle
+        """
+        self.chess_engine = chess_engine
+        self.difficulties = difficulties
+        self.executor = futures.ThreadPoolExecutor(max_workers=1)
+        self.prepared = {}      # difficulty -> future with the prepared puzzle (or None, if there is no puzzle left)
+        self.n_hits, self.n_misses = 0, 0
+
+    def prefetch(self, allowed_n_moves):
+        """ starts preparing the next puzzle of the difficulties that do not have one prepared yet
+
+        Parameters
+        ----------
+        allowed_n_moves : Dict[int, List[int]]
+            numbers of moves allowed for the puzzles of each difficulty
+        """
+        for difficulty in self.difficulties:
+            if difficulty not in self.prepared:
+                self.prepared[difficulty] = self.executor.submit(prepare_puzzle, self.chess_engine, difficulty,
+                                                                 allowed_n_moves.get(difficulty))
+
+    def take(self, difficulty, n_moves=None):
+        """ returns the puzzle prepared for "difficulty" (waiting for it if it is still being prepared) and marks it as
+        shown, or None if there is no puzzle prepared, or if it does not have one of the numbers of moves allowed
+
+        Parameters
+        ----------
+        difficulty : int
+        n_moves : List[int]
+            numbers of moves allowed. If None, any number of moves
+
+        Returns
+        -------
+        Union[None, PreparedPuzzle]
+        """
+        future = self.prepared.pop(difficulty, None)
+        prepared = None if future is None else self.wait_for(future)
+        if prepared is None or self.chess_engine.puzzles.shown_puzzles.was_shown(prepared.index) or \
+                (n_moves is not None and prepared.puzzle.number_of_moves not in n_moves):
+            self.n_misses += 1
+            return None
+        self.n_hits += 1
+        self.chess_engine.puzzles.shown_puzzles.add(prepared.index)
+        return prepared
+
+    def shutdown(self):
+        """ stops preparing puzzles
+
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def prepare_puzzle(chess_engine, difficulty, n_moves=None):
+    """ selects a puzzle (not shown yet) of "difficulty" and sets up its board, as done by
+    experimentNao.chess_game.my_chess_engine.MyChessEngine.set_new_puzzle, but without changing the state of the chess
+    engine. Without the lichess database, the search of the best move of the position starts right away.
+
+    Parameters
+    ----------
+    chess_engine : experimentNao.chess_game.my_chess_engine.MyChessEngine
+    difficulty : int
+    n_moves : List[int]
+        numbers of moves allowed. If None, any number of moves
+
+    Returns
+    -------
+    Union[None, PreparedPuzzle]
+        None if there is no puzzle of "difficulty" with the numbers of moves allowed
+    """
+    index = chess_engine.puzzles.select_new_puzzle(difficulty, n_moves=n_moves)
+    if index is None:
+        return None
+    puzzle = chess_engine.puzzles.database.get_puzzle(index)
+    board = chess.Board(puzzle.fen)
+    piece_taken_before_puzzle_start = None
+    if chess_engine.lichess_db:
+        first_move = puzzle.sequence_of_moves[0]
+        piece_taken_before_puzzle_start = engine_service.get_piece_on_square(board, first_move[2:4])
+        board.push_uci(first_move)
+    else:
+        chess_engine.engine_service.submit(board.fen())
+    return PreparedPuzzle(index, puzzle, board.fen(), piece_taken_before_puzzle_start,
+                          computer_color_white=board.turn != chess.WHITE)
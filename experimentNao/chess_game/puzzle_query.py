@@ -0,0 +1,202 @@
+import os
+
+import numpy as np
+
+from experimentNao import folder_path
+
+
+class PuzzleIndex:
+    def __init__(self, database):
+        """ inverted indexes of the puzzles of the database, by difficulty and theme (built when the database is
+        compiled), and by number of moves and rating (built here), to find the puzzles with some properties without
+        going through all the puzzles.
+
+        Parameters
+        ----------
+        database : experimentNao.chess_game.puzzle_database.PuzzleDatabase
+        """
+        self.database = database
+        n_moves = np.asarray(database.n_moves)
+        self.n_moves_puzzles = np.argsort(n_moves, kind='stable')      # puzzles of each number of moves, sorted
+        self.n_moves_values, self.n_moves_offsets = np.unique(n_moves[self.n_moves_puzzles], return_index=True)
+        self.n_moves_offsets = np.append(self.n_moves_offsets, len(n_moves))
+        ratings = np.asarray(database.ratings)
+        self.rating_order = np.argsort(ratings, kind='stable')
+        self.sorted_ratings = ratings[self.rating_order]
+
+    def query(self, difficulty=None, themes=(), n_moves=None, rating_band=None, within=None, shown_puzzles=None):
+        """ returns the puzzles that satisfy all the conditions given. The search starts from the smallest of the
+        indexes of the conditions, and the other conditions are checked only for those puzzles.
+
+        Parameters
+        ----------
+        difficulty : int
+        themes : List[str]
+            themes that the puzzles must have (all of them)
+        n_moves : List[int]
+            numbers of moves allowed
+        rating_band : Tuple[int, int]
+            minimum (included) and maximum (excluded) rating
+        within : range
+            range of indexes of the puzzles allowed (e.g., the puzzles of the interaction)
+        shown_puzzles : ShownPuzzles
+            puzzles that cannot be selected because they were already shown
+
+        Returns
+        -------
+        numpy.ndarray
+            indexes of the puzzles, sorted
+        """
+        first, last = 0, self.database.get_n_puzzles()
+        for allowed_range in [within, self.database.get_puzzles_of_difficulty(difficulty) if difficulty is not None
+                              else None]:
+            if allowed_range is not None:
+                first, last = max(first, allowed_range.start), min(last, allowed_range.stop)
+        candidate_sets = [(max(last - first, 0), lambda: np.arange(first, max(first, last)))]
+        for theme in themes:
+            candidate_sets.append((len(self.database.get_puzzles_of_theme(theme)),
+                                   lambda theme_=theme: np.asarray(self.database.get_puzzles_of_theme(theme_))))
+        if n_moves is not None:
+            groups = [self.get_group_of_n_moves(n) for n in n_moves]
+            candidate_sets.append((sum(group_last - group_first for group_first, group_last in groups),
+                                   lambda: np.sort(np.concatenate([self.n_moves_puzzles[group_first:group_last]
+                                                                   for group_first, group_last in groups] +
+                                                                  [np.empty(0, dtype=np.int64)]))))
+        if rating_band is not None:
+            rating_first, rating_last = np.searchsorted(self.sorted_ratings, rating_band)
+            candidate_sets.append((rating_last - rating_first,
+                                   lambda: np.sort(self.rating_order[rating_first:rating_last])))
+        candidates = min(candidate_sets, key=lambda candidate_set: candidate_set[0])[1]()
+        # Check all the conditions in the candidates
+        candidates = candidates[(candidates >= first) & (candidates < last)]
+        for theme in themes:
+            candidates = candidates[is_in_sorted(candidates, self.database.get_puzzles_of_theme(theme))]
+        if n_moves is not None:
+            candidates = candidates[np.isin(self.database.n_moves[candidates], n_moves)]
+        if rating_band is not None:
+            ratings = self.database.ratings[candidates]
+            candidates = candidates[(ratings >= rating_band[0]) & (ratings < rating_band[1])]
+        if shown_puzzles is not None:
+            candidates = candidates[~shown_puzzles.shown[candidates]]
+        return candidates
+
+    def get_group_of_n_moves(self, n_moves):
+        """ returns the first and last position of the puzzles with "n_moves" moves in self.n_moves_puzzles
+
+        Parameters
+        ----------
+        n_moves : int
+
+        Returns
+        -------
+        Tuple[int, int]
+        """
+        i = np.searchsorted(self.n_moves_values, n_moves)
+        if i == len(self.n_moves_values) or self.n_moves_values[i] != n_moves:
+            return 0, 0
+        return int(self.n_moves_offsets[i]), int(self.n_moves_offsets[i + 1])
+
+    def get_numbers_of_moves(self, within):
+        """ returns the numbers of moves of the puzzles in the range of indexes "within"
+
+        Parameters
+        ----------
+        within : range
+
+        Returns
+        -------
+        List[int]
+        """
+        return np.unique(self.database.n_moves[within.start:within.stop]).tolist()
+
+    def get_themes(self, index):
+        """ returns the themes of the puzzle "index", from the index of the puzzles per theme
+
+        Parameters
+        ----------
+        index : int
+
+        Returns
+        -------
+        Set[str]
+        """
+        return {theme for theme in self.database.themes
+                if is_in_sorted(np.array([index]), self.database.get_puzzles_of_theme(theme))[0]}
+
+
+class ShownPuzzles:
+    def __init__(self, database, participant_id=None):
+        """ puzzles already shown to the participant. If "participant_id" is given, the puzzles shown are saved (one
+        key per line, see experimentNao.chess_game.puzzle_database.PuzzleDatabase.get_key) and loaded in the next
+        sessions with the same participant.
+
+        Parameters
+        ----------
+        database : experimentNao.chess_game.puzzle_database.PuzzleDatabase
+        participant_id : str
+        """
+        self.database = database
+        self.shown = np.zeros(database.get_n_puzzles(), dtype=bool)
+        self.file_path = get_shown_puzzles_path(participant_id) if participant_id is not None else None
+        if self.file_path is not None and self.file_path.exists():
+            with open(self.file_path) as file:
+                keys = [line.strip() for line in file if line.strip() != '']
+            self.shown[database.find_puzzles(keys)] = True
+
+    def add(self, index):
+        """ marks the puzzle "index" as shown
+
+        Parameters
+        ----------
+        index : int
+        """
+        self.shown[index] = True
+        if self.file_path is not None:
+            os.makedirs(self.file_path.parent, exist_ok=True)
+            with open(self.file_path, 'a') as file:
+                file.write(self.database.get_key(index) + '\n')
+
+    def was_shown(self, index):
+        """ checks whether the puzzle "index" was already shown
+
+        Parameters
+        ----------
+        index : int
+
+        Returns
+        -------
+        bool
+        """
+        return bool(self.shown[index])
+
+
+def is_in_sorted(values, sorted_array):
+    """ checks which of the "values" are in "sorted_array"
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+    sorted_array : numpy.ndarray
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    if len(sorted_array) == 0:
+        return np.zeros(len(values), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_array, values), len(sorted_array) - 1)
+    return sorted_array[positions] == values
+
+
+def get_shown_puzzles_path(participant_id):
+    """ returns the path of the file with the puzzles shown to the participant
+
+    Parameters
+    ----------
+    participant_id : str
+
+    Returns
+    -------
+    pathlib.Path
+    """
+    return folder_path.output_folder_path / 'shown_puzzles' / (participant_id + '.txt')
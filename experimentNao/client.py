@@ -7,8 +7,18 @@ sys.path.append(str(path_config.repo_root / "experimentNao" / "generated"))
 
 from experimentNao.generated.nao_pb2_grpc import NaoControllerStub
 
+NAO_ADDRESS = "localhost:18861"
+# each client has its own connection to the robot (by default, the channels of one process share their connections)
+CHANNEL_OPTIONS = [('grpc.use_local_subchannel_pool', 1)]
 
-def initialize_client():
-    channel = grpc.insecure_channel("localhost:18861")
+
+def initialize_client(address=NAO_ADDRESS):
+    channel = grpc.insecure_channel(address, options=CHANNEL_OPTIONS)
     client = NaoControllerStub(channel)
     return client
+
+
+def initialize_async_client(address=NAO_ADDRESS):
+    channel = grpc.aio.insecure_channel(address, options=CHANNEL_OPTIONS)
+    client = NaoControllerStub(channel)
+    return channel, client
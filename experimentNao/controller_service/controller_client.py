@@ -0,0 +1,191 @@
+import grpc
+
+from experimentNao.behaviour_controllers.robot_action import RobotAction
+from experimentNao.controller_service import session_worker
+from experimentNao.controller_service.controller_server import SERVICE_NAME, RPC_METHODS, serialize, deserialize
+
+
+class ControllerClient:
+    def __init__(self, address='localhost:18862'):
+        """ client of the gRPC controller server, used by a robot station
+
+        Parameters
+        ----------
+        address : str
+        """
+        self.channel = grpc.insecure_channel(address)
+        self.rpcs = {method: self.channel.unary_unary('/{}/{}'.format(SERVICE_NAME, rpc),
+                                                      request_serializer=serialize, response_deserializer=deserialize)
+                     for rpc, method in RPC_METHODS.items()}
+        self.rpc_statistics = self.channel.unary_unary('/{}/GetStatistics'.format(SERVICE_NAME),
+                                                       request_serializer=serialize, response_deserializer=deserialize)
+
+    def call(self, method, session_id, **arguments):
+        """ runs a request of a session in the server and waits for its result
+
+        Parameters
+        ----------
+        method : str
+        session_id : str
+        arguments : Dict[str, Any]
+
+        Returns
+        -------
+        Dict[str, Any]
+        """
+        arguments['session_id'] = session_id
+        return self.rpcs[method](arguments)
+
+    def get_statistics(self):
+        """ returns the statistics of the controller service
+
+        Returns
+        -------
+        Dict[str, float]
+        """
+        return self.rpc_statistics({})
+
+    def close(self):
+        """ closes the channel to the server
+
+        """
+        self.channel.close()
+
+
+class RemoteController:
+    def __init__(self, client, session_id, participant_id):
+        """ stand-in of the model-based controller of a session that runs in the controller service. It has the same
+        interface as the experimentNao.behaviour_controllers.mbc.model_based_controller.ModelBasedController used by
+        the interaction and by the closed loop simulation.
+
+        Parameters
+        ----------
+        client : Union[ControllerClient, experimentNao.controller_service.controller_service.ControllerService]
+            gRPC client, or the controller service itself (to run the service in the same process)
+        session_id : str
+        participant_id : str
+        """
+        self.client = client
+        self.session_id = session_id
+        self.participant_id = participant_id
+        self.next_puzzle_difficulty = None
+        self.give_reward_selected = None
+        self.when_are_time_steps_in_puzzle = []
+
+    def initialize_controller(self, puzzle_difficulty, nao_helping, nao_offering_reward):
+        """ opens the session in the service and initializes its controller
+
+        Parameters
+        ----------
+        puzzle_difficulty : int
+        nao_helping : bool
+        nao_offering_reward : bool
+        """
+        reply = self.client.call('open_session', self.session_id, participant_id=self.participant_id,
+                                 puzzle_difficulty=puzzle_difficulty, nao_helping=nao_helping,
+                                 nao_offering_reward=nao_offering_reward)
+        self.next_puzzle_difficulty = reply['puzzle_difficulty']
+
+    def reset_beginning_of_puzzle(self, n_moves):
+        """ resets the controller of the session before a new puzzle with "n_moves" is played
+
+        Parameters
+        ----------
+        n_moves : int
+
+        Returns
+        -------
+        bool
+        """
+        reply = self.client.call('reset_beginning_of_puzzle', self.session_id, n_moves=n_moves)
+        self.when_are_time_steps_in_puzzle = reply['time_steps']
+        return reply['success']
+
+    def check_if_it_is_discrete_time_step(self, current_move):
+        """ check if the current move of the players coincides with a discrete time step of the controller
+
+        Parameters
+        ----------
+        current_move : int
+
+        Returns
+        -------
+        bool
+        """
+        return current_move in self.when_are_time_steps_in_puzzle
+
+    def ask_questions(self, puzzle_counter, mid_puzzle):
+        """ checks whether the questions about the mental states should be asked to the participant
+
+        Parameters
+        ----------
+        puzzle_counter : int
+        mid_puzzle : bool
+
+        Returns
+        -------
+        bool
+        """
+        return self.client.call('ask_questions', self.session_id, puzzle_counter=puzzle_counter,
+                                mid_puzzle=mid_puzzle)['ask_questions']
+
+    def update_model_middle_of_question(self, current_rld, participant_answers, puzzle_counter, write=True):
+        """ updates the model of the session in a time step in the middle of a puzzle. The controllers of the service
+        do not write their data to excel, so "write" is ignored
+
+        Parameters
+        ----------
+        current_rld : experimentNao.declare_model.chess_interaction_data.ChessInteractionData
+        participant_answers : Union[None, List[pandas.core.frame.DataFrame]]
+        puzzle_counter : int
+        write : bool
+        """
+        self.client.call('update_mid_puzzle', self.session_id, rld=session_worker.get_rld_as_list(current_rld),
+                         answers=session_worker.get_answers_as_records(participant_answers),
+                         puzzle_counter=puzzle_counter)
+
+    def update_end_of_puzzle_and_get_action(self, current_rld, puzzle_counter, write=True):
+        """ updates the model of the session at the end of a puzzle and gets the action chosen by the controller. The
+        controllers of the service do not write their data to excel, so "write" is ignored
+
+        Parameters
+        ----------
+        current_rld : experimentNao.declare_model.chess_interaction_data.ChessInteractionData
+        puzzle_counter : int
+        write : bool
+
+        Returns
+        -------
+        experimentNao.behaviour_controllers.robot_action.RobotAction
+        """
+        reply = self.client.call('get_action', self.session_id, rld=session_worker.get_rld_as_list(current_rld),
+                                 puzzle_counter=puzzle_counter)
+        action = RobotAction(reply['puzzle_difficulty'], reply['give_reward'])
+        action.set_cost(reply['cost'])
+        self.next_puzzle_difficulty = action.puzzle_difficulty_level
+        self.give_reward_selected = action.give_reward
+        return action
+
+    def get_puzzle_difficulty_status(self):
+        """ communicates the puzzle difficulty of the next puzzle, as decided by the controller
+
+        Returns
+        -------
+        int
+        """
+        return self.next_puzzle_difficulty
+
+    def get_give_reward_status(self):
+        """ communicates whether the controller has decided that Nao will give a reward or not
+
+        Returns
+        -------
+        bool
+        """
+        return self.give_reward_selected
+
+    def close(self):
+        """ closes the session in the service
+
+        """
+        self.client.call('close_session', self.session_id)
@@ -0,0 +1,112 @@
+import json
+from concurrent import futures
+
+import grpc
+
+from experimentNao.controller_service import session_worker
+
+SERVICE_NAME = 'ControllerService'
+RPC_METHODS = {'OpenSession': 'open_session',
+               'CloseSession': 'close_session',
+               'ResetBeginningOfPuzzle': 'reset_beginning_of_puzzle',
+               'AskQuestions': 'ask_questions',
+               'UpdateMidPuzzle': 'update_mid_puzzle',
+               'GetAction': 'get_action'}
+
+
+class ControllerServer:
+    def __init__(self, controller_service, port=18862, max_threads=64):
+        """ local gRPC server of the controller service. Each robot station is a client that identifies its session
+        with a session id. The messages are serialized as json, so that no generated code is needed for this service.
+
+        Parameters
+        ----------
+        controller_service : experimentNao.controller_service.controller_service.ControllerService
+        port : int
+        max_threads : int
+            maximum number of requests handled at the same time (which are then batched by the controller service)
+        """
+        self.controller_service = controller_service
+        self.port = port
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_threads))
+        handlers = {rpc: grpc.unary_unary_rpc_method_handler(self.get_handler(method), request_deserializer=deserialize,
+                                                             response_serializer=serialize)
+                    for rpc, method in RPC_METHODS.items()}
+        handlers['GetStatistics'] = grpc.unary_unary_rpc_method_handler(
+            lambda request, context: self.controller_service.get_statistics(), request_deserializer=deserialize,
+            response_serializer=serialize)
+        self.server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler(SERVICE_NAME, handlers), ))
+        self.server.add_insecure_port('localhost:{}'.format(port))
+
+    def get_handler(self, method):
+        """ returns the function that handles the requests of the rpc of "method"
+
+        Parameters
+        ----------
+        method : str
+
+        Returns
+        -------
+        Callable
+        """
+        def handle(request, context):
+            if not isinstance(request, dict) or 'session_id' not in request:
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'The request has no session_id')
+            session_id = request.pop('session_id')
+            try:
+                return self.controller_service.call(method, session_id, **request)
+            except session_worker.InvalidArgumentError as error:
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(error))
+            except KeyError as error:
+                context.abort(grpc.StatusCode.NOT_FOUND, str(error.args[0]) if len(error.args) > 0 else '')
+            except RuntimeError as error:       # the traceback is printed by the worker
+                context.abort(grpc.StatusCode.INTERNAL, str(error))
+        return handle
+
+    def start(self):
+        """ starts the server
+
+        """
+        self.server.start()
+        print('Controller server listening on port {}'.format(self.port))
+
+    def wait_for_termination(self):
+        """ blocks until the server is stopped
+
+        """
+        self.server.wait_for_termination()
+
+    def stop(self):
+        """ stops the server and the controller service
+
+        """
+        self.server.stop(grace=None)
+        self.controller_service.shutdown()
+
+
+def serialize(message):
+    """ serializes a message of the controller service
+
+    Parameters
+    ----------
+    message : Dict[str, Any]
+
+    Returns
+    -------
+    bytes
+    """
+    return json.dumps(message, default=lambda value: value.item()).encode('utf-8')
+
+
+def deserialize(data):
+    """ deserializes a message of the controller service
+
+    Parameters
+    ----------
+    data : bytes
+
+    Returns
+    -------
+    Dict[str, Any]
+    """
+    return json.loads(data.decode('utf-8'))
@@ -0,0 +1,211 @@
+import os
+import time
+import queue
+import threading
+import itertools
+from concurrent.futures import Future
+
+import multiprocess as mp
+
+from experimentNao.controller_service import session_worker
+
+
+class ControllerService:
+    def __init__(self, n_workers=None, max_sessions_per_worker=8, max_history=10, batch_window=0.002,
+                 max_batch_size=64, use_prediction_cache=False):
+        """ Service that hosts the model-based controllers of many sessions (participants) at once, keyed by the id of
+        the session. The sessions are distributed among worker processes, so that the decisions of different sessions
+        run in parallel in different cores. The requests that arrive within the same "batch_window" are sent in batches
+        to each worker, and the requests of the same session are always run in the order in which they arrived.
+
+        Parameters
+        ----------
+        n_workers : int
+            number of worker processes. If None, one per core
+        max_sessions_per_worker : int
+        max_history : int
+            maximum number of past values kept by each variable of the models of a session
+        batch_window : float
+            time (in seconds) during which requests are gathered in the same batch
+        max_batch_size : int
+        use_prediction_cache : bool
+            whether each controller memoizes the predictions of its model
+        """
+        self.n_workers = n_workers if n_workers is not None else os.cpu_count()
+        self.max_sessions_per_worker = max_sessions_per_worker
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.requests = queue.Queue()
+        self.pending_requests = {}
+        self.request_ids = itertools.count()
+        self.lock = threading.Lock()
+        self.worker_of_session = {}
+        self.sessions_of_worker = [set() for _ in range(self.n_workers)]
+        # Statistics
+        self.n_requests, self.n_batches, self.n_decisions = 0, 0, 0
+        self.starting_time = time.time()
+        # Workers
+        self.connections, self.processes = [], []
+        for _ in range(self.n_workers):
+            connection, worker_connection = mp.Pipe()
+            process = mp.Process(target=session_worker.run_session_worker, daemon=True,
+                                 args=(worker_connection, max_sessions_per_worker, max_history, use_prediction_cache))
+            process.start()
+            self.connections.append(connection)
+            self.processes.append(process)
+        self.threads = [threading.Thread(target=self.send_batches, daemon=True)] + \
+                       [threading.Thread(target=self.receive_results, args=(connection, ), daemon=True)
+                        for connection in self.connections]
+        for thread in self.threads:
+            thread.start()
+
+    def call(self, method, session_id, **arguments):
+        """ runs a request of a session and waits for its result
+
+        Parameters
+        ----------
+        method : str
+            one of experimentNao.controller_service.session_worker.SESSION_METHODS
+        session_id : str
+        arguments : Dict[str, Any]
+
+        Returns
+        -------
+        Dict[str, Any]
+        """
+        return self.submit(method, session_id, **arguments).result()
+
+    def submit(self, method, session_id, **arguments):
+        """ submits a request of a session to the worker that hosts the session
+
+        Parameters
+        ----------
+        method : str
+            one of experimentNao.controller_service.session_worker.SESSION_METHODS
+        session_id : str
+        arguments : Dict[str, Any]
+
+        Returns
+        -------
+        concurrent.futures.Future
+        """
+        future = Future()
+        with self.lock:
+            if method == 'open_session' and session_id not in self.worker_of_session:
+                try:
+                    self.assign_session_to_worker(session_id)
+                except RuntimeError as error:
+                    future.set_exception(error)
+                    return future
+            if session_id not in self.worker_of_session:
+                future.set_exception(KeyError('session {} does not exist'.format(session_id)))
+                return future
+            worker = self.worker_of_session[session_id]
+            if method == 'close_session':
+                self.sessions_of_worker[worker].discard(session_id)
+                del self.worker_of_session[session_id]
+            request_id = next(self.request_ids)
+            self.pending_requests[request_id] = (future, method, session_id)
+            self.n_requests += 1
+        self.requests.put((worker, (request_id, method, session_id, arguments)))
+        return future
+
+    def assign_session_to_worker(self, session_id):
+        """ assigns a new session to the worker that hosts less sessions
+
+        Parameters
+        ----------
+        session_id : str
+        """
+        worker = min(range(self.n_workers), key=lambda i: len(self.sessions_of_worker[i]))
+        if len(self.sessions_of_worker[worker]) >= self.max_sessions_per_worker:
+            raise RuntimeError('all workers host the maximum number of sessions')
+        self.sessions_of_worker[worker].add(session_id)
+        self.worker_of_session[session_id] = worker
+
+    def send_batches(self):
+        """ loop that gathers the requests that arrive within the batch window and sends them in one batch to each
+        worker
+
+        """
+        while True:
+            requests = [self.requests.get()]
+            deadline = time.time() + self.batch_window
+            while len(requests) < self.max_batch_size:
+                try:
+                    requests.append(self.requests.get(timeout=max(deadline - time.time(), 0)))
+                except queue.Empty:
+                    break
+            batches = [[] for _ in range(self.n_workers)]
+            for worker, request in requests:
+                batches[worker].append(request)
+            for worker, batch in enumerate(batches):
+                if len(batch) > 0:
+                    self.connections[worker].send(batch)
+                    self.n_batches += 1
+
+    def receive_results(self, connection):
+        """ loop that receives the batches of results of a worker and completes the respective requests
+
+        Parameters
+        ----------
+        connection : multiprocess.connection.Connection
+        """
+        while True:
+            try:
+                results = connection.recv()
+            except (EOFError, OSError):
+                return
+            for request_id, result, error in results:
+                with self.lock:
+                    future, method, session_id = self.pending_requests.pop(request_id)
+                    if method == 'get_action' and error is None:
+                        self.n_decisions += 1
+                    if method == 'open_session' and error is not None and error[0] != 'KeyError':   # not opened
+                        self.sessions_of_worker[self.worker_of_session[session_id]].discard(session_id)
+                        del self.worker_of_session[session_id]
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(get_exception(*error))
+
+    def get_statistics(self):
+        """ returns the statistics of the service
+
+        Returns
+        -------
+        Dict[str, float]
+        """
+        elapsed_time = time.time() - self.starting_time
+        return {'n workers': self.n_workers,
+                'n sessions': len(self.worker_of_session),
+                'n requests': self.n_requests,
+                'n decisions': self.n_decisions,
+                'mean batch size': self.n_requests / self.n_batches if self.n_batches > 0 else None,
+                'decisions per second': self.n_decisions / elapsed_time if elapsed_time > 0 else None}
+
+    def shutdown(self):
+        """ stops the worker processes
+
+        """
+        for connection in self.connections:
+            connection.send(None)
+        for process in self.processes:
+            process.join()
+
+
+def get_exception(error_name, message):
+    """ returns the exception of an error of a worker
+
+    Parameters
+    ----------
+    error_name : str
+        'InvalidArgumentError', 'KeyError' or 'RuntimeError'
+    message : str
+
+    Returns
+    -------
+    Exception
+    """
+    return {'InvalidArgumentError': session_worker.InvalidArgumentError, 'KeyError': KeyError}.get(
+        error_name, RuntimeError)(message)
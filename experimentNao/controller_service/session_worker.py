@@ -0,0 +1,312 @@
+import inspect
+import traceback
+
+import pandas as pd
+
+from experimentNao.behaviour_controllers.best_configs_per_participant import get_best_id_config
+from experimentNao.behaviour_controllers.mbc import model_based_controller as mbc, prediction_cache as pc
+from experimentNao.behaviour_controllers.mbc.aux_functions import get_all_fast_dyn_vars
+from experimentNao.declare_model import chess_interaction_data as cid
+
+SESSION_METHODS = ('open_session', 'close_session', 'reset_beginning_of_puzzle', 'ask_questions', 'update_mid_puzzle',
+                   'get_action')
+
+
+class InvalidArgumentError(ValueError):
+    """ error of a request whose method or arguments are not valid (an error of the caller) """
+
+
+def run_session_worker(connection, max_sessions, max_history, use_prediction_cache):
+    """ loop of a worker process of the controller service. The worker hosts the controllers of its sessions, receives
+    batches of requests through "connection" and answers each batch with the batch of the respective results. The loop
+    stops when None is received. Only the transport is batched: each request of a batch is still run on its own, in
+    the order of the batch.
+
+    Parameters
+    ----------
+    connection : multiprocess.connection.Connection
+    max_sessions : int
+    max_history : int
+    use_prediction_cache : bool
+    """
+    sessions = SessionsOfWorker(max_sessions, max_history, use_prediction_cache)
+    while True:
+        batch = connection.recv()
+        if batch is None:
+            break
+        connection.send([sessions.handle_request(*request) for request in batch])
+
+
+class SessionsOfWorker:
+    def __init__(self, max_sessions, max_history, use_prediction_cache):
+        """ sessions (one controller per participant) hosted by one worker process of the controller service. The state
+        of each session is isolated in its own controller.
+
+        Parameters
+        ----------
+        max_sessions : int
+            maximum number of sessions hosted at the same time
+        max_history : int
+            maximum number of past values kept by each variable of the models of a session, which bounds the memory of
+            each session
+        use_prediction_cache : bool
+            whether each controller memoizes the predictions of its model
+        """
+        self.max_sessions = max_sessions
+        self.max_history = max_history
+        self.use_prediction_cache = use_prediction_cache
+        self.controllers = {}
+
+    def handle_request(self, request_id, method, session_id, arguments):
+        """ runs one request of a session
+
+        Parameters
+        ----------
+        request_id : int
+        method : str
+        session_id : str
+        arguments : Dict[str, Any]
+
+        Returns
+        -------
+        Tuple[int, Any, Union[None, Tuple[str, str]]]
+            id of the request, result and error (None if the request succeeded): name of the type of error
+            ('InvalidArgumentError', 'KeyError' or 'RuntimeError') and a short message. The traceback of the errors
+            of the controller is only printed here.
+        """
+        try:
+            self.check_request(method, session_id, arguments)
+        except (InvalidArgumentError, KeyError, RuntimeError) as error:
+            return request_id, None, (type(error).__name__, str(error.args[0]) if len(error.args) > 0 else '')
+        try:
+            if method == 'open_session':
+                return request_id, self.open_session(session_id, **arguments), None
+            return request_id, getattr(self, method)(self.controllers[session_id], session_id, **arguments), None
+        except Exception as error:
+            traceback.print_exc()
+            return request_id, None, ('RuntimeError', '{} of session {} failed: {}'.format(method, session_id,
+                                                                                           type(error).__name__))
+
+    def check_request(self, method, session_id, arguments):
+        """ checks that the method and its arguments are valid (InvalidArgumentError) and that the session exists, or
+        that it can be opened (KeyError or RuntimeError)
+
+        Parameters
+        ----------
+        method : str
+        session_id : str
+        arguments : Dict[str, Any]
+        """
+        if method not in SESSION_METHODS:
+            raise InvalidArgumentError('unknown method {}'.format(method))
+        try:
+            if method == 'open_session':
+                inspect.signature(self.open_session).bind(session_id, **arguments)
+            else:
+                inspect.signature(getattr(self, method)).bind(None, session_id, **arguments)
+        except TypeError as error:
+            raise InvalidArgumentError('{}: {}'.format(method, error))
+        if method == 'open_session':
+            if session_id in self.controllers:
+                raise KeyError('session {} already exists'.format(session_id))
+            if len(self.controllers) >= self.max_sessions:
+                raise RuntimeError('worker already hosts the maximum number of sessions ({})'.format(self.max_sessions))
+        elif session_id not in self.controllers:
+            raise KeyError('session {} does not exist'.format(session_id))
+
+    def open_session(self, session_id, participant_id, puzzle_difficulty, nao_helping, nao_offering_reward):
+        """ creates the controller of a new session and initializes it
+
+        Parameters
+        ----------
+        session_id : str
+        participant_id : str
+        puzzle_difficulty : int
+        nao_helping : bool
+        nao_offering_reward : bool
+
+        Returns
+        -------
+        Dict[str, int]
+        """
+        controller = get_controller(participant_id, self.use_prediction_cache)
+        controller.initialize_controller(puzzle_difficulty, nao_helping, nao_offering_reward)
+        self.controllers[session_id] = controller
+        return {'puzzle_difficulty': controller.get_puzzle_difficulty_status()}
+
+    def close_session(self, controller, session_id):
+        """ removes the controller of the session
+
+        Parameters
+        ----------
+        controller : experimentNao.behaviour_controllers.mbc.model_based_controller.ModelBasedController
+        session_id : str
+
+        Returns
+        -------
+        Dict
+        """
+        del self.controllers[session_id]
+        return {}
+
+    def reset_beginning_of_puzzle(self, controller, session_id, n_moves):
+        """ resets the controller of the session at the beginning of a puzzle with "n_moves"
+
+        Parameters
+        ----------
+        controller : experimentNao.behaviour_controllers.mbc.model_based_controller.ModelBasedController
+        session_id : str
+        n_moves : int
+
+        Returns
+        -------
+        Dict[str, Any]
+        """
+        success = controller.reset_beginning_of_puzzle(n_moves)
+        return {'success': success, 'time_steps': controller.when_are_time_steps_in_puzzle}
+
+    def ask_questions(self, controller, session_id, puzzle_counter, mid_puzzle):
+        """ checks whether the questions about the mental states should be asked to the participant of the session
+
+        Parameters
+        ----------
+        controller : experimentNao.behaviour_controllers.mbc.model_based_controller.ModelBasedController
+        session_id : str
+        puzzle_counter : int
+        mid_puzzle : bool
+
+        Returns
+        -------
+        Dict[str, bool]
+        """
+        return {'ask_questions': controller.ask_questions(puzzle_counter, mid_puzzle)}
+
+    def update_mid_puzzle(self, controller, session_id, rld, answers, puzzle_counter):
+        """ updates the model of the session in a time step in the middle of a puzzle
+
+        Parameters
+        ----------
+        controller : experimentNao.behaviour_controllers.mbc.model_based_controller.ModelBasedController
+        session_id : str
+        rld : List
+        answers : Union[None, List[Dict[str, Any]]]
+        puzzle_counter : int
+
+        Returns
+        -------
+        Dict
+        """
+        controller.update_model_middle_of_question(get_rld_from_list(rld), get_answers_from_records(answers),
+                                                   puzzle_counter, write=False)
+        return {}
+
+    def get_action(self, controller, session_id, rld, puzzle_counter):
+        """ updates the model of the session at the end of a puzzle and gets the action chosen by the controller
+
+        Parameters
+        ----------
+        controller : experimentNao.behaviour_controllers.mbc.model_based_controller.ModelBasedController
+        session_id : str
+        rld : List
+        puzzle_counter : int
+
+        Returns
+        -------
+        Dict[str, Any]
+        """
+        action = controller.update_end_of_puzzle_and_get_action(get_rld_from_list(rld), puzzle_counter, write=False)
+        for tom_model in (controller.tom_model, controller.tom_model_predictive):
+            trim_history_of_model(tom_model, self.max_history)
+        return {'puzzle_difficulty': action.puzzle_difficulty_level, 'give_reward': action.give_reward,
+                'cost': float(action.cost)}
+
+
+def get_controller(participant_id, use_prediction_cache):
+    """ returns the model-based controller of a participant, with the best model of the participant
+
+    Parameters
+    ----------
+    participant_id : str
+    use_prediction_cache : bool
+
+    Returns
+    -------
+    experimentNao.behaviour_controllers.mbc.model_based_controller.ModelBasedController
+    """
+    return mbc.ModelBasedController(get_best_id_config(participant_id), verbose=0, for_interaction=False,
+                                    prediction_cache=pc.PredictionCache() if use_prediction_cache else None)
+
+
+def trim_history_of_model(tom_model, max_history):
+    """ removes the oldest values of the variables of the model, keeping only the last "max_history" values, which are
+    the ones used by the controller
+
+    Parameters
+    ----------
+    tom_model : experimentNao.declare_model.declare_entire_model.ToMModelChessSimpleDyn
+    max_history : int
+    """
+    for var in get_all_fast_dyn_vars(tom_model):
+        if len(var.values) > max_history:
+            var.values = list(var.values[-max_history:])
+
+
+def get_rld_as_list(rld):
+    """ returns the real life data as a list that can be sent to the controller service
+
+    Parameters
+    ----------
+    rld : experimentNao.declare_model.chess_interaction_data.ChessInteractionData
+
+    Returns
+    -------
+    List
+    """
+    return [rld.n_hints, list(rld.n_wrong_attempts), rld.puzzle_difficulty, rld.proportion_of_moves_revealed,
+            rld.time_2_solve, rld.nao_helping, rld.nao_offering_rewards, rld.reward_given, rld.skipped_puzzle]
+
+
+def get_rld_from_list(rld_list):
+    """ returns the real life data from a list received by the controller service
+
+    Parameters
+    ----------
+    rld_list : List
+
+    Returns
+    -------
+    experimentNao.declare_model.chess_interaction_data.ChessInteractionData
+    """
+    rld = cid.ChessInteractionData()
+    rld.fill_data(*rld_list)
+    return rld
+
+
+def get_answers_as_records(participant_answers):
+    """ returns the last answers of the participant as a list of records that can be sent to the controller service
+
+    Parameters
+    ----------
+    participant_answers : Union[None, List[pandas.core.frame.DataFrame]]
+
+    Returns
+    -------
+    Union[None, List[Dict[str, Any]]]
+    """
+    if participant_answers is None:
+        return None
+    return participant_answers[-1][['Var Name', 'Value']].to_dict('records')
+
+
+def get_answers_from_records(records):
+    """ returns the answers of the participant from the list of records received by the controller service
+
+    Parameters
+    ----------
+    records : Union[None, List[Dict[str, Any]]]
+
+    Returns
+    -------
+    Union[None, List[pandas.core.frame.DataFrame]]
+    """
+    return None if records is None else [pd.DataFrame(records)]
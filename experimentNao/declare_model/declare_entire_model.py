@@ -4,6 +4,7 @@ from experimentNao.declare_model.modules import declare_perception_module, decla
     declare_decision_making
 from experimentNao.model_ID.configs import model_configs
 from experimentNao.model_ID.data_processing import excel_data_processing as edp
+from lib import profiling
 from lib.tom_model.model_structure import perception_module, decision_making_module, tom_model
 
 
@@ -90,20 +91,26 @@ def declare_model(included_vars: included_elements.IncludedElements, max_values_
 
 class ToMModelChess(tom_model.TomModel):
     def update_entire_model_in_1_go(self, compute_optimal_action):
-        self.perception_module.compute_and_update_module_in_1_go()
-        for k in range(self.time_steps4convergence):
-            self.cognitive_module.compute_and_update_module()       # the module is the CognitiveModuleChess
+        with profiling.span('perception update', 'model'):
+            self.perception_module.compute_and_update_module_in_1_go()
+        with profiling.span('cognitive update', 'model'):
+            for k in range(self.time_steps4convergence):
+                self.cognitive_module.compute_and_update_module()       # the module is the CognitiveModuleChess
         if compute_optimal_action:
-            self.decision_making_module.compute_and_update_module_in_1_go()
+            with profiling.span('decision-making update', 'model'):
+                self.decision_making_module.compute_and_update_module_in_1_go()
 
 
 class ToMModelChessSimpleDyn(tom_model.TomModel):
     def update_entire_model_in_1_go(self, compute_optimal_action):
-        self.perception_module.compute_and_update_module_in_1_go()
-        for pk in self.cognitive_module.pk:
-            pk.compute_variable_value()
-            pk.update_value()
-        for k in range(self.time_steps4convergence):
-            self.cognitive_module.compute_and_update_module()       # the module is the CognitiveModuleChess
+        with profiling.span('perception update', 'model'):
+            self.perception_module.compute_and_update_module_in_1_go()
+        with profiling.span('cognitive update', 'model'):
+            for pk in self.cognitive_module.pk:
+                pk.compute_variable_value()
+                pk.update_value()
+            for k in range(self.time_steps4convergence):
+                self.cognitive_module.compute_and_update_module()       # the module is the CognitiveModuleChess
         if compute_optimal_action:
-            self.decision_making_module.compute_and_update_module_in_1_go()
+            with profiling.span('decision-making update', 'model'):
+                self.decision_making_module.compute_and_update_module_in_1_go()
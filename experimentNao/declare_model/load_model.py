@@ -77,6 +77,21 @@ def get_files_with_parameters_and_metrics(id_config):
     return file_cog, file_dm, file_metrics, included_variables
 
 
+def get_rld_per_diff(file_metrics):
+    """ returns the average real life data for each difficulty, from the metrics file of the participant
+
+    Parameters
+    ----------
+    file_metrics : pandas.io.excel._base.ExcelFile
+
+    Returns
+    -------
+    pandas.core.frame.DataFrame
+    """
+    sheet_name = file_names.get_names_of_sheets(normalisation=False)
+    return excel_files.get_sheets_from_excel(None, [sheet_name], input_file=file_metrics)[0]
+
+
 def set_parameters(parameters_df, tom_model, vars_w_links_to_id, random, perception_first):
     """ sets the parameters of the cognition and perception modules
 
@@ -0,0 +1,272 @@
+import os
+import json
+import time
+import struct
+
+import numpy as np
+import pandas as pd
+
+from experimentNao import folder_path
+from experimentNao.behaviour_controllers.mbc.aux_functions import get_all_fast_dyn_vars
+from experimentNao.declare_model import declare_entire_model as dem, load_model
+from experimentNao.model_ID.configs import model_configs
+from lib import excel_files
+
+MAGIC = b'TOMMODEL'
+FORMAT_VERSION = 1
+ALIGNMENT = 64      # bytes, alignment of the arrays in the file (so that they can be memory-mapped)
+
+
+class ModelArtifact:
+    def __init__(self, metadata, structure, rld_max_values, parameters_cog, parameters_dm, rld_per_diff):
+        """ identified model of a participant, with everything the model-based controller needs to declare and load
+        it without the workbooks of the identification: the structure of the model (to check that the model declared
+        is the one identified), the parameters of each module, the normalisation values of the real life data, and the
+        average real life data per difficulty. It is saved in a versioned binary file, whose arrays are memory-mapped
+        when it is loaded.
+
+        Parameters
+        ----------
+        metadata : Dict[str, Any]
+            identification configuration, time of creation, and versions of the workbooks it was built from
+        structure : Dict[str, Any]
+            see get_structure_of_model
+        rld_max_values : Dict[str, float]
+        parameters_cog : Tuple[List[str], numpy.ndarray]
+            influencer and value of each parameter of the perception and cognitive modules
+        parameters_dm : Tuple[List[str], numpy.ndarray]
+            name and value of each parameter of the decision-making module
+        rld_per_diff : Tuple[List[str], numpy.ndarray]
+            columns and rows of the average real life data per difficulty
+        """
+        self.metadata = metadata
+        self.structure = structure
+        self.rld_max_values = rld_max_values
+        self.parameters_cog = parameters_cog
+        self.parameters_dm = parameters_dm
+        self.rld_per_diff = rld_per_diff
+
+    def get_parameters_dfs(self):
+        """ returns the parameters as the dataframes of the sheets 'List of Parameters' of the identification files
+
+        Returns
+        -------
+        Tuple[pandas.core.frame.DataFrame, pandas.core.frame.DataFrame]
+        """
+        return pd.DataFrame({'Influencer': self.parameters_cog[0], 'Values': np.array(self.parameters_cog[1])}), \
+            pd.DataFrame({'Name of parameter': self.parameters_dm[0], 'Value': np.array(self.parameters_dm[1])})
+
+    def get_rld_per_diff(self):
+        """ returns the average real life data per difficulty, as the dataframe of the metrics file of the participant
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+        """
+        return pd.DataFrame(np.array(self.rld_per_diff[1]), columns=self.rld_per_diff[0])
+
+    def declare_model(self, id_config):
+        """ declares the model of "id_config" and loads the parameters of the artifact in it
+
+        Parameters
+        ----------
+        id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+
+        Returns
+        -------
+        Tuple[Union[experimentNao.declare_model.declare_entire_model.ToMModelChessSimpleDyn, experimentNao.declare_model.declare_entire_model.ToMModelChess], List, List]
+            model, variables identified, and hidden variables
+        """
+        included_variables = model_configs.get_model_configuration(id_config.model_config, id_config.incremental)
+        tom_model = dem.declare_model(included_variables, self.rld_max_values, id_config)
+        self.check_structure(tom_model)
+        parameters_cog_df, parameters_dm_df = self.get_parameters_dfs()
+        ided_vars, hidden_vars = load_model.load_parameters_in_a_model(tom_model, included_variables, id_config,
+                                                                       parameters_cog_df, parameters_dm_df)
+        return tom_model, ided_vars, hidden_vars
+
+    def check_structure(self, tom_model):
+        """ raises an error if "tom_model" does not have the structure of the model identified
+
+        Parameters
+        ----------
+        tom_model : Union[experimentNao.declare_model.declare_entire_model.ToMModelChessSimpleDyn, experimentNao.declare_model.declare_entire_model.ToMModelChess]
+        """
+        if get_structure_of_model(tom_model) != self.structure:
+            raise ValueError('The model artifact of {} was built for another structure of the model. Build it again '
+                             'with main_model_artifact.py'.format(self.metadata['model id']))
+
+    def save(self, path):
+        """ saves the artifact in a binary file: magic, format version, length of the header (json), header, and the
+        arrays (aligned)
+
+        Parameters
+        ----------
+        path : Union[str, pathlib.Path]
+        """
+        arrays = {'parameters_cog': self.parameters_cog[1], 'parameters_dm': self.parameters_dm[1],
+                  'rld_per_diff': self.rld_per_diff[1]}
+        arrays = {name: np.ascontiguousarray(array, dtype=np.float64) for name, array in arrays.items()}
+        offset, arrays_info = 0, {}
+        for name, array in arrays.items():
+            arrays_info[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+            offset += get_aligned_size(array.nbytes)
+        header = json.dumps({'metadata': self.metadata, 'structure': self.structure,
+                             'rld max values': self.rld_max_values, 'parameters cog': self.parameters_cog[0],
+                             'parameters dm': self.parameters_dm[0], 'rld per diff': self.rld_per_diff[0],
+                             'arrays': arrays_info}).encode()
+        preamble = MAGIC + struct.pack('<II', FORMAT_VERSION, len(header)) + header
+        with open(str(path) + '.tmp', 'wb') as file:
+            file.write(preamble + bytes(get_aligned_size(len(preamble)) - len(preamble)))
+            for array in arrays.values():
+                file.write(array.tobytes() + bytes(get_aligned_size(array.nbytes) - array.nbytes))
+        os.replace(str(path) + '.tmp', path)
+
+    @staticmethod
+    def load(path):
+        """ loads an artifact saved with "ModelArtifact.save". The arrays are memory-mapped (read only)
+
+        Parameters
+        ----------
+        path : Union[str, pathlib.Path]
+
+        Returns
+        -------
+        ModelArtifact
+        """
+        with open(path, 'rb') as file:
+            magic, (version, header_length) = file.read(len(MAGIC)), struct.unpack('<II', file.read(8))
+            if magic != MAGIC:
+                raise ValueError('{} is not a model artifact'.format(path))
+            if version != FORMAT_VERSION:
+                raise ValueError('The model artifact {} has format version {}, but version {} is expected. Build it '
+                                 'again with main_model_artifact.py'.format(path, version, FORMAT_VERSION))
+            header = json.loads(file.read(header_length))
+        data_offset = get_aligned_size(len(MAGIC) + 8 + header_length)
+        arrays = {name: np.memmap(path, dtype=info['dtype'], mode='r', offset=data_offset + info['offset'],
+                                  shape=tuple(info['shape'])) if np.prod(info['shape']) > 0
+                  else np.zeros(info['shape'], dtype=info['dtype'])
+                  for name, info in header['arrays'].items()}
+        return ModelArtifact(header['metadata'], header['structure'], header['rld max values'],
+                             (header['parameters cog'], arrays['parameters_cog']),
+                             (header['parameters dm'], arrays['parameters_dm']),
+                             (header['rld per diff'], arrays['rld_per_diff']))
+
+    def is_up_to_date(self):
+        """ returns whether the workbooks that the artifact was built from were not changed since then (the workbooks
+        that do not exist anymore are not checked)
+
+        Returns
+        -------
+        bool
+        """
+        for path, mtime, size in self.metadata['sources']:
+            if os.path.exists(path) and list(excel_files.get_file_version(path)[1:]) != [mtime, size]:
+                return False
+        return True
+
+
+def build_model_artifact(id_config, files=None):
+    """ builds the artifact of the model identified with "id_config" from the workbooks of the identification and the
+    metrics file of the participant
+
+    Parameters
+    ----------
+    id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+    files : Tuple[pandas.io.excel._base.ExcelFile, pandas.io.excel._base.ExcelFile, pandas.io.excel._base.ExcelFile]
+        files with the parameters of the cognitive and decision-making modules, and with the metrics of the
+        participant. If None, the files of the participant of "id_config" (in the output folder) are used
+
+    Returns
+    -------
+    ModelArtifact
+    """
+    if files is None:
+        file_cog, file_dm, file_metrics, _ = load_model.get_files_with_parameters_and_metrics(id_config)
+    else:
+        file_cog, file_dm, file_metrics = files
+    parameters_cog_df, parameters_dm_df = load_model.get_dfs_with_files(file_cog, file_dm)
+    values_cog = [value if not isinstance(value, bool) else (1 if value else -1)
+                  for value in parameters_cog_df['Values']]
+    rld_per_diff = load_model.get_rld_per_diff(file_metrics)
+    rld_max_values = dem.get_normalization_values_of_rld(file_metrics, from_id=True)
+    included_variables = model_configs.get_model_configuration(id_config.model_config, id_config.incremental)
+    metadata = {'model id': id_config.get_model_id_file_name(), 'participant': id_config.participant_id,
+                'model config': id_config.model_config.name, 'incremental': id_config.incremental,
+                'simple dynamics': id_config.simple_dynamics, 'n horizon': id_config.n_horizon,
+                'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'sources': [[str(path)] + list(excel_files.get_file_version(path)[1:])
+                            for path in (getattr(file, 'path', None) for file in (file_cog, file_dm, file_metrics))
+                            if isinstance(path, (str, os.PathLike))]}
+    structure = get_structure_of_model(dem.declare_model(included_variables, rld_max_values, id_config))
+    return ModelArtifact(metadata, structure, {str(key): float(value) for key, value in rld_max_values.items()},
+                         ([str(name) for name in parameters_cog_df['Influencer']], np.array(values_cog, dtype=float)),
+                         ([str(name) for name in parameters_dm_df['Name of parameter']],
+                          parameters_dm_df['Value'].to_numpy(dtype=float)),
+                         ([str(column) for column in rld_per_diff.columns], rld_per_diff.to_numpy(dtype=float)))
+
+
+def get_model_artifact(id_config):
+    """ returns the artifact of the model identified with "id_config": the one saved with main_model_artifact.py, if it
+    exists and is up-to-date, or otherwise one built from the workbooks
+
+    Parameters
+    ----------
+    id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+
+    Returns
+    -------
+    ModelArtifact
+    """
+    path = get_model_artifact_path(id_config)
+    if path.exists():
+        artifact = ModelArtifact.load(path)
+        if artifact.is_up_to_date():
+            return artifact
+        print('The model artifact {} is older than its workbooks: they are used instead'.format(path))
+    return build_model_artifact(id_config)
+
+
+def get_structure_of_model(tom_model):
+    """ returns the structure of "tom_model": its type, the influencers of each variable, and the intentions
+
+    Parameters
+    ----------
+    tom_model : Union[experimentNao.declare_model.declare_entire_model.ToMModelChessSimpleDyn, experimentNao.declare_model.declare_entire_model.ToMModelChess]
+
+    Returns
+    -------
+    Dict[str, Any]
+    """
+    return {'model': type(tom_model).__name__,
+            'variables': [[var.name, [inf.influencer_variable.name for inf in getattr(var, 'influencers', [])]]
+                          for var in get_all_fast_dyn_vars(tom_model)],
+            'intentions': [intention.name for intention in tom_model.decision_making_module.intention_selector.outputs]}
+
+
+def get_aligned_size(n_bytes):
+    """ returns the smallest multiple of ALIGNMENT that is not smaller than "n_bytes"
+
+    Parameters
+    ----------
+    n_bytes : int
+
+    Returns
+    -------
+    int
+    """
+    return -(-n_bytes // ALIGNMENT) * ALIGNMENT
+
+
+def get_model_artifact_path(id_config):
+    """ returns the path of the artifact of the model identified with "id_config"
+
+    Parameters
+    ----------
+    id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+
+    Returns
+    -------
+    pathlib.Path
+    """
+    return folder_path.output_folder_path / 'model_artifacts' / (id_config.get_model_id_file_name() + '.model')
@@ -3,18 +3,19 @@ import time
 import random
 from enum import Enum
 
-from experimentNao import folder_path
+from experimentNao import folder_path, participant
 from lib.speech_recognition_module import my_speech_recognition as sr
-from lib import excel_files
+from lib import excel_files, event_loop, profiling
 from experimentNao.declare_model import declare_entire_model as dem
 from experimentNao.behaviour_controllers import predefined_controller as pc, alternative_controller as ac
-from experimentNao.behaviour_controllers.mbc import model_based_controller as mbc
+from experimentNao.behaviour_controllers.mbc import model_based_controller as mbc, policy_table as pt, \
+    prediction_cache as pc_mbc
 from experimentNao.interaction import verbose
 from experimentNao.interaction.performance_of_participant import performance_indicators as pi, \
     participant_feedback as parti_fb
-from experimentNao.interaction.nao_behaviour import conversation_manager as convo, nao_requests, reward_system as rs, \
-    hints, participant_requests
-from experimentNao.chess_game import my_chess_engine
+from experimentNao.interaction.nao_behaviour import conversation_manager as convo, reward_system as rs, hints, \
+    participant_requests
+from experimentNao.chess_game import my_chess_engine, puzzle_prefetcher
 from experimentNao.chess_game.graphic_board import graphic_simulation as g_sim
 
 
@@ -32,6 +33,8 @@ class Interaction:
         id_conf : experimentNao.model_ID.configs.overall_config.IDConfig
             configuration of the theory of mind model
         """
+        if interaction_settings.profile:
+            profiling.profiler.enable()
         # Set relevant data:
         self.n_puzzles_per_group = 3
         self.max_number_of_puzzles = 30 if not interaction_settings.demo else 1
@@ -54,19 +57,33 @@ class Interaction:
             self.tom_model = dem.get_model_from_config(id_conf, dem.get_normalization_values_of_rld(None))
         else:
             if self.interaction_mode == InteractionMode.MBC:
-                self.controller = mbc.ModelBasedController(id_conf, verbose=2)
+                policy_table = pt.PolicyTable.load(pt.get_policy_table_path(id_conf)) \
+                    if interaction_settings.use_policy_table else None
+                prediction_cache = pc_mbc.PredictionCache() if interaction_settings.use_prediction_cache else None
+                self.controller = mbc.ModelBasedController(id_conf, verbose=2, policy_table=policy_table,
+                                                           prediction_cache=prediction_cache)
             elif self.interaction_mode == InteractionMode.ALTERNATIVE_C:
                 self.controller = ac.AlternativeController(id_conf, self.max_time_of_interaction, verbose=1)
             self.tom_model = self.controller.tom_model
         # Systems of the interaction
-        self.nao_client = nao_requests.NaoClient() if interaction_settings.with_nao else None
-        self.speech_recognizer = sr.SpeechRecognizer()
+        self.nao_client = get_nao_client(interaction_settings)
+        self.speech_recognizer = sr.SpeechRecognizer(
+            templates_path=folder_path.output_folder_path / 'keyword_templates' /
+            (participant.participant_identifier + '.npz') if interaction_settings.persist_keyword_templates else None)
         self.participant_requests = participant_requests.RequestsHolder(self)
         self.conversation_manager = convo.ConversationManager(self.nao_client, self.speech_recognizer, self)
         self.chess_engine = my_chess_engine.MyChessEngine(interaction_mode=True, lichess_db=interaction_settings.lichess_db,
-                                                          interaction_number=self.interaction_settings.session_number)
+                                                          interaction_number=self.interaction_settings.session_number,
+                                                          participant_id=participant.participant_identifier
+                                                          if interaction_settings.persist_shown_puzzles else None)
+        self.puzzle_prefetcher = puzzle_prefetcher.PuzzlePrefetcher(
+            self.chess_engine, [difficulty for difficulty in self.controller.get_candidate_difficulties()
+                                if difficulty < len(self.chess_engine.puzzles.puzzles)]) \
+            if interaction_settings.prefetch_puzzles else None
         self.chess_display = g_sim.GraphicSimulation(self.chess_engine, self.participant_requests, interaction_mode=True,
                                                      second_screen=interaction_settings.second_screen)
+        self.event_loop = event_loop.TkEventLoop(self.chess_display.main_window) \
+            if interaction_settings.event_loop_runtime else None
         self.set_connection_between_chess_engine_and_gui()
         self.performance_indicators = pi.PerformanceIndicators()
         self.feedback_manager = parti_fb.ParticipantFeedback(self, self.interaction_mode == InteractionMode.TRAINING)
@@ -86,12 +103,22 @@ class Interaction:
                 self.conversation_manager.interaction_introduction()         # introduction and ask for name
         self.writer = self.create_excel()  # create excel
         self.play_puzzles()
+        if self.puzzle_prefetcher is not None:
+            self.puzzle_prefetcher.shutdown()
         self.feedback_manager.writer.close()
         if self.interaction_settings.demo:
             self.conversation_manager.output_command('You finish the demo. Time to play!')
         else:
             self.conversation_manager.output_command('We finished this session! It was nice playing with you.')
+        self.feedback_manager.cancel_periodic_action()
+        if self.interaction_settings.with_nao and self.interaction_settings.async_nao_client:
+            self.nao_client.wait_until_idle()       # Nao finishes what it was doing before the channel is closed
+            self.nao_client.close()
+        if self.event_loop is not None:
+            self.event_loop.close()
         self.chess_display.main_window.close_window()
+        if self.interaction_settings.profile:
+            self.save_profile()
 
     def play_puzzles(self):
         """ manages the puzzles that are shown to the participants. Starts by explaining instructions, enables the mic
@@ -176,18 +203,41 @@ class Interaction:
             self.conversation_manager.output_command('I am sorry to see you go.')
 
     def set_new_puzzle(self):
-        """ selects and sets a new puzzle while making sure it has the suitable length
+        """ selects and sets a new puzzle while making sure it has the suitable length. If the puzzles are prefetched,
+        the puzzle prepared for the difficulty is used, and the preparation of the next puzzles starts.
 
         """
-        success = False
+        allowed_n_moves = self.get_allowed_numbers_of_moves(self.chess_engine.current_difficulty)
+        prepared_puzzle = self.puzzle_prefetcher.take(self.chess_engine.current_difficulty, allowed_n_moves) \
+            if self.puzzle_prefetcher is not None else None
+        if prepared_puzzle is not None:
+            self.chess_engine.set_prepared_puzzle(prepared_puzzle)
+        success = prepared_puzzle is not None and \
+            self.controller.reset_beginning_of_puzzle(prepared_puzzle.puzzle.number_of_moves)
         while not success:
-            self.chess_engine.set_new_puzzle()
-            puzzle = self.chess_engine.current_puzzle
-            success = self.controller.reset_beginning_of_puzzle(puzzle.number_of_moves)
+            self.chess_engine.set_new_puzzle(n_moves=allowed_n_moves)
+            success = self.controller.reset_beginning_of_puzzle(self.chess_engine.current_puzzle.number_of_moves)
+        puzzle = self.chess_engine.current_puzzle
+        if self.puzzle_prefetcher is not None:
+            self.puzzle_prefetcher.prefetch({difficulty: self.get_allowed_numbers_of_moves(difficulty)
+                                             for difficulty in self.puzzle_prefetcher.difficulties})
         self.performance_indicators.save_puzzle_info(puzzle)    # write to excel the info of the puzzle
         if verbose.VERBOSE.basic_info:
             print('We are playing puzzle ' + (puzzle.url if puzzle.url is not None else str(puzzle.tag)) + ' , difficulty ' + str(puzzle.difficulty))
 
+    def get_allowed_numbers_of_moves(self, difficulty):
+        """ returns the numbers of moves of the puzzles of "difficulty" that allow to ask the questions of the puzzle
+
+        Parameters
+        ----------
+        difficulty : int
+
+        Returns
+        -------
+        List[int]
+        """
+        return self.controller.get_allowed_numbers_of_moves(self.chess_engine.puzzles.get_numbers_of_moves(difficulty))
+
     def show_board_and_ask_for_move(self, current_move, last_move):
         """
 
@@ -210,7 +260,10 @@ class Interaction:
             if self.feedback_manager.ask_asynchronous_feedback:     # ask time's up
                 self.run_discrete_time_step_task()
             self.handle_mic_reset()
-            self.chess_display.run_simulation_interaction_mode()
+            if self.event_loop is not None:     # sleep until the move or another event
+                self.event_loop.wait_until(self.is_there_an_event_to_handle)
+            else:
+                self.chess_display.run_simulation_interaction_mode()
             if self.check_and_handle_participants_requests():
                 return
         # 3. Move made and received.
@@ -263,6 +316,19 @@ class Interaction:
             self.conversation_manager.ask_for_feedback()
             self.feedback_manager.ask_feedback_before_helping_participant(n_times_question_asked_before_helping)
 
+    def is_there_an_event_to_handle(self):
+        """ whether the loop of the board has to stop waiting: because of the move of the participant, a request, the
+        periodic feedback, or the reset of the mic
+
+        Returns
+        -------
+        bool
+        """
+        return self.chess_engine.move_chosen or self.feedback_manager.ask_asynchronous_feedback or \
+            self.chess_display.microphone_needs_reset or \
+            any(request.participant_might_want_it or request.participant_wants_it
+                for request in self.participant_requests.get_requests())
+
     def check_and_handle_participants_requests(self):
         """ checks and handles the requests of the participants to get help, skip, or quit
 
@@ -298,6 +364,13 @@ class Interaction:
                                                                           self.show_board_and_ask_for_move(current_move,
                                                                                                            last_move))
         self.chess_engine.set_function_that_displays_computers_move(lambda best_move: self.play_engine_move(best_move))
+        if self.event_loop is not None:     # the window keeps running while the engine, Nao, etc. are waited for
+            self.chess_display.set_event_loop(self.event_loop)
+            self.chess_engine.set_function_that_waits_for_futures(self.event_loop.wait_for_future)
+            if self.puzzle_prefetcher is not None:
+                self.puzzle_prefetcher.set_function_that_waits_for_futures(self.event_loop.wait_for_future)
+            if self.interaction_settings.with_nao and self.interaction_settings.async_nao_client:
+                self.nao_client.set_function_that_waits_for_futures(self.event_loop.wait_for_future)
 
     def skip_puzzle(self):
         """ manages action "skip puzzle"
@@ -408,6 +481,15 @@ class Interaction:
             self.controller.controller_writer.set_excel(writer)
         return writer
 
+    def save_profile(self):
+        """ saves the trace and the summary of the time spent in the model, controller, excel files and Nao during the
+        session
+
+        """
+        profiling.profiler.disable()
+        profiling.profiler.save(folder_path.output_folder_path / 'profiles' /
+                                'interaction_{}_{}'.format(self.participant_id, int(time.time())))
+
     def init_random(self):
         """ initialize the random variable
 
@@ -417,6 +499,27 @@ class Interaction:
         self.random = random.Random(self.seed)
 
 
+def get_nao_client(interaction_settings):
+    """ returns the client of Nao, or None if the interaction is done without Nao (the gRPC clients are only imported
+    when Nao is connected)
+
+    Parameters
+    ----------
+    interaction_settings : experimentNao.interaction.interaction_settings.InteractionSettings
+
+    Returns
+    -------
+    Union[experimentNao.interaction.nao_behaviour.async_nao_requests.AsyncNaoClient, experimentNao.interaction.nao_behaviour.nao_requests.NaoClient, None]
+    """
+    if not interaction_settings.with_nao:
+        return None
+    if interaction_settings.async_nao_client:
+        from experimentNao.interaction.nao_behaviour import async_nao_requests
+        return async_nao_requests.AsyncNaoClient()
+    from experimentNao.interaction.nao_behaviour import nao_requests
+    return nao_requests.NaoClient()
+
+
 class Counter:
     def __init__(self, puzzle_counter, periodic_hints_counter):
         """ Initialize the counters needed for the interaction
@@ -37,6 +37,14 @@ class InteractionSettings:
         self.second_screen = second_screen
         self.lichess_db = lichess_db
         self.session_number = 1
+        self.use_policy_table = False   # if the MBC uses the policy table pre-computed with main_policy_table.py
+        self.use_prediction_cache = False   # if the MBC memoizes the predictions of the model during the session
+        self.persist_shown_puzzles = False  # if the puzzles shown to the participant are not shown in later sessions
+        self.persist_keyword_templates = True   # if the keyword spotter keeps its templates for the next sessions
+        self.prefetch_puzzles = False   # if the next puzzle of each difficulty is prepared during the current puzzle
+        self.async_nao_client = False   # if the requests to Nao are sent in the background (without blocking)
+        self.event_loop_runtime = False  # if the interaction waits for events in an asyncio loop (instead of polling)
+        self.profile = False            # if the time spent in the model, controller, excel files and Nao is profiled
 
     def set_settings_demo(self):
         """
@@ -0,0 +1,279 @@
+import time
+import asyncio
+import threading
+import itertools
+import collections
+from enum import Enum, IntEnum
+from concurrent import futures
+
+import numpy as np
+
+from experimentNao import client
+from experimentNao.generated import nao_pb2
+from experimentNao.interaction.nao_behaviour import nao_requests
+from experimentNao.interaction.nao_behaviour.requests_enums import ComplexMovements
+from lib import event_loop, profiling
+
+
+class Priority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class Lane(Enum):
+    ROBOT = 0       # speech and movements that cannot overlap (run one after the other, in order)
+    GESTURES = 1    # body movements that accompany the speech
+    CAMERA = 2
+
+
+class AsyncNaoClient(event_loop.FutureWaiter, metaclass=nao_requests.PrintExceptionsAndContinue):
+    def __init__(self, address=client.NAO_ADDRESS, wait_for_speech=True, max_latencies=1000):
+        """ asynchronous client that communicates with the Nao server (with the same interface as
+        experimentNao.interaction.nao_behaviour.nao_requests.NaoClient). The requests are sent by an asyncio event loop
+        that runs in the background, over one grpc.aio channel, so they do not block the interaction (the chess board
+        and the controller). The requests are queued by lane: the requests of each lane run one after the other (by
+        priority, and in order within the same priority), and the lanes run at the same time. Each request returns a
+        future, that can be waited for (the speech is waited for by default, so that Nao does not hear itself) or not.
+
+        Parameters
+        ----------
+        address : str
+        wait_for_speech : bool
+            whether make_nao_say_something waits until Nao has said the text
+        max_latencies : int
+            number of latencies kept per RPC to compute the statistics
+        """
+        self.wait_for_speech = wait_for_speech
+        self.speed_of_speech = None     # speed set in the server (once the request that changes it succeeds)
+        self.n_speed_changes_pending = 0
+        self.lock = threading.Lock()
+        self.counter = itertools.count()    # order of the requests with the same priority
+        self.latencies = collections.defaultdict(lambda: collections.deque(maxlen=max_latencies))
+        self.queue_times = collections.defaultdict(lambda: collections.deque(maxlen=max_latencies))
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.channel, self.the_client, self.queues, self.workers = None, None, {}, []
+        asyncio.run_coroutine_threadsafe(self.start(address), self.loop).result()
+
+    async def start(self, address):
+        """ opens the channel and starts the worker of each lane (in the event loop)
+
+        Parameters
+        ----------
+        address : str
+        """
+        self.channel, self.the_client = client.initialize_async_client(address)
+        self.queues = {lane: asyncio.PriorityQueue() for lane in Lane}
+        self.workers = [asyncio.create_task(self.run_lane(queue)) for queue in self.queues.values()]
+
+    async def run_lane(self, queue):
+        """ runs the requests of one lane, one after the other
+
+        Parameters
+        ----------
+        queue : asyncio.PriorityQueue
+        """
+        while True:
+            _, _, rpc, request, future, queued_time = await queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            if rpc is None:     # marker of wait_until_idle
+                future.set_result(None)
+                continue
+            start_time = time.perf_counter()
+            self.queue_times[rpc].append(start_time - queued_time)
+            try:
+                future.set_result(await getattr(self.the_client, rpc)(request))
+            except Exception as err:
+                future.set_exception(err)
+            end_time = time.perf_counter()
+            self.latencies[rpc].append(end_time - start_time)
+            profiling.profiler.record('nao ' + rpc, 'nao', start_time, end_time)
+
+    def submit(self, rpc, request, lane=Lane.ROBOT, priority=Priority.NORMAL):
+        """ queues the request (it can be called from any thread)
+
+        Parameters
+        ----------
+        rpc : str
+            name of the RPC of the Nao server (e.g., 'SaySomething')
+        request : google.protobuf.message.Message
+        lane : Lane
+        priority : Priority
+
+        Returns
+        -------
+        concurrent.futures.Future
+            future with the response of the server
+        """
+        future = futures.Future()
+        item = (priority, next(self.counter), rpc, request, future, time.perf_counter())
+        self.loop.call_soon_threadsafe(self.queues[lane].put_nowait, item)
+        return future
+
+    async def call(self, rpc, request, lane=Lane.ROBOT, priority=Priority.NORMAL):
+        """ queues the request and waits for its response (to be used by coroutines, in any event loop)
+
+        Parameters
+        ----------
+        rpc : str
+        request : google.protobuf.message.Message
+        lane : Lane
+        priority : Priority
+
+        Returns
+        -------
+        google.protobuf.message.Message
+        """
+        return await asyncio.wrap_future(self.submit(rpc, request, lane, priority))
+
+    def run(self, rpc, request, lane, priority, wait):
+        """ queues the request, and waits for its response if "wait". Otherwise, the errors are printed when the
+        request finishes.
+
+        Parameters
+        ----------
+        rpc : str
+        request : google.protobuf.message.Message
+        lane : Lane
+        priority : Priority
+        wait : bool
+
+        Returns
+        -------
+        Union[concurrent.futures.Future, google.protobuf.message.Message]
+        """
+        future = self.submit(rpc, request, lane, priority)
+        if wait:
+            return self.wait_for(future)
+        future.add_done_callback(print_exception_of_request)
+        return future
+
+    def change_speed_of_speech(self, speed: int, priority=Priority.NORMAL):
+        """ changes the speed of the speech (before the next speech requests). It is not sent to the server when the
+        server already has that speed (and no other change of the speed is pending).
+
+        Parameters
+        ----------
+        speed : int
+        priority : Priority
+        """
+        with self.lock:
+            if speed == self.speed_of_speech and self.n_speed_changes_pending == 0:
+                return None
+            self.n_speed_changes_pending += 1
+        future = self.run('ChangeSpeechSpeed', nao_requests.get_speed_of_speech_request(speed), Lane.ROBOT, priority,
+                          wait=False)
+        future.add_done_callback(lambda future_: self.set_speed_of_speech(speed, future_))
+        return future
+
+    def set_speed_of_speech(self, speed, future):
+        """ saves the speed of the speech when the request that changes it finishes (if it failed, the speed of the
+        server is unknown)
+
+        Parameters
+        ----------
+        speed : int
+        future : concurrent.futures.Future
+        """
+        with self.lock:
+            self.n_speed_changes_pending -= 1
+            self.speed_of_speech = speed if not future.cancelled() and future.exception() is None else None
+
+    def make_nao_say_something(self, text, animated_text=False, priority=Priority.NORMAL, wait=None):
+        """ makes Nao speak the argument "text"
+
+        Parameters
+        ----------
+        text : str
+            text to be spoken
+        animated_text : bool
+            whether the text should be accompanied by gestures
+        priority : Priority
+        wait : bool
+            whether to wait until Nao has said the text. If None, self.wait_for_speech
+        """
+        return self.run('SaySomething', nao_requests.get_speech_request(text, animated_text), Lane.ROBOT, priority,
+                        wait=wait if wait is not None else self.wait_for_speech)
+
+    def make_body_movement(self, movement_type, async_, priority=Priority.NORMAL, wait=False):
+        """ makes Nao perform a body movement. The asynchronous movements (gestures) run at the same time as the
+        speech, and the others in order with the speech.
+
+        Parameters
+        ----------
+        movement_type : experimentNao.interaction.nao_behaviour.requests_enums.BodyMovements
+        async_ : bool
+        priority : Priority
+        wait : bool
+        """
+        return self.run('RunBodyMovement', nao_requests.get_body_movement_request(movement_type, async_),
+                        Lane.GESTURES if async_ else Lane.ROBOT, priority, wait)
+
+    def make_a_coordinated_movement(self, movement_name: ComplexMovements, priority=Priority.NORMAL, wait=False):
+        """ makes Nao perform a complex movement (the movements used for the rewards)
+
+        Parameters
+        ----------
+        movement_name : ComplexMovements
+        priority : Priority
+        wait : bool
+        """
+        return self.run('RunCoordinatedMovement', nao_requests.get_coordinated_movement_request(movement_name),
+                        Lane.ROBOT, priority, wait)
+
+    def get_camera_capture(self):
+        """ gets an image from the Nao camera
+
+        Returns
+        -------
+        nao_pb2.CameraCapture
+        """
+        return self.run('GetCameraCapture', nao_pb2.Void(), Lane.CAMERA, Priority.NORMAL, wait=True)
+
+    def wait_until_idle(self):
+        """ waits until all the requests queued so far have finished
+
+        """
+        for lane in Lane:
+            self.submit(None, None, lane, Priority.LOW).result()
+
+    def get_latency_statistics(self):
+        """ returns the statistics of the latency (in ms) of each RPC, and of the time its requests waited in the queue
+
+        Returns
+        -------
+        Dict[str, Dict[str, float]]
+        """
+        statistics = {}
+        for rpc, latencies in list(self.latencies.items()):
+            latencies = np.array(latencies) * 1000
+            statistics[rpc] = {'n requests': len(latencies), 'mean': float(latencies.mean()),
+                               'p95': float(np.percentile(latencies, 95)), 'max': float(latencies.max()),
+                               'mean queue time': float(np.mean(self.queue_times[rpc]) * 1000)}
+        return statistics
+
+    def close(self):
+        """ cancels the requests queued, closes the channel and stops the event loop
+
+        """
+        async def stop():
+            for worker in self.workers:
+                worker.cancel()
+            await self.channel.close()
+        asyncio.run_coroutine_threadsafe(stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+def print_exception_of_request(future):
+    """ prints the error of a request that was not waited for (as the errors of the server do not stop the interaction)
+
+    Parameters
+    ----------
+    future : concurrent.futures.Future
+    """
+    if not future.cancelled() and future.exception() is not None:
+        print(future.exception())
@@ -1,9 +1,11 @@
 from threading import Lock
-import pyttsx3
 from experimentNao.interaction import verbose
 from experimentNao.interaction.nao_behaviour.requests_enums import BodyMovements
 import re
 
+CONFIRMATION_WORDS = ['yes', 'I do', 'sure']
+DENIAL_WORDS = ['no']
+
 
 class ConversationManager:
     def __init__(self, nao_client, speech_recognizer, interaction):
@@ -23,6 +25,7 @@ class ConversationManager:
         self.participant_requests = interaction.participant_requests
         # Participant info
         if not interaction.interaction_settings.with_nao:                                   # when they asked for help
+            import pyttsx3      # the speech of the computer is only needed without Nao
             self.tts_engine = pyttsx3.init()
             self.tts_engine.setProperty('rate', 250)
         self.random = interaction.random
@@ -241,11 +244,25 @@ class ConversationManager:
         self.process_participant_voice_request as callback.
 
         """
-        self.speech_recognizer.listen_in_background(self.process_participant_voice_request, False,
-                                                    phrase_time_limit=3)
+        callback = self.process_participant_voice_request
+        if self.interaction.event_loop is not None:     # wake up the loop of the board when a request is heard
+            callback = self.interaction.event_loop.get_notifying_callback(callback)
+        self.speech_recognizer.listen_in_background(callback, False, phrase_time_limit=3,
+                                                    keywords=self.get_keywords_of_requests())
         if verbose.VERBOSE.microphone_information:
             print(' [M] Started listening in background')
 
+    def get_keywords_of_requests(self):
+        """ returns the words that the participant can say in the background: the key words of the requests and the
+        answers to the confirmation of the requests
+
+        Returns
+        -------
+        List[str]
+        """
+        return [word for request in self.participant_requests.get_requests() for word in request.key_words] + \
+            CONFIRMATION_WORDS + DENIAL_WORDS
+
     def reset_listen_for_request_in_background(self):
         """ resets the function of the microphone to listen in the background
 
@@ -270,9 +287,9 @@ class ConversationManager:
                 if request.process_voice_request(self.speech_recognizer, audio):
                     break
         else:
-            if self.speech_recognizer.look_for_words_in_audio(words_2_look_4=['yes', 'I do', 'sure'], audio=audio):
+            if self.speech_recognizer.look_for_words_in_audio(words_2_look_4=CONFIRMATION_WORDS, audio=audio):
                 self.request_in_confirmation.participant_wants_it = True
-            elif self.speech_recognizer.look_for_words_in_audio(words_2_look_4=['no'], audio=audio):
+            elif self.speech_recognizer.look_for_words_in_audio(words_2_look_4=DENIAL_WORDS, audio=audio):
                 self.request_in_confirmation.participant_wants_it = False
                 self.output_command('I am sorry, I misunderstood you.')
             else:
@@ -9,6 +9,23 @@ class HintTypes(Enum):
     SAY_MOVE = 3
 
 
+# Types of move of the hints of type TYPE_OF_MOVE, in order of priority, and the themes of the puzzles (as in the puzzle
+# database, compared in lower case) that they describe
+TYPES_OF_MOVE = [('mate', {'mate', 'matein1', 'matein2', 'matein3', 'matein4', 'matein5', 'anastasiamate',
+                           'arabianmate', 'backrankmate', 'bodenmate', 'doublebishopmate', 'dovetailmate', 'hookmate',
+                           'smotheredmate'}),
+                 ('check', {'check', 'doublecheck'}),
+                 ('fork', {'fork'}),
+                 ('sacrifice', {'sacrifice'}),
+                 ('capture', {'capture', 'capturingdefender', 'hangingpiece'}),
+                 ('pin', {'pin'}),
+                 ('advanced pawn', {'advancedpawn'}),
+                 ('endgame', {'endgame', 'bishopendgame', 'knightendgame', 'pawnendgame', 'queenendgame',
+                              'queenrookendgame', 'rookendgame'}),
+                 ('advantage', {'advantage'}),
+                 ('defense', {'defense', 'defensivemove'})]
+
+
 class HelpingSystem:
     def __init__(self, chess_engine, nao_helping, random_):
         """ system that coordinates the hints given by Nao to the participants
@@ -116,12 +133,13 @@ class HelpingSystem:
                 piece, name = self.chess_engine.piece_in_position(wrong_starting_pos)
             hint = self.give_type_to_move_hint(name)
         elif hint_type == HintTypes.TYPE_OF_MOVE:
-            correct_type = self.chess_engine.current_puzzle.type.lower()
-            # correct_type = correct_type.split(' ')[0]
+            puzzle = self.chess_engine.current_puzzle
+            correct_types = get_types_of_move(self.chess_engine.puzzles.index.get_themes(puzzle.index))
             if self.nao_helping:
-                hint = self.give_type_of_puzzle_hint(correct_type)
+                hint = self.give_type_of_puzzle_hint(correct_types[0] if correct_types
+                                                     else puzzle.type.split(' ')[0])
             else:
-                wrong_type = 'check' if 'check' not in correct_type else 'fork' if 'fork' not in correct_type else 'capture'
+                wrong_type = next((type_ for type_ in ['check', 'fork'] if type_ not in correct_types), 'capture')
                 hint = self.give_type_of_puzzle_hint(wrong_type)
         return hint
 
@@ -147,34 +165,34 @@ class HelpingSystem:
         Parameters
         ----------
         puzzle_type : str
-            type of the piece that should be moved
+            type of move of TYPES_OF_MOVE, or a theme of the puzzle that is not in TYPES_OF_MOVE
 
         Returns
         -------
         str
         """
-        if 'mate' in puzzle_type:       # check , check-mate
+        if puzzle_type == 'mate':
             hint = 'Can you give a ' + self.pause + 'check-mate?'
-        elif 'check' in puzzle_type:       # check , check-mate
+        elif puzzle_type == 'check':
             hint = 'Can you give a ' + self.pause + 'check?'
-        elif 'fork' in puzzle_type:
+        elif puzzle_type == 'fork':
             hint = 'Is there any ' + self.pause + 'fork that you can think of?'
-        elif 'sacrifice' in puzzle_type:
+        elif puzzle_type == 'sacrifice':
             hint = 'Is there any sacrifice that you can think of?'
-        elif 'capture' in puzzle_type:
+        elif puzzle_type == 'capture':
             hint = 'You can capture a piece. Can you find out how?'
-        elif 'pin' in puzzle_type:
+        elif puzzle_type == 'pin':
             hint = 'Can you pin any piece?'
-        elif 'advanced pawn' in puzzle_type:
+        elif puzzle_type == 'advanced pawn':
             hint = 'Can you protect the advanced pawn?'
-        elif 'endgame' in puzzle_type:
+        elif puzzle_type == 'endgame':
             hint = 'This is an endgame type of puzzle!'
-        elif 'advantage' in puzzle_type:
+        elif puzzle_type == 'advantage':
             hint = 'Is there any way for you to gain an advantage in this puzzle?'
-        elif 'defense' in puzzle_type:
+        elif puzzle_type == 'defense':
             hint = 'Maybe you should focus on defense.'
         else:
-            hint = 'This puzzle is about performing a ' + self.pause + puzzle_type.split(' ')[0]
+            hint = 'This puzzle is about performing a ' + self.pause + puzzle_type
         return hint
 
     def select_type_of_hint(self):
@@ -195,6 +213,22 @@ class HelpingSystem:
         return hint_type
 
 
+def get_types_of_move(themes):
+    """ returns the types of move of TYPES_OF_MOVE described by the themes of a puzzle, in order of priority
+
+    Parameters
+    ----------
+    themes : Set[str]
+        themes of the puzzle, as in the puzzle database
+
+    Returns
+    -------
+    List[str]
+    """
+    themes = {theme.lower() for theme in themes}
+    return [type_ for type_, themes_of_type in TYPES_OF_MOVE if themes & themes_of_type]
+
+
 def change_speed_of_speech(nao_client, new_speed):
     """ changes the speed of the speech
 
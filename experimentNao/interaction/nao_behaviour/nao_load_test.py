@@ -0,0 +1,75 @@
+import time
+import random
+
+import numpy as np
+
+from experimentNao.interaction.nao_behaviour.requests_enums import ComplexMovements, BodyMovements
+
+
+def run_station(nao_client, n_puzzles=10, n_moves=4, n_puzzles_per_reward=3, seed=None):
+    """ sends to the Nao server the requests of an interaction with "n_puzzles" puzzles (as sent by
+    experimentNao.interaction.interaction_manager.Interaction), and measures how long the interaction loop is blocked
+    by the requests of each step, and how long each puzzle takes.
+
+    Parameters
+    ----------
+    nao_client : Union[experimentNao.interaction.nao_behaviour.nao_requests.NaoClient,
+                       experimentNao.interaction.nao_behaviour.async_nao_requests.AsyncNaoClient]
+    n_puzzles : int
+    n_moves : int
+        number of moves of the robot in each puzzle
+    n_puzzles_per_reward : int
+    seed : int
+
+    Returns
+    -------
+    Dict[str, Any]
+        latencies of the steps and of the puzzles (in seconds), and number of requests sent
+    """
+    random_ = random.Random(seed)
+    step_latencies, puzzle_latencies, n_requests = [], [], 0
+    start_time = time.perf_counter()
+    for puzzle in range(n_puzzles):
+        puzzle_start_time = time.perf_counter()
+        steps = [lambda: nao_client.make_body_movement(BodyMovements.YES, async_=True),
+                 lambda: nao_client.make_nao_say_something("\\pau=100\\Let's try another puzzle")]
+        for move in range(n_moves):
+            steps.append(lambda: nao_client.make_nao_say_something('I move knight to ' + random_.choice('abcdefgh') +
+                                                                   str(random_.randint(1, 8))))
+        steps += [lambda: nao_client.change_speed_of_speech(70),
+                  lambda: nao_client.make_nao_say_something("I'll give you a hint. Try to move your queen"),
+                  lambda: nao_client.change_speed_of_speech(100),
+                  lambda: nao_client.make_nao_say_something('Well done! You solved it')]
+        if (puzzle + 1) % n_puzzles_per_reward == 0:
+            steps += [lambda: nao_client.make_nao_say_something('You deserve a reward'),
+                      lambda: nao_client.make_a_coordinated_movement(random_.choice(list(ComplexMovements)))]
+        for step in steps:
+            step_start_time = time.perf_counter()
+            step()
+            step_latencies.append(time.perf_counter() - step_start_time)
+        n_requests += len(steps)
+        puzzle_latencies.append(time.perf_counter() - puzzle_start_time)
+    return {'step latencies': step_latencies, 'puzzle latencies': puzzle_latencies, 'n requests': n_requests,
+            'time': time.perf_counter() - start_time}
+
+
+def get_summary(results):
+    """ returns the summary of the load test of several stations (see run_station)
+
+    Parameters
+    ----------
+    results : List[Dict[str, Any]]
+
+    Returns
+    -------
+    Dict[str, float]
+    """
+    step_latencies = np.concatenate([result['step latencies'] for result in results]) * 1000
+    puzzle_latencies = np.concatenate([result['puzzle latencies'] for result in results])
+    return {'n stations': len(results),
+            'step latency p50 (ms)': float(np.percentile(step_latencies, 50)),
+            'step latency p95 (ms)': float(np.percentile(step_latencies, 95)),
+            'step latency max (ms)': float(step_latencies.max()),
+            'puzzle time mean (s)': float(puzzle_latencies.mean()),
+            'requests per second': sum(result['n requests'] for result in results) /
+            max(result['time'] for result in results)}
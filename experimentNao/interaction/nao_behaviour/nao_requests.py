@@ -1,3 +1,4 @@
+import inspect
 from functools import wraps
 from types import FunctionType
 
@@ -6,10 +7,11 @@ from experimentNao.generated import nao_pb2
 import time
 import PIL.Image as Image
 from experimentNao.interaction.nao_behaviour.requests_enums import ComplexMovements, BodyMovements
+from lib import profiling
 
 
 def wrapper(method):
-    """ avoids error from server causing a crash in the interaction
+    """ avoids error from server causing a crash in the interaction (and records the request in the profiler)
 
     Parameters
     ----------
@@ -19,10 +21,13 @@ def wrapper(method):
     -------
     function
     """
+    span_name = 'nao ' + method.__name__
+
     @wraps(method)
     def wrapped(*args, **kwargs):
         try:
-            return method(*args, **kwargs)
+            with profiling.span(span_name, 'nao'):
+                return method(*args, **kwargs)
         except Exception as err:
             print(err)
 
@@ -42,8 +47,8 @@ class PrintExceptionsAndContinue(type):
         new_class_dict = {}
 
         for attribute_name, attribute in class_dict.items():
-            if isinstance(attribute, FunctionType):
-                # replace it with a wrapped version
+            if isinstance(attribute, FunctionType) and not inspect.iscoroutinefunction(attribute):
+                # replace it with a wrapped version (not the coroutines, whose errors are raised when awaited)
                 attribute = wrapper(attribute)
 
             new_class_dict[attribute_name] = attribute
@@ -52,11 +57,14 @@ class PrintExceptionsAndContinue(type):
 
 
 class NaoClient(metaclass=PrintExceptionsAndContinue):
-    def __init__(self):
+    def __init__(self, address=client.NAO_ADDRESS):
         """ client that communicates with the Nao server
 
+        Parameters
+        ----------
+        address : str
         """
-        self.the_client = client.initialize_client()
+        self.the_client = client.initialize_client(address)
 
     def change_speed_of_speech(self, speed: int):
         """ changes the speed of the speech
@@ -65,9 +73,7 @@ class NaoClient(metaclass=PrintExceptionsAndContinue):
         ----------
         speed : int
         """
-        number_message = nao_pb2.NumericRequest()
-        number_message.number1 = speed
-        self.the_client.ChangeSpeechSpeed(number_message)    
+        self.the_client.ChangeSpeechSpeed(get_speed_of_speech_request(speed))
     
     def make_nao_say_something(self, text, animated_text=False):
         """ makes Nao speak the argument "text"
@@ -79,10 +85,7 @@ class NaoClient(metaclass=PrintExceptionsAndContinue):
         animated_text : bool
             whether the text should be accompanied by gestures
         """
-        request_message = nao_pb2.MessageToSpeak()
-        request_message.message = text
-        request_message.animated_message = animated_text
-        self.the_client.SaySomething(request_message)
+        self.the_client.SaySomething(get_speech_request(text, animated_text))
     
     def make_body_movement(self, movement_type, async_):
         """ makes Nao perform a body movement
@@ -92,19 +95,7 @@ class NaoClient(metaclass=PrintExceptionsAndContinue):
         movement_type : experimentNao.interaction.nao_behaviour.requests_enums.BodyMovements
         async_ : bool
         """
-        assert isinstance(movement_type, BodyMovements)
-        possible_requests = (Request(BodyMovements.ME, 'me'),
-                             Request(BodyMovements.YOU, 'you'),
-                             Request(BodyMovements.YES, 'yes'),
-                             Request(BodyMovements.NO, 'no'),
-                             Request(BodyMovements.YOU_KNOW_WHAT, 'you know what'),
-                             Request(BodyMovements.EXPLAIN, 'explain'),
-                             Request(BodyMovements.EXCITED, 'excited'),
-                             Request(BodyMovements.HELLO, 'hello'))
-        request = nao_pb2.BodyMovement()
-        request.movement_tag = get_request_string(possible_requests, movement_type)
-        request.asynchronous = async_
-        self.the_client.RunBodyMovement(request)
+        self.the_client.RunBodyMovement(get_body_movement_request(movement_type, async_))
     
     def make_a_coordinated_movement(self, movement_name: ComplexMovements):
         """ makes Nao perform a complex movement (the movements used for the rewards)
@@ -113,15 +104,7 @@ class NaoClient(metaclass=PrintExceptionsAndContinue):
         ----------
         movement_name : ComplexMovements
         """
-        assert isinstance(movement_name, ComplexMovements)
-        possible_requests = (Request(ComplexMovements.PLAY_GUITAR, 'play the guitar'),
-                             Request(ComplexMovements.DANCE, 'dance disco'),
-                             Request(ComplexMovements.PICTURE, 'take picture'),
-                             Request(ComplexMovements.ELEPHANT, 'elephant'),
-                             Request(ComplexMovements.TAI_CHI, 'tai chi'))
-        movement = nao_pb2.CoordinatedMovement()
-        movement.movement = get_request_string(possible_requests, movement_name)
-        self.the_client.RunCoordinatedMovement(movement)
+        self.the_client.RunCoordinatedMovement(get_coordinated_movement_request(movement_name))
 
     def get_images_from_nao(self):
         """ gets images from the Nao camera
@@ -142,6 +125,89 @@ class NaoClient(metaclass=PrintExceptionsAndContinue):
             time.sleep(1)
 
 
+def get_speed_of_speech_request(speed):
+    """ returns the request that changes the speed of the speech to "speed"
+
+    Parameters
+    ----------
+    speed : int
+
+    Returns
+    -------
+    nao_pb2.NumericRequest
+    """
+    number_message = nao_pb2.NumericRequest()
+    number_message.number1 = speed
+    return number_message
+
+
+def get_speech_request(text, animated_text=False):
+    """ returns the request that makes Nao say "text"
+
+    Parameters
+    ----------
+    text : str
+    animated_text : bool
+
+    Returns
+    -------
+    nao_pb2.MessageToSpeak
+    """
+    request_message = nao_pb2.MessageToSpeak()
+    request_message.message = text
+    request_message.animated_message = animated_text
+    return request_message
+
+
+def get_body_movement_request(movement_type, async_):
+    """ returns the request that makes Nao perform the body movement "movement_type"
+
+    Parameters
+    ----------
+    movement_type : experimentNao.interaction.nao_behaviour.requests_enums.BodyMovements
+    async_ : bool
+
+    Returns
+    -------
+    nao_pb2.BodyMovement
+    """
+    assert isinstance(movement_type, BodyMovements)
+    possible_requests = (Request(BodyMovements.ME, 'me'),
+                         Request(BodyMovements.YOU, 'you'),
+                         Request(BodyMovements.YES, 'yes'),
+                         Request(BodyMovements.NO, 'no'),
+                         Request(BodyMovements.YOU_KNOW_WHAT, 'you know what'),
+                         Request(BodyMovements.EXPLAIN, 'explain'),
+                         Request(BodyMovements.EXCITED, 'excited'),
+                         Request(BodyMovements.HELLO, 'hello'))
+    request = nao_pb2.BodyMovement()
+    request.movement_tag = get_request_string(possible_requests, movement_type)
+    request.asynchronous = async_
+    return request
+
+
+def get_coordinated_movement_request(movement_name):
+    """ returns the request that makes Nao perform the complex movement "movement_name"
+
+    Parameters
+    ----------
+    movement_name : ComplexMovements
+
+    Returns
+    -------
+    nao_pb2.CoordinatedMovement
+    """
+    assert isinstance(movement_name, ComplexMovements)
+    possible_requests = (Request(ComplexMovements.PLAY_GUITAR, 'play the guitar'),
+                         Request(ComplexMovements.DANCE, 'dance disco'),
+                         Request(ComplexMovements.PICTURE, 'take picture'),
+                         Request(ComplexMovements.ELEPHANT, 'elephant'),
+                         Request(ComplexMovements.TAI_CHI, 'tai chi'))
+    movement = nao_pb2.CoordinatedMovement()
+    movement.movement = get_request_string(possible_requests, movement_name)
+    return movement
+
+
 def get_request_string(array_of_requests, enum):
     """ returns the correct type of request depending on the
 
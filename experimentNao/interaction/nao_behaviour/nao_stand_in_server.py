@@ -0,0 +1,194 @@
+import time
+import random
+import threading
+import collections
+from concurrent import futures
+
+import grpc
+
+from experimentNao import client
+from experimentNao.generated import nao_pb2, nao_pb2_grpc
+
+
+class SimulatedTimes:
+    def __init__(self, latency=0.005, speech_time_per_character=0.06, body_movement_time=1.5,
+                 coordinated_movement_time=10.0, camera_capture_time=0.05, jitter=0.1, failure_rate=0.0):
+        """ times (in seconds) simulated by the stand-in Nao server, and its failures
+
+        Parameters
+        ----------
+        latency : float
+            time of each request (on top of the time of the action)
+        speech_time_per_character : float
+            time to say each character of a text, at the default speed of the speech (100)
+        body_movement_time : float
+        coordinated_movement_time : float
+        camera_capture_time : float
+        jitter : float
+            maximum random variation of the times, relative to the time
+        failure_rate : float
+            probability of a request failing (with status UNAVAILABLE)
+        """
+        self.latency = latency
+        self.speech_time_per_character = speech_time_per_character
+        self.body_movement_time = body_movement_time
+        self.coordinated_movement_time = coordinated_movement_time
+        self.camera_capture_time = camera_capture_time
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+
+    def scale(self, factor):
+        """ returns the same times multiplied by "factor" (e.g., to run load tests faster than real time)
+
+        Parameters
+        ----------
+        factor : float
+
+        Returns
+        -------
+        SimulatedTimes
+        """
+        return SimulatedTimes(self.latency * factor, self.speech_time_per_character * factor,
+                              self.body_movement_time * factor, self.coordinated_movement_time * factor,
+                              self.camera_capture_time * factor, self.jitter, self.failure_rate)
+
+
+class NaoStandInServicer(nao_pb2_grpc.NaoControllerServicer):
+    def __init__(self, times=None, seed=None, verbose=False):
+        """ stand-in of the server that runs in the Nao robot, to test the clients and the interaction without the
+        robot. The actions take the time they would take in the robot (see SimulatedTimes), and the robot performs
+        one action at a time (the speech and the synchronous movements wait for the previous ones to finish), while
+        the asynchronous movements only take the latency of the request. Each client (connection) has its own
+        simulated robot, so that one server can be used to test several robot stations.
+
+        Parameters
+        ----------
+        times : SimulatedTimes
+        seed : int
+        verbose : bool
+            whether to print the texts said by the stand-in robot
+        """
+        self.times = times if times is not None else SimulatedTimes()
+        self.random = random.Random(seed)
+        self.verbose = verbose
+        self.speeds_of_speech = collections.defaultdict(lambda: 100)   # of the robot of each client
+        self.robot_locks = collections.defaultdict(threading.Lock)      # each robot performs one action at a time
+        self.lock = threading.Lock()
+        self.n_requests = collections.Counter()
+        self.n_failures = collections.Counter()
+
+    def run(self, rpc, context, action_time=0.0, uses_robot=True):
+        """ simulates a request: its latency, its failure (if injected) and the time of its action
+
+        Parameters
+        ----------
+        rpc : str
+        context : grpc.ServicerContext
+        action_time : float
+        uses_robot : bool
+            whether the action needs the robot to be free
+        """
+        with self.lock:
+            self.n_requests[rpc] += 1
+            fails = self.random.random() < self.times.failure_rate
+            jitters = [1 + self.random.uniform(-self.times.jitter, self.times.jitter) for _ in range(2)]
+            robot_lock = self.robot_locks[context.peer()]
+        time.sleep(self.times.latency * jitters[0])
+        if fails:
+            with self.lock:
+                self.n_failures[rpc] += 1
+            context.abort(grpc.StatusCode.UNAVAILABLE, 'Simulated failure of {}'.format(rpc))
+        if uses_robot:
+            with robot_lock:
+                time.sleep(action_time * jitters[1])
+        else:
+            time.sleep(action_time * jitters[1])
+
+    def DoSomething(self, request, context):
+        self.run('DoSomething', context, uses_robot=False)
+        return nao_pb2.SomeResponse(addition=request.number1 + request.number2,
+                                    subtraction=request.number1 - request.number2,
+                                    product=request.number1 * request.number2)
+
+    def PrintClientMessage(self, request, context):
+        self.run('PrintClientMessage', context, uses_robot=False)
+        print(request.message)
+        return nao_pb2.Void()
+
+    def StartFaceDetection(self, request, context):
+        self.run('StartFaceDetection', context, self.times.camera_capture_time, uses_robot=False)
+        for face_id in range(3):
+            yield nao_pb2.FaceDetected(detected_or_not=True, face_id=face_id)
+
+    def SaySomething(self, request, context):
+        self.run('SaySomething', context,
+                 len(request.message) * self.times.speech_time_per_character * 100 /
+                 self.speeds_of_speech[context.peer()])
+        if self.verbose:
+            print('Nao: ' + request.message)
+        return nao_pb2.Void()
+
+    def GetCameraCapture(self, request, context):
+        self.run('GetCameraCapture', context, self.times.camera_capture_time, uses_robot=False)
+        width, height = 160, 120
+        return nao_pb2.CameraCapture(bytes_image=self.random.randbytes(width * height * 3), width=width, height=height)
+
+    def ChangeSpeechSpeed(self, request, context):
+        self.run('ChangeSpeechSpeed', context, uses_robot=False)
+        self.speeds_of_speech[context.peer()] = request.number1
+        return nao_pb2.Void()
+
+    def RunBodyMovement(self, request, context):
+        self.run('RunBodyMovement', context, self.times.body_movement_time if not request.asynchronous else 0.0,
+                 uses_robot=not request.asynchronous)
+        return nao_pb2.Void()
+
+    def RunCoordinatedMovement(self, request, context):
+        self.run('RunCoordinatedMovement', context, self.times.coordinated_movement_time)
+        return nao_pb2.Void()
+
+    def get_statistics(self):
+        """ returns the number of requests and of failures per RPC
+
+        Returns
+        -------
+        Dict[str, Dict[str, int]]
+        """
+        with self.lock:
+            return {rpc: {'n requests': n, 'n failures': self.n_failures[rpc]} for rpc, n in self.n_requests.items()}
+
+
+class NaoStandInServer:
+    def __init__(self, servicer, address=client.NAO_ADDRESS, max_threads=16):
+        """ local gRPC server of the stand-in Nao
+
+        Parameters
+        ----------
+        servicer : NaoStandInServicer
+        address : str
+        max_threads : int
+        """
+        self.servicer = servicer
+        self.address = address
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_threads))
+        nao_pb2_grpc.add_NaoControllerServicer_to_server(servicer, self.server)
+        self.server.add_insecure_port(address)
+
+    def start(self):
+        """ starts the server
+
+        """
+        self.server.start()
+        print('Stand-in Nao server listening on {}'.format(self.address))
+
+    def wait_for_termination(self):
+        """ blocks until the server is stopped
+
+        """
+        self.server.wait_for_termination()
+
+    def stop(self):
+        """ stops the server
+
+        """
+        self.server.stop(grace=None)
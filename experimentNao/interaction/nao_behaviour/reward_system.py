@@ -2,7 +2,6 @@ import time
 from enum import Enum
 
 from experimentNao.interaction import verbose
-from experimentNao.interaction.nao_behaviour.nao_requests import NaoClient
 from experimentNao.interaction.nao_behaviour.requests_enums import ComplexMovements
 
 
@@ -156,7 +155,7 @@ class Reward:
         self.reward_txt = reward_txt
         self.n_times_reward_was_given = 0
 
-    def give_reward(self, output_command, nao_client: NaoClient, random, give_reason_of_reward=False):
+    def give_reward(self, output_command, nao_client, random, give_reason_of_reward=False):
         """ Give this reward to the participant, by making Noa speak out which movement it will do,
         and by performing the movement corresponding to this reward.
 
@@ -3,7 +3,6 @@ import time
 from enum import Enum
 
 import pandas as pd
-import tkinter as tk
 
 from experimentNao.interaction import verbose
 from experimentNao.interaction.performance_of_participant import feedback_questions as fq
@@ -48,6 +47,7 @@ class ParticipantFeedback:
         # Continuous time Periodic questions
         self.periodic_time = 200
         self.thread = None
+        self.event_loop = interaction.event_loop    # if None, the periodic action runs in a thread
         self.ask_asynchronous_feedback = False
         self.interaction_counter = interaction.counter
         self.initialize_periodic_action()
@@ -116,15 +116,26 @@ class ParticipantFeedback:
             self.prefill_current_page_answers(questions_, i)
             self.show_question(questions_[i], y_axis_positions, i, canvas_size, font_size, fb_event_props.puzzle_ended)
         if any(q.require_answer for q in questions_):                # if required
-            while not (self.current_page_answers['Replied']).all():  # While not all answers given -> don't show button
-                self.window.update()
+            self.wait_until(lambda: (self.current_page_answers['Replied']).all())   # all answers given -> show button
         self.show_next_button(canvas_size)                           # Show button
-        while not self.current_page_done:
-            self.window.update()
+        self.wait_until(lambda: self.current_page_done)
         self.window.remove_canvas()
         if fb_event_props.save_in_the_time_step_page:
             self.merge_current_answers_2_time_step_page()
 
+    def wait_until(self, condition):
+        """ keeps the window running until "condition" is true (e.g., until the participant answered)
+
+        Parameters
+        ----------
+        condition : function
+        """
+        if self.event_loop is not None:
+            self.event_loop.wait_until(condition)
+        else:
+            while not condition():
+                self.window.update()
+
     def add_ttl_and_subtitle_to_page(self, question_group, canvas_size, y_axis_positions, font_size):
         """ adds the title and subtitle to a page of questions
 
@@ -314,8 +325,11 @@ class ParticipantFeedback:
 
         """
         self.ask_asynchronous_feedback = False
-        self.thread = threading.Timer(self.periodic_time, self.periodic_action)
-        self.thread.start()
+        if self.event_loop is not None:     # timer of the event loop, which wakes up the loop of the board
+            self.thread = self.event_loop.call_later(self.periodic_time, self.periodic_action)
+        else:
+            self.thread = threading.Timer(self.periodic_time, self.periodic_action)
+            self.thread.start()
 
     def reset_periodic_action(self):
         """ restarts the periodic action
@@ -356,6 +370,7 @@ class ParticipantFeedback:
         value : int
         index : int
         """
+        import tkinter as tk     # not imported with the module, which the identification also uses (SheetNamesExtras)
         for button in self.current_page_buttons[index]:                     # activate all buttons of row
             button['state'] = tk.NORMAL
         self.current_page_buttons[index][value].flash()
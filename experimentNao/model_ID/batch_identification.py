@@ -0,0 +1,249 @@
+import os
+import math
+import collections
+import time
+import itertools
+
+import multiprocess as mp
+import pandas as pd
+
+from experimentNao import folder_path
+from experimentNao.model_ID import identification as id_, identification_cache
+from experimentNao.model_ID.configs import overall_config
+from experimentNao.model_ID.data_processing import excel_data_processing
+from lib import excel_files
+from lib.init_my_random import init_random
+
+
+class IdentificationSweep:
+    def __init__(self, participants, model_configs, id_cog_modes, training_sets, simplified_dynamics=(True, ),
+                 incremental=(True, ), n_horizons=(1, ), normalise_rld=(False, )):
+        """ specification of a sweep of identifications: one identification of the cognitive module for each
+        combination of the options given
+
+        Parameters
+        ----------
+        participants : List[str]
+        model_configs : List[experimentNao.model_ID.configs.model_configs.ModelConfigs]
+        id_cog_modes : List[experimentNao.model_ID.configs.id_cog_modes.IdCogModes]
+        training_sets : List[experimentNao.model_ID.configs.train_test_config.TrainingSets]
+        simplified_dynamics : List[bool]
+        incremental : List[bool]
+        n_horizons : List[int]
+        normalise_rld : List[bool]
+        """
+        self.participants = participants
+        self.model_configs = model_configs
+        self.id_cog_modes = id_cog_modes
+        self.training_sets = training_sets
+        self.simplified_dynamics = simplified_dynamics
+        self.incremental = incremental
+        self.n_horizons = n_horizons
+        self.normalise_rld = normalise_rld
+
+    def get_id_configs(self):
+        """ returns the identification configurations of the sweep, sorted by participant. Combinations that lead to the
+        same identification (e.g., the horizon, which is only used by the simplified dynamics) are only included once.
+
+        Returns
+        -------
+        List[experimentNao.model_ID.configs.overall_config.IDConfig]
+        """
+        id_configs, file_names = [], set()
+        for participant_id, model_config, id_mode, train_set, simple_dyn, incr, n_horizon, normalise in \
+                itertools.product(self.participants, self.model_configs, self.id_cog_modes, self.training_sets,
+                                  self.simplified_dynamics, self.incremental, self.n_horizons, self.normalise_rld):
+            id_config = overall_config.IDConfig(model_config, participant_id, id_mode, train_set, simple_dyn, incr,
+                                                n_horizon=n_horizon, cog_2_id=True, normalise_rld_mid_steps=normalise,
+                                                online_data_sets_division=True)
+            if id_config.get_model_id_file_name() not in file_names:
+                file_names.add(id_config.get_model_id_file_name())
+                id_configs.append(id_config)
+        return id_configs
+
+
+def run_sweep(id_configs, n_parallel_jobs=None, shard_index=0, n_shards=1, seed=42, short_mode=False, id_cache=None):
+    """ runs the identifications of "id_configs" that are not done yet, with up to "n_parallel_jobs" identifications in
+    parallel. Each identification runs in its own process (which also uses a pool of processes for the independent
+    runs of the identification). The files of each participant are parsed only once, by this process, and the parsed
+    sheets are passed to all the identifications of the participant (open excel files can't be shared by processes
+    running at the same time). To run the sweep in a job array, each job runs only the identifications of its shard
+    ("shard_index" out of "n_shards"). If "id_cache" is given, the identifications whose inputs (data, configuration,
+    seed and code) were already identified are restored from the cache, and the new results are added to it.
+
+    Parameters
+    ----------
+    id_configs : List[experimentNao.model_ID.configs.overall_config.IDConfig]
+    n_parallel_jobs : int
+        if None, enough identifications are run in parallel to use all the cores
+    shard_index : int
+    n_shards : int
+    seed : int
+    short_mode : bool
+        for debugging
+    id_cache : experimentNao.model_ID.identification_cache.IdentificationCache
+
+    Returns
+    -------
+    List[experimentNao.model_ID.configs.overall_config.IDConfig]
+        identifications that failed
+    """
+    if n_parallel_jobs is None:
+        n_parallel_jobs = max(1, os.cpu_count() // 4)   # each identification uses a pool of 4 processes
+    shard_size = math.ceil(len(id_configs) / n_shards)  # contiguous shards, so that each shard has few participants
+    id_configs_of_shard = id_configs[shard_index * shard_size:(shard_index + 1) * shard_size]
+    keys = {}       # key in the cache of each identification
+    if id_cache is not None:
+        for id_config in id_configs_of_shard:
+            try:
+                keys[id_config.get_model_id_file_name()] = \
+                    identification_cache.get_identification_key(id_config, seed, short_mode)
+            except FileNotFoundError as error:      # the identification will fail (no data of the participant)
+                print(error)
+                continue
+            if id_cache.get(keys[id_config.get_model_id_file_name()]) is not None:
+                id_cache.restore(keys[id_config.get_model_id_file_name()], id_config)
+    id_configs_to_run = [id_config for id_config in id_configs_of_shard if not is_identification_done(id_config)]
+    print('{} identifications in shard {}/{}: {} already done, {} to run'.format(
+        len(id_configs_of_shard), shard_index, n_shards, len(id_configs_of_shard) - len(id_configs_to_run),
+        len(id_configs_to_run)))
+    running, failed = [], []
+    participants_data = {}      # parsed files of the participants whose identifications are being started
+    n_to_start = collections.Counter(id_config.participant_id for id_config in id_configs_to_run)
+    for id_config in id_configs_to_run:
+        while len(running) >= n_parallel_jobs:
+            running = wait_for_free_process(running, failed, id_cache, keys, seed)
+        participant_id = id_config.participant_id
+        if participant_id not in participants_data:
+            participants_data[participant_id] = excel_data_processing.read_participant_input_files(participant_id)
+        process = mp.Process(target=identify, args=(id_config, seed, short_mode, participants_data[participant_id]))
+        process.start()
+        running.append((process, id_config))
+        n_to_start[participant_id] -= 1
+        if n_to_start[participant_id] == 0:     # the processes already started have their own copy
+            del participants_data[participant_id]
+    while len(running) > 0:
+        running = wait_for_free_process(running, failed, id_cache, keys, seed)
+    for id_config in failed:
+        print('FAILED IDENTIFICATION: ', id_config.get_model_id_file_name())
+    return failed
+
+
+def wait_for_free_process(running, failed, id_cache=None, keys=None, seed=None):
+    """ waits until at least one of the "running" processes finishes, and returns the processes still running. The
+    configurations of the processes that failed are added to "failed", and the results of the processes that succeeded
+    are added to "id_cache" (only this process writes to the cache).
+
+    Parameters
+    ----------
+    running : List[Tuple[multiprocess.context.Process, experimentNao.model_ID.configs.overall_config.IDConfig]]
+    failed : List[experimentNao.model_ID.configs.overall_config.IDConfig]
+    id_cache : experimentNao.model_ID.identification_cache.IdentificationCache
+    keys : Dict[str, str]
+        key in the cache of each identification, per file name
+    seed : int
+
+    Returns
+    -------
+    List[Tuple[multiprocess.context.Process, experimentNao.model_ID.configs.overall_config.IDConfig]]
+    """
+    while all(process.is_alive() for process, _ in running):
+        time.sleep(1)
+    still_running = []
+    for process, id_config in running:
+        if process.is_alive():
+            still_running.append((process, id_config))
+        else:
+            process.join()
+            if process.exitcode != 0:
+                failed.append(id_config)
+            elif id_cache is not None and id_config.get_model_id_file_name() in keys:
+                id_cache.add(keys[id_config.get_model_id_file_name()], id_config, seed)
+    return still_running
+
+
+def identify(id_config, seed, short_mode, participant_data=None):
+    """ identifies the cognitive module with the configuration "id_config", as in main_identification.py
+
+    Parameters
+    ----------
+    id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+    seed : int
+    short_mode : bool
+    participant_data : Tuple[List[lib.excel_files.ParsedWorkbook], List[int]]
+        parsed files and number of puzzles of the participant (see read_participant_input_files). If None, the files
+        are read here
+    """
+    st = time.time()
+    if participant_data is None:
+        participant_data = excel_data_processing.read_participant_input_files(id_config.participant_id)
+    reader_files, n_puzzles = participant_data
+    writer = excel_files.create_excel_file(str(id_config.get_model_id_file_path()))
+    id_.train_and_validate_cognitive_module(writer, reader_files, n_puzzles, init_random(seed=seed), id_config,
+                                            delft_blue=False, short_mode=short_mode)
+    print('TOTAL TIME of {}: {}'.format(id_config.get_model_id_file_name(), time.time() - st))
+
+
+def is_identification_done(id_config):
+    """ checks whether the identification with the configuration "id_config" was already done, i.e., whether its output
+    file exists and has the overall performance of the identified model
+
+    Parameters
+    ----------
+    id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+
+    Returns
+    -------
+    bool
+    """
+    if not id_config.get_model_id_file_path().exists():
+        return False
+    try:
+        return 'Overall Performance' in id_config.get_model_id_file().sheet_names
+    except Exception:       # file that was not completely written
+        return False
+
+
+def write_consolidated_results(id_configs, file_name):
+    """ writes the overall performance of all the identifications of "id_configs" in one excel file, with one row per
+    identification, in the output folder experimentNao/out/model_id_out
+
+    Parameters
+    ----------
+    id_configs : List[experimentNao.model_ID.configs.overall_config.IDConfig]
+    file_name : str
+    """
+    rows_train, rows_validation = [], []
+    for id_config in id_configs:
+        if not is_identification_done(id_config):
+            print('NOT READ FILE: ', id_config.get_model_id_file_name())
+            continue
+        df = excel_files.get_sheets_from_excel(None, ['Overall Performance'], id_config.get_model_id_file())[0]
+        config_columns = get_config_columns(id_config)
+        rows_train.append(pd.concat([config_columns, df.iloc[[0]].reset_index(drop=True)], axis=1))
+        rows_validation.append(pd.concat([config_columns, df.iloc[[1]].reset_index(drop=True)], axis=1))
+    if len(rows_train) == 0:
+        return
+    writer = excel_files.create_excel_file(str(folder_path.output_folder_path / 'model_id_out' / file_name))
+    excel_files.save_df_to_excel_sheet(writer, pd.concat(rows_train, ignore_index=True), 'Train', index=False)
+    excel_files.save_df_to_excel_sheet(writer, pd.concat(rows_validation, ignore_index=True), 'Validation',
+                                       index=False)
+    writer.close()
+
+
+def get_config_columns(id_config):
+    """ returns a dataframe (of one row) that describes the identification configuration "id_config"
+
+    Parameters
+    ----------
+    id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+
+    Returns
+    -------
+    pandas.core.frame.DataFrame
+    """
+    return pd.DataFrame({'Participant': [id_config.participant_id], 'Model config': [id_config.model_config.name],
+                         'ID mode': [id_config.id_cog_mode.name], 'Training set': [id_config.training_set.name],
+                         'Simple dynamics': [id_config.simple_dynamics], 'Incremental': [id_config.incremental],
+                         'N horizon': [id_config.n_horizon], 'Normalise RLD': [id_config.normalise_rld_mid_steps],
+                         'File': [id_config.get_model_id_file_name()]})
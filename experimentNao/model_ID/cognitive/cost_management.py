@@ -1,3 +1,6 @@
+from lib import profiling
+
+
 class Cost:
     def __init__(self, state_vars, vars_2_id, vars_w_linkages_to_id, tom_model, n_horizon, simplified_dynamics):
         """ object that manages the cost function and the performance of the identification process
@@ -33,10 +36,11 @@ class Cost:
         numpy.float64
         """
         vars_2_id = self.vars_2_id if vars_2_id is None else vars_2_id
-        if self.simplified_dynamics:  # time step equivalent to the training step
-            return self.cost_function_simple_dynamics(parameters_2_id, training_steps, parameters_manager, vars_2_id)
-        else:
-            return self.cost_function_cmp_dynamics(parameters_2_id, training_steps, parameters_manager, vars_2_id)
+        with profiling.span('cost function', 'identification'):
+            if self.simplified_dynamics:  # time step equivalent to the training step
+                return self.cost_function_simple_dynamics(parameters_2_id, training_steps, parameters_manager, vars_2_id)
+            else:
+                return self.cost_function_cmp_dynamics(parameters_2_id, training_steps, parameters_manager, vars_2_id)
 
     def cost_function_cmp_dynamics(self, parameters_2_id, training_steps, parameters_manager, vars_2_id):
         """ cost function used when complex dynamics are active - not used in the experiment
@@ -1,6 +1,6 @@
 import math
 
-from experimentNao.model_ID.data_processing import excel_data_processing
+from experimentNao.model_ID.data_processing import excel_data_processing, questionnaire_answers
 from experimentNao.declare_model import chess_interaction_data as ci_data
 from experimentNao.interaction.performance_of_participant.participant_feedback import SheetNamesExtras
 
@@ -65,14 +65,12 @@ def set_values_of_cognitive_variables_from_1_file(tom_model, file, state_variabl
     -------
     Tuple[lib.tom_model.model_elements.variables.fst_dynamics_variables.Belief, lib.tom_model.model_elements.variables.fst_dynamics_variables.Belief, lib.tom_model.model_elements.variables.fst_dynamics_variables.Goal, lib.tom_model.model_elements.variables.fst_dynamics_variables.Goal, lib.tom_model.model_elements.variables.fst_dynamics_variables.Emotion, lib.tom_model.model_elements.variables.fst_dynamics_variables.Emotion]
     """
-    sheet_names = SheetNamesExtras()
-    dfs = excel_data_processing.get_specific_sheets_from_file(file, name_must_contain=sheet_names.step,
-                                                              name_cant_contain=[sheet_names.help, sheet_names.quit])
+    answers = questionnaire_answers.get_answers_from_file(file, SheetNamesExtras())
     for var in state_variables:
         if var in hidden_vars:
             fill_values_of_reward_belief_as_hidden_var(var, file, simplified_dynamics)
         else:
-            fill_values_of_variable(var, dfs, simplified_dynamics)
+            fill_values_of_variable(var, answers, simplified_dynamics)
     for var in tom_model.cognitive_module.get_all_slow_dynamics_vars():
         var.values = (1, ) * len(state_variables[1].values)
     return state_variables
@@ -99,23 +97,23 @@ def fill_values_of_reward_belief_as_hidden_var(var, file, simplified_dynamics):
     var.values = var.values + values
 
 
-def fill_values_of_variable(var, dfs, simplified_dynamics):
-    """ sets the list of values of one variable from the dataframes of the interaction (that came from 1 file).
+def fill_values_of_variable(var, answers, simplified_dynamics):
+    """ sets the list of values of one variable from the answers of the interaction (that came from 1 file).
     The list of values correspond to the sequence of values that this variable had over time during the interaction of
     the human with the robot.
 
     Parameters
     ----------
     var : Union[lib.tom_model.model_elements.variables.fst_dynamics_variables.Belief, lib.tom_model.model_elements.variables.fst_dynamics_variables.Goal]
-    dfs : List[pandas.core.frame.DataFrame]
+    answers : experimentNao.model_ID.data_processing.questionnaire_answers.QuestionnaireAnswers
     simplified_dynamics : bool
     """
-    values = []
-    for i in range(len(dfs)):
-        if not simplified_dynamics:            # if not simplified -> for each data point DP collected we have:
-            values.append(None)                                     # 1. step k = 2*DP with no collection of data
-        var_row = dfs[i][dfs[i]['Var Name'] == var.name].iloc[0]    # 2. step k = 2*DP + 1 with collection of data
-        values.append((var_row['Value']/10)*2-1)
+    answered_values = answers.get_values_of_variable(var.name).tolist()
+    if simplified_dynamics:
+        values = answered_values
+    else:                                   # if not simplified -> for each data point DP collected we have:
+        values = [None] * (2 * len(answered_values))    # 1. step k = 2*DP with no collection of data
+        values[1::2] = answered_values                  # 2. step k = 2*DP + 1 with collection of data
     var.values = var.values + values
 
 
@@ -46,6 +46,26 @@ def pre_process_participant_input_files(participant_id):
     return reader_files, n_puzzles
 
 
+def read_participant_input_files(participant_id):
+    """ parses all the sheets of the reader files of the participant (see pre_process_participant_input_files) and
+    closes the files, so that the data can be passed to several identifications running in other processes
+
+    Parameters
+    ----------
+    participant_id : str
+        identifier of the participant
+
+    Returns
+    -------
+    Tuple[List[lib.excel_files.ParsedWorkbook], List[int]]
+    """
+    reader_files, n_puzzles = pre_process_participant_input_files(participant_id)
+    parsed_files = [excel_files.ParsedWorkbook(reader_file) for reader_file in reader_files]
+    for reader_file in reader_files:
+        reader_file.close()
+    return parsed_files, n_puzzles
+
+
 def get_input_files(participant_identifier):
     """ extracts the reader files (one per interaction) where the data from the interactions that will be used to train
     and test the model is, and the name of the files
@@ -84,8 +104,23 @@ def get_excel_file(interaction_identifier):
     -------
     pandas.io.excel._base.ExcelFile
     """
+    return excel_files.get_excel_file(get_input_file_path(interaction_identifier))
+
+
+def get_input_file_path(interaction_identifier):
+    """ returns the path of the Excel file generated in the training interactions with participant "participant_name"
+
+    Parameters
+    ----------
+    interaction_identifier : str
+        identifier of the participant + number of interaction
+
+    Returns
+    -------
+    pathlib.Path
+    """
     path = folder_path.output_folder_path / 'replies_participants' / 'training_sessions' / 'to_id'
-    return excel_files.get_excel_file(path / ('Reply_' + interaction_identifier + '.xlsx'))
+    return path / ('Reply_' + interaction_identifier + '.xlsx')
 
 
 def write_list_of_vars_and_id_tags_2_excel(tom_model, writer):
@@ -135,7 +170,7 @@ def get_specific_sheets_from_file(input_file, name_must_contain, name_cant_conta
     for sheet_name in input_file.sheet_names:
         if name_must_contain in sheet_name:
             if all(forbidden_words not in sheet_name for forbidden_words in name_cant_contain):
-                df = input_file.parse(sheet_name)
+                df = excel_files.parse_sheet(input_file, sheet_name)
                 list_of_dfs.append(df)
     return list_of_dfs
 
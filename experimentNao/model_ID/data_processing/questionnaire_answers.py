@@ -0,0 +1,89 @@
+import numpy as np
+
+from lib import excel_files
+
+
+class QuestionnaireAnswers:
+    def __init__(self, dfs, step_names=None):
+        """ answers of the participant to the questions about the mental states, stored as a (step × variable) matrix of
+        the values of the variables (already converted from the 0-10 scale of the questions to the [-1, 1] range of
+        the variables). It replaces the search for the row of each variable in the dataframe of each step.
+
+        Parameters
+        ----------
+        dfs : List[pandas.core.frame.DataFrame]
+            dataframe of each step (time step in which the questions were asked), with columns 'Var Name' and 'Value'
+        step_names : List[str]
+            name of each step (e.g., the name of its sheet). If None, the steps are named by their position
+        """
+        self.step_rows = {name: row for row, name in enumerate(step_names if step_names is not None
+                                                                   else range(len(dfs)))}
+        self.var_columns = {}
+        for df in dfs:
+            for var_name in df['Var Name']:
+                self.var_columns.setdefault(var_name, len(self.var_columns))
+        self.values = np.full((len(dfs), len(self.var_columns)), np.nan)
+        for row, df in enumerate(dfs):
+            columns = [self.var_columns[var_name] for var_name in df['Var Name']]
+            # the first answer is kept when a variable is answered more than once in the same step
+            columns, first_answers = np.unique(np.array(columns, dtype=np.int64), return_index=True)
+            self.values[row, columns] = df['Value'].to_numpy(dtype=float)[first_answers]
+        self.values = (self.values / 10) * 2 - 1
+
+    def get_values_of_variable(self, var_name):
+        """ returns the values of the variable "var_name" in all the steps
+
+        Parameters
+        ----------
+        var_name : str
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        values = self.values[:, self.var_columns[var_name]]
+        if np.isnan(values).any():
+            raise KeyError('Variable {} was not answered in all the steps'.format(var_name))
+        return values
+
+    def get_value(self, step_name, var_name):
+        """ returns the value of the variable "var_name" in the step "step_name"
+
+        Parameters
+        ----------
+        step_name : Union[str, int]
+        var_name : str
+
+        Returns
+        -------
+        float
+        """
+        return self.values[self.step_rows[step_name], self.var_columns[var_name]]
+
+    def get_n_steps(self):
+        """ returns the number of steps
+
+        Returns
+        -------
+        int
+        """
+        return self.values.shape[0]
+
+
+def get_answers_from_file(file, sheet_names_extras):
+    """ returns the answers of the participant in all the steps of one interaction, in one pass over the sheets of the
+    steps of the file
+
+    Parameters
+    ----------
+    file : pandas.io.excel._base.ExcelFile
+    sheet_names_extras : experimentNao.interaction.performance_of_participant.participant_feedback.SheetNamesExtras
+
+    Returns
+    -------
+    QuestionnaireAnswers
+    """
+    step_names = [sheet_name for sheet_name in file.sheet_names if sheet_names_extras.step in sheet_name and
+                  sheet_names_extras.help not in sheet_name and sheet_names_extras.quit not in sheet_name]
+    dfs = [excel_files.parse_sheet(file, sheet_name)[['Var Name', 'Value']] for sheet_name in step_names]
+    return QuestionnaireAnswers(dfs, step_names)
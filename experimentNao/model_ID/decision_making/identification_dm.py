@@ -1,5 +1,6 @@
 from enum import Enum
 import time
+import numpy as np
 import pandas as pd
 
 from experimentNao.model_ID.decision_making.parameters_manager import ParametersManagerDM
@@ -47,6 +48,8 @@ class DMIdentification:
         self.set_settings()
         self.random = random
         self.parameters_manager = ParametersManagerDM(self.settings, boundary_values, self.random)
+        self.compiled_intentions = {}           # intentions (ids) -> intentions compiled into arrays
+        self.values_in_steps = {}               # (intentions (ids), steps) -> values of the inputs, ground truth
 
     def set_settings(self):
         """ defines the settings and hyperparameters for the identification
@@ -76,6 +79,7 @@ class DMIdentification:
         train_steps : List[int]
         intentions : List[experimentNao.declare_model.modules.declare_decision_making.IntentionChessGame]
         """
+        self.compiled_intentions, self.values_in_steps = {}, {}
         if self.train_mode == OptMode.GRADIENT_DESCENT:
             self.identify_dm_gd(train_steps, intentions)
         elif self.train_mode == OptMode.GENETIC_ALGORITHM:
@@ -270,23 +274,34 @@ class DMIdentification:
     # **********************************************************************************************************************
     #                                   Costs
     # **********************************************************************************************************************
-    def cost_of_predicting_intention(self, intention, step):
-        """ computes a cost that reflects how incorrect the prediction done by the model about an intention is with
-        respect to the ground truth
+    def cost_of_predicting_intentions(self, intentions, steps):
+        """ computes a cost that reflects how incorrect the predictions done by the model about the "intentions" are
+        with respect to the ground truth: the number of steps and intentions whose prediction is wrong. All the steps
+        are predicted at once, with the current thresholds of the intentions.
 
         Parameters
         ----------
-        intention : experimentNao.declare_model.modules.declare_decision_making.IntentionChessGame
-        step : int
+        intentions : List[experimentNao.declare_model.modules.declare_decision_making.IntentionChessGame]
+        steps : List[int]
 
         Returns
         -------
-
+        int
         """
-        if intention.active != intention.intentions_sequence[step]:
-            return 1
-        else:
-            return 0
+        key = tuple(id(intention) for intention in intentions)
+        compiled_intentions = self.compiled_intentions.get(key)
+        if compiled_intentions is None:
+            compiled_intentions = self.dm_module.intention_selector.compile_intentions(intentions)
+            self.compiled_intentions[key] = compiled_intentions
+        compiled_intentions.update_parameters()
+        values = self.values_in_steps.get((key, tuple(steps)))
+        if values is None:
+            intentions_sequences = [np.asarray(intention.intentions_sequence, dtype=bool)[steps]
+                                    for intention in intentions]
+            values = (compiled_intentions.get_input_values(steps), np.array(intentions_sequences))
+            self.values_in_steps[(key, tuple(steps))] = values
+        input_values, intentions_sequences = values
+        return int(np.count_nonzero(compiled_intentions.get_active_intentions(input_values) != intentions_sequences))
 
     def save_minimum_cost(self, new_c, new_pars):
         """ saves the minimum cost that was obtained so far in the identification process (this is useful for pruning)
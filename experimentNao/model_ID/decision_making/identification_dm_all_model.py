@@ -36,17 +36,7 @@ class DMIdentificationAll(id_dm.DMIdentification):
         int
         """
         self.parameters_manager.set_values_of_thresholds(self.get_all_intentions, parameters)
-        cost = 0
-        for step in train_steps:
-            # 1. Set values of variables in time step
-            for input_ in self.dm_module.intention_selector.inputs:
-                input_.value = input_.values[step]
-            # 2. Run intentions
-            self.dm_module.intention_selector.compute_new_value()
-            # 3. Compute cost
-            for intention in self.get_all_intentions:
-                cost += self.cost_of_predicting_intention(intention, step)
-        return cost
+        return self.cost_of_predicting_intentions(self.get_all_intentions, train_steps)
 
     def test_dm(self, test_steps, verbose):
         """ test the performance of the identified decision-making module
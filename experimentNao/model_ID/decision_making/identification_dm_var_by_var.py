@@ -39,21 +39,7 @@ class DMIdentification1by1(id_dm.DMIdentification):
         int
         """
         self.parameters_manager.set_values_of_thresholds(intentions, parameters)
-        cost = 0
-        for step in train_steps:
-            # 1. Set values of variables in time step
-            for intention in intentions:
-                intention.goal.value = intention.goal.values[step]
-                if intention.belief is not None:
-                    intention.belief.value = intention.belief.values[step]
-            # 2. Run intentions
-            self.dm_module.intention_selector.deactivate_all_intentions()
-            for intention in intentions:
-                self.dm_module.intention_selector.activate_1_intention_by_threshold_fast(intention)
-            # 3. Compute cost
-            for intention in intentions:
-                cost += self.cost_of_predicting_intention(intention, step)
-        return cost
+        return self.cost_of_predicting_intentions(intentions, train_steps)
     
     def test_dm(self, test_steps, intentions_group):
         """ test the performance of the identified decision-making module
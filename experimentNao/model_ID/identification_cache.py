@@ -0,0 +1,286 @@
+import os
+import enum
+import time
+import shutil
+import hashlib
+
+import pandas as pd
+
+import path_config
+from experimentNao import folder_path
+from experimentNao.model_ID.data_processing import excel_data_processing
+from lib import excel_files
+
+CODE_FOLDERS = ('lib', 'experimentNao/model_ID', 'experimentNao/declare_model')    # code that affects the results
+RESULT_SHEETS = ('Overall Performance', 'Individual costs', 'List of Parameters')
+
+
+class IdentificationCache:
+    def __init__(self, folder=None):
+        """ content-addressed store of the results of the identifications. Each result is stored under a key that is
+        the hash of all the inputs of the identification: the data of the participant, the identification
+        configuration, the seed, the settings, and the version of the code. The index of the store keeps the
+        performance, costs and parameters of each result, so that they can be read without opening the workbooks.
+
+        Parameters
+        ----------
+        folder : pathlib.Path
+            folder of the store. If None, experimentNao/out/model_id_out/cache
+        """
+        self.folder = folder if folder is not None else folder_path.output_folder_path / 'model_id_out' / 'cache'
+        self.index_path = self.folder / 'index.pkl'
+        self.index = pd.read_pickle(self.index_path) if self.index_path.exists() else {}
+        self.keys_by_result_hash = get_keys_by_result_hash(self.index)
+        self.file_hashes = {}       # version of a workbook (see excel_files.get_file_version) -> hash of its contents
+
+    def get(self, key):
+        """ returns the entry of the index stored with "key", or None if the identification was not done yet
+
+        Parameters
+        ----------
+        key : str
+
+        Returns
+        -------
+        Union[None, Dict[str, Any]]
+            entry with the configuration, the performance ('Overall Performance' sheet), the individual costs and the
+            parameters of the identified model
+        """
+        return self.index.get(key)
+
+    def find(self, file_path):
+        """ returns the entry of the index whose stored workbook has the same contents as the workbook in "file_path"
+        (e.g., an output of an identification that was copied to another folder), or None if there is none
+
+        Parameters
+        ----------
+        file_path : Union[str, pathlib.Path]
+
+        Returns
+        -------
+        Union[None, Dict[str, Any]]
+        """
+        if not os.path.exists(file_path):
+            return None
+        file_version = excel_files.get_file_version(file_path)
+        if file_version not in self.file_hashes:
+            self.file_hashes[file_version] = get_file_hash(file_path)
+        key = self.keys_by_result_hash.get(self.file_hashes[file_version])
+        return self.index.get(key) if key is not None else None
+
+    def add(self, key, id_config, seed):
+        """ adds the result of the identification with "id_config" (the output workbook of the identification) to the
+        store, under "key"
+
+        Parameters
+        ----------
+        key : str
+        id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+        seed : int
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        shutil.copyfile(id_config.get_model_id_file_path(), self.get_result_path(key))
+        sheets = excel_files.get_sheets_from_excel(self.get_result_path(key), RESULT_SHEETS)
+        self.index[key] = {'key': key, 'file name': id_config.get_model_id_file_name(),
+                           'result hash': get_file_hash(self.get_result_path(key)),
+                           'config': get_config_as_dict(id_config), 'seed': seed, 'code version': get_code_version(),
+                           'time': time.time(), 'performance': sheets[0], 'individual costs': sheets[1],
+                           'parameters': sheets[2]}
+        self.keys_by_result_hash[self.index[key]['result hash']] = key
+        self.save_index()
+
+    def restore(self, key, id_config):
+        """ copies the workbook stored under "key" to the output file of the identification with "id_config"
+
+        Parameters
+        ----------
+        key : str
+        id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+        """
+        shutil.copyfile(self.get_result_path(key), id_config.get_model_id_file_path())
+
+    def get_result_path(self, key):
+        """ returns the path of the workbook stored under "key"
+
+        Parameters
+        ----------
+        key : str
+
+        Returns
+        -------
+        pathlib.Path
+        """
+        return self.folder / (key + '.xlsx')
+
+    def save_index(self):
+        """ saves the index of the store (replacing the previous one only once it is completely written). The entries
+        added meanwhile by other processes (e.g., other jobs of a job array) are kept: the index is locked while it is
+        read, merged and written.
+
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        with open(str(self.index_path) + '.lock', 'w') as lock_file:
+            lock_file_exclusively(lock_file)
+            if self.index_path.exists():
+                self.index = {**pd.read_pickle(self.index_path), **self.index}
+            pd.to_pickle(self.index, str(self.index_path) + '.tmp')
+            os.replace(str(self.index_path) + '.tmp', self.index_path)
+        self.keys_by_result_hash = get_keys_by_result_hash(self.index)
+
+    def get_index_as_df(self):
+        """ returns the index as a dataframe with one row per stored identification, with its configuration and its
+        train and validation costs
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+        """
+        rows = []
+        for entry in self.index.values():
+            performance = entry['performance']
+            rows.append({'Key': entry['key'], 'File': entry['file name'], **entry['config'], 'Seed': entry['seed'],
+                         'Code version': entry['code version'], 'Time': pd.Timestamp(entry['time'], unit='s'),
+                         'Train Cost': performance.loc[0, 'Train Cost'], 'Valid Cost': performance.loc[1, 'Test Cost']})
+        return pd.DataFrame(rows)
+
+
+def get_keys_by_result_hash(index):
+    """ returns the key of each entry of the index by the hash of its stored workbook
+
+    Parameters
+    ----------
+    index : Dict[str, Dict[str, Any]]
+
+    Returns
+    -------
+    Dict[str, str]
+    """
+    return {entry['result hash']: key for key, entry in index.items() if 'result hash' in entry}
+
+
+def get_dfs_from_entry(entry):
+    """ returns the dataframes of a result of the index, in the same format as
+    experimentNao.data_analysis.post_id_analysis.paths_and_files.get_dfs_from_file
+
+    Parameters
+    ----------
+    entry : Dict[str, Any]
+
+    Returns
+    -------
+    Tuple[pandas.core.frame.DataFrame, ...]
+        performance and individual costs in training and in validation, and parameters of the identified model
+    """
+    df_performance, df_individual_costs = entry['performance'], entry['individual costs']
+    return df_performance.iloc[[0]].reset_index(drop=True), df_performance.iloc[[1]].reset_index(drop=True), \
+        df_individual_costs.iloc[[0]].reset_index(drop=True), df_individual_costs.iloc[[1]].reset_index(drop=True), \
+        entry['parameters'].copy()
+
+
+def get_identification_key(id_config, seed, short_mode=False, delft_blue=False):
+    """ returns the key of an identification, which is the hash of all its inputs: the data of the participant, the
+    identification configuration, the seed, the settings, and the version of the code
+
+    Parameters
+    ----------
+    id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+    seed : int
+    short_mode : bool
+    delft_blue : bool
+
+    Returns
+    -------
+    str
+    """
+    config = sorted(get_config_as_dict(id_config).items())
+    inputs = [get_participant_data_hash(id_config.participant_id), str(config), str(seed), str(short_mode),
+              str(delft_blue), get_code_version()]
+    return hashlib.sha256('|'.join(inputs).encode('utf-8')).hexdigest()
+
+
+def get_config_as_dict(id_config):
+    """ returns the attributes of the identification configuration as a dictionary of names and built-in values
+
+    Parameters
+    ----------
+    id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+
+    Returns
+    -------
+    Dict[str, Any]
+    """
+    return {name: (value.name if isinstance(value, enum.Enum) else value) for name, value in vars(id_config).items()}
+
+
+def get_participant_data_hash(participant_id):
+    """ returns the hash of the contents of the files of the interactions of the participant used for the
+    identification. If the participant has no files, FileNotFoundError is raised (so that a missing dataset can't be
+    given the result of another identification)
+
+    Parameters
+    ----------
+    participant_id : str
+
+    Returns
+    -------
+    str
+    """
+    data_hash = hashlib.sha256()
+    interaction = 1
+    while excel_data_processing.get_input_file_path(participant_id + '_' + str(interaction)).exists():
+        with open(excel_data_processing.get_input_file_path(participant_id + '_' + str(interaction)), 'rb') as file:
+            data_hash.update(file.read())
+        interaction += 1
+    if interaction == 1:
+        raise FileNotFoundError('No input files of participant {} ({})'.format(
+            participant_id, excel_data_processing.get_input_file_path(participant_id + '_1')))
+    return data_hash.hexdigest()
+
+
+def get_file_hash(file_path):
+    """ returns the hash of the contents of a file
+
+    Parameters
+    ----------
+    file_path : Union[str, pathlib.Path]
+
+    Returns
+    -------
+    str
+    """
+    with open(file_path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def lock_file_exclusively(lock_file):
+    """ blocks until this process has the exclusive lock of "lock_file", which is released when the file is closed.
+    Only in POSIX systems (where the jobs of the job arrays run)
+
+    Parameters
+    ----------
+    lock_file : io.TextIOWrapper
+    """
+    if os.name == 'posix':
+        import fcntl
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+
+code_version = None
+
+
+def get_code_version():
+    """ returns the hash of the source code that affects the results of the identification (computed only once)
+
+    Returns
+    -------
+    str
+    """
+    global code_version
+    if code_version is None:
+        code_hash = hashlib.sha256()
+        for code_folder in CODE_FOLDERS:
+            for path in sorted((path_config.repo_root / code_folder).rglob('*.py')):
+                code_hash.update(str(path.relative_to(path_config.repo_root)).encode('utf-8'))
+                code_hash.update(path.read_bytes())
+        code_version = code_hash.hexdigest()
+    return code_version
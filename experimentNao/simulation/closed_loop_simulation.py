@@ -0,0 +1,170 @@
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from experimentNao import folder_path
+from lib import excel_files
+
+
+class ClosedLoopSimulation:
+    def __init__(self, controller, participant, n_puzzles=200, n_moves_options=(3, 5, 7, 9), initial_difficulty=2,
+                 nao_helping=True, nao_offering_reward=False, track_memory=True, seed=None):
+        """ Runs a controller in closed loop with a simulated participant, without the robot, the chess GUI or the
+        chess engine, and measures the performance of the controller (latency of each decision, memory and
+        throughput).
+
+        Parameters
+        ----------
+        controller : experimentNao.behaviour_controllers.mbc.model_based_controller.ModelBasedController
+        participant : experimentNao.simulation.simulated_participant.SimulatedParticipant
+        n_puzzles : int
+            maximum number of puzzles played (the simulation stops earlier if the participant quits)
+        n_moves_options : Tuple[int]
+            possible numbers of moves of the puzzles
+        initial_difficulty : int
+        nao_helping : bool
+        nao_offering_reward : bool
+            whether nao offers rewards in the first puzzle
+        track_memory : bool
+            whether the memory allocated during the simulation is traced (which slows down the simulation)
+        seed : int
+        """
+        self.controller = controller
+        self.participant = participant
+        self.n_puzzles = n_puzzles
+        self.n_moves_options = n_moves_options
+        self.initial_difficulty = initial_difficulty
+        self.nao_helping = nao_helping
+        self.nao_offering_reward = nao_offering_reward
+        self.track_memory = track_memory
+        self.rng = np.random.default_rng(seed)
+        # Results
+        self.decisions = []             # one row per puzzle
+        self.decision_latencies = []    # end of puzzle: update of the model and selection of the action
+        self.update_latencies = []      # middle of puzzle: update of the model
+        self.peak_memory = None
+        self.total_time = None
+
+    def run(self):
+        """ runs the simulation
+
+        Returns
+        -------
+        Dict[str, float]
+            summary of the performance of the controller
+        """
+        if self.track_memory:
+            tracemalloc.start()
+        st = time.perf_counter()
+        self.controller.initialize_controller(self.initial_difficulty, self.nao_helping, self.nao_offering_reward)
+        nao_offering_reward = self.nao_offering_reward
+        last_answers = None
+        for puzzle_counter in range(self.n_puzzles):
+            difficulty = self.controller.get_puzzle_difficulty_status()
+            n_moves = self.set_new_puzzle()
+            self.participant.play_puzzle(difficulty, n_moves, self.nao_helping, nao_offering_reward)
+            proportion_played = 1
+            for move in self.controller.when_are_time_steps_in_puzzle[:-1]:     # 1. time steps in middle of puzzle
+                proportion_played = (move + 1) / n_moves
+                u = self.participant.get_rld_until(proportion_played)
+                if self.controller.ask_questions(puzzle_counter, mid_puzzle=True):
+                    last_answers = self.participant.get_answers()
+                step_st = time.perf_counter()
+                self.controller.update_model_middle_of_question(u, last_answers, puzzle_counter, write=False)
+                self.update_latencies.append(time.perf_counter() - step_st)
+                if self.participant.update_model(u):
+                    break
+            if not self.participant.skipped_puzzle and not self.participant.quit:    # 2. end of puzzle
+                proportion_played = 1
+            u = self.participant.get_rld_until(proportion_played)
+            step_st = time.perf_counter()
+            action = self.controller.update_end_of_puzzle_and_get_action(u, puzzle_counter, write=False)
+            self.decision_latencies.append(time.perf_counter() - step_st)
+            nao_offering_reward = self.controller.get_give_reward_status()
+            u.nao_offering_rewards, u.reward_given = action.give_reward, action.give_reward
+            self.participant.update_model(u)
+            self.decisions.append([puzzle_counter, difficulty, n_moves, u.skipped_puzzle, self.participant.quit,
+                                   action.puzzle_difficulty_level, action.give_reward, action.cost,
+                                   self.decision_latencies[-1]])
+            if self.participant.quit:
+                break
+        self.total_time = time.perf_counter() - st
+        if self.track_memory:
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return self.get_summary()
+
+    def set_new_puzzle(self):
+        """ selects the number of moves of the next puzzle, while making sure it has a suitable length for the
+        controller
+
+        Returns
+        -------
+        int
+        """
+        success = False
+        while not success:
+            n_moves = int(self.rng.choice(self.n_moves_options))
+            success = self.controller.reset_beginning_of_puzzle(n_moves)
+        return n_moves
+
+    def get_summary(self):
+        """ returns the summary of the performance of the controller in the simulation
+
+        Returns
+        -------
+        Dict[str, float]
+        """
+        latencies = np.array(self.decision_latencies) * 1000
+        n_steps = len(self.decision_latencies) + len(self.update_latencies)
+        time_in_controller = sum(self.decision_latencies) + sum(self.update_latencies)
+        return {'n puzzles': len(self.decisions),
+                'participant quit': self.participant.quit,
+                'decision latency mean [ms]': float(np.mean(latencies)) if len(latencies) > 0 else None,
+                'decision latency p50 [ms]': float(np.percentile(latencies, 50)) if len(latencies) > 0 else None,
+                'decision latency p95 [ms]': float(np.percentile(latencies, 95)) if len(latencies) > 0 else None,
+                'decision latency max [ms]': float(np.max(latencies)) if len(latencies) > 0 else None,
+                'update latency mean [ms]': float(np.mean(self.update_latencies) * 1000)
+                if len(self.update_latencies) > 0 else None,
+                'time steps per second': n_steps / time_in_controller if time_in_controller > 0 else None,
+                'puzzles per second': len(self.decisions) / self.total_time if self.total_time else None,
+                'peak memory [MB]': self.peak_memory / 1e6 if self.peak_memory is not None else None,
+                'total time [s]': self.total_time}
+
+    def get_report(self):
+        """ returns the summary of the performance of the controller as text
+
+        Returns
+        -------
+        str
+        """
+        return '\n'.join('{}:\t{}'.format(key, round(value, 4) if isinstance(value, float) else value)
+                         for key, value in self.get_summary().items())
+
+    def save(self, file_name):
+        """ saves the decisions of the controller and the summary of the simulation in an excel file in the output
+        folder experimentNao/out/closed_loop_simulations
+
+        Parameters
+        ----------
+        file_name : str
+        """
+        writer = excel_files.create_excel_file(str(get_simulations_folder() / file_name))
+        df_decisions = pd.DataFrame(self.decisions, columns=['Puzzle', 'Difficulty', 'N moves', 'Skipped', 'Quit',
+                                                             'Next difficulty', 'Give reward', 'Cost', 'Latency [s]'])
+        excel_files.save_df_to_excel_sheet(writer, df_decisions, 'Decisions', index=False)
+        df_summary = pd.DataFrame(self.get_summary().values(), index=list(self.get_summary().keys()))
+        excel_files.save_df_to_excel_sheet(writer, df_summary, 'Summary')
+        writer.close()
+
+
+def get_simulations_folder():
+    """ returns the folder where the results of the closed loop simulations are saved
+
+    Returns
+    -------
+    pathlib.Path
+    """
+    return folder_path.output_folder_path / 'closed_loop_simulations'
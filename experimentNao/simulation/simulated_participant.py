@@ -0,0 +1,136 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from experimentNao.behaviour_controllers.mbc.model_propagator import update_a_model_once
+from experimentNao.declare_model import chess_interaction_data as cid, model_artifact
+
+
+class SimulatedParticipant:
+    def __init__(self, tom_model, rld_per_diff, seed=None, rld_noise=0.2, answers_noise=0.5):
+        """ Synthetic participant used to run the controllers in closed loop without the robot, the chess GUI and a
+        real participant. The performance in each puzzle (hints, wrong attempts, time to solve) is sampled around the
+        average performance of the participant for that difficulty, and the mental states, intentions (skip, quit) and
+        answers to the questions are given by an identified ToM model of the participant.
+
+        Parameters
+        ----------
+        tom_model : experimentNao.declare_model.declare_entire_model.ToMModelChessSimpleDyn
+            identified model of the participant, which plays the role of the participant
+        rld_per_diff : pandas.core.frame.DataFrame
+            average real life data for each difficulty (sheet 'RLD metrics per diff' of the metrics file)
+        seed : int
+        rld_noise : float
+            standard deviation of the (log-normal) noise of the time to solve a puzzle
+        answers_noise : float
+            standard deviation of the noise of the answers to the questions (in the 0-10 scale of the questions)
+        """
+        self.tom_model = tom_model
+        self.rld_per_diff = rld_per_diff
+        self.rng = np.random.default_rng(seed)
+        self.rld_noise = rld_noise
+        self.answers_noise = answers_noise
+        self.puzzle_rld = None
+        self.skipped_puzzle = False
+        self.quit = False
+
+    def play_puzzle(self, puzzle_difficulty, n_moves, nao_helping, nao_offering_reward):
+        """ samples the real life data of the participant for the entire puzzle that is about to be played
+
+        Parameters
+        ----------
+        puzzle_difficulty : int
+        n_moves : int
+        nao_helping : bool
+        nao_offering_reward : bool
+
+        Returns
+        -------
+        experimentNao.declare_model.chess_interaction_data.ChessInteractionData
+        """
+        average_rld = self.rld_per_diff.iloc[puzzle_difficulty]
+        n_hints = int(self.rng.poisson(max(average_rld.get('n_hints', 0), 0))) if nao_helping else 0
+        n_wrong_attempts = int(self.rng.poisson(max(average_rld.get('n_wrong_attempts', 0), 0)))
+        time_2_solve = float(average_rld.get('time_2_solve', 0) * self.rng.lognormal(0, self.rld_noise))
+        self.puzzle_rld = cid.ChessInteractionData()
+        self.puzzle_rld.fill_data(number_of_hints=n_hints, number_of_wrong_attempts=[n_wrong_attempts],
+                                  puzzle_difficulty=puzzle_difficulty,
+                                  prop_moves_revealed=min(n_hints / max(n_moves, 1), 1), time_2_solve=time_2_solve,
+                                  nao_helping=nao_helping, nao_offering_reward=nao_offering_reward,
+                                  reward_given=nao_offering_reward, skipped=False)
+        self.skipped_puzzle = False
+        return self.puzzle_rld
+
+    def get_rld_until(self, proportion_of_puzzle):
+        """ returns the real life data of the puzzle that is being played, from the beginning of the puzzle until the
+        "proportion_of_puzzle" that was already played
+
+        Parameters
+        ----------
+        proportion_of_puzzle : float
+
+        Returns
+        -------
+        experimentNao.declare_model.chess_interaction_data.ChessInteractionData
+        """
+        rld = copy.deepcopy(self.puzzle_rld)
+        rld.n_hints = int(round(rld.n_hints * proportion_of_puzzle))
+        rld.n_wrong_attempts = [int(round(sum(rld.n_wrong_attempts) * proportion_of_puzzle))]
+        rld.proportion_of_moves_revealed = rld.proportion_of_moves_revealed * proportion_of_puzzle
+        rld.time_2_solve = rld.time_2_solve * proportion_of_puzzle
+        rld.skipped_puzzle = self.skipped_puzzle
+        return rld
+
+    def update_model(self, u):
+        """ updates the model of the participant with the real life data "u", and checks if the participant decided to
+        skip the puzzle or quit the game
+
+        Parameters
+        ----------
+        u : experimentNao.declare_model.chess_interaction_data.ChessInteractionData
+
+        Returns
+        -------
+        bool
+            whether the participant skips the puzzle or quits the game
+        """
+        update_a_model_once(self.tom_model, u, compute_optimal_action=True)
+        for action in self.tom_model.decision_making_module.action_selector.outputs:
+            if action.active and action.name == 'skip puzzle':
+                self.skipped_puzzle = True
+            elif action.active and action.name == 'quit game':
+                self.quit = True
+        return self.skipped_puzzle or self.quit
+
+    def get_answers(self):
+        """ returns the answers of the participant to the questions about the mental states, in the same format as the
+        answers collected during the interaction
+
+        Returns
+        -------
+        List[pandas.core.frame.DataFrame]
+        """
+        names, answers = [], []
+        for var in self.tom_model.cognitive_module.state_vars:
+            answer = (var.value + 1) / 2 * 10 + self.rng.normal(0, self.answers_noise)
+            names.append(var.name)
+            answers.append(int(min(max(round(answer), 0), 10)))
+        return [pd.DataFrame({'Var Name': names, 'Value': answers})]
+
+
+def get_simulated_participant(id_config, seed=None):
+    """ returns a simulated participant whose mental states are given by the model identified with "id_config"
+
+    Parameters
+    ----------
+    id_config : experimentNao.model_ID.configs.overall_config.IDConfig
+    seed : int
+
+    Returns
+    -------
+    SimulatedParticipant
+    """
+    artifact = model_artifact.get_model_artifact(id_config)
+    tom_model, _, _ = artifact.declare_model(id_config)
+    return SimulatedParticipant(tom_model, artifact.get_rld_per_diff(), seed)
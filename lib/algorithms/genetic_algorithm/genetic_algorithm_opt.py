@@ -1,6 +1,7 @@
 import random
 import time
 
+from lib import profiling
 from lib.algorithms.genetic_algorithm.Solution import Solution
 from lib.algorithms.genetic_algorithm import operators
 from lib.algorithms.genetic_algorithm.select_parents_for_operatorions import select_parents
@@ -11,9 +12,12 @@ def run_ga(parameters, settings, cost_function):
     evaluate_solutions(solutions, parameters, cost_function, settings)
     for i in range(settings.n_iterations):
         st = time.time()
-        ranked_solutions = rank_solutions(solutions)
-        elite_sols, crossover_sols, mutation_sols = apply_evolution_operations(ranked_solutions.copy(), parameters, settings)
-        solutions = elite_sols + evaluate_solutions(crossover_sols + mutation_sols, parameters, cost_function, settings)
+        with profiling.span('GA generation', 'identification'):
+            ranked_solutions = rank_solutions(solutions)
+            elite_sols, crossover_sols, mutation_sols = apply_evolution_operations(ranked_solutions.copy(), parameters,
+                                                                                   settings)
+            solutions = elite_sols + evaluate_solutions(crossover_sols + mutation_sols, parameters, cost_function,
+                                                        settings)
         output_info(settings, i, ranked_solutions, st)
     return ranked_solutions
 
@@ -57,6 +61,7 @@ def rank_solutions(evaluated_solutions):
     return evaluated_solutions
 
 
+@profiling.profiled('GA evolution operations', 'identification')
 def apply_evolution_operations(ranked_solutions, parameters, settings):
     elite_solutions = ranked_solutions[0:settings.n_elite]
     parent_solutions = select_parents(ranked_solutions, settings.parent_selection_method, settings.n_crossover, settings)
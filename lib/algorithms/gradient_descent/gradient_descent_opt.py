@@ -2,7 +2,7 @@ import math
 import time
 import multiprocess as mp
 
-from lib import excel_files
+from lib import excel_files, profiling
 from lib.algorithms.gradient_descent import settings as sett
 from lib.algorithms.gradient_descent.output_data import output_data_of_iteration
 from lib.algorithms.gradient_descent.parameters2optimise import Parameter2Optimise
@@ -38,9 +38,10 @@ def run_gradient_descent_loop(settings: sett.Settings, cost_function, parameters
         # Update the parameters
         old_parameters = parameters.copy()
         st = time.time()
-        costs4output, step, gradient_values = update_parameters_function(parameters, settings, cost_function, pool)
-        df = output_data_of_iteration(writer, i, old_parameters, step, st, costs4output, cost_function,
-                                      costs_of_iterations, None, settings)
+        with profiling.span('GD iteration', 'identification'):
+            costs4output, step, gradient_values = update_parameters_function(parameters, settings, cost_function, pool)
+            df = output_data_of_iteration(writer, i, old_parameters, step, st, costs4output, cost_function,
+                                          costs_of_iterations, None, settings)
         if prune(settings, costs_of_iterations):
             break
     return costs_of_iterations, df
@@ -98,6 +99,7 @@ def compute_new_value_of_1_parameter(i, parameters, cost_function, settings):
     return gradient_value, settings.current_step, new_param_value, cost_value4output
 
 
+@profiling.profiled('gradient component', 'identification')
 def gradient_in_one_component(parameters, component_number, cost_function, cost_value4output, settings):
     settings.current_step = settings.step
     gradient_value = 0
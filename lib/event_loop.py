@@ -0,0 +1,201 @@
+import time
+import asyncio
+import threading
+import functools
+
+
+class TkEventLoop:
+    def __init__(self, main_window, tk_interval=0.02):
+        """ asyncio event loop that runs in the main thread together with the events of a Tk window. Instead of calling
+        update() until a flag changes, the program waits for the flag with wait_until: the loop processes the Tk events
+        (every "tk_interval" seconds), the timers (call_later) and the notifications of other threads (notify), and
+        sleeps in between, so that an idle interaction does not use the CPU.
+
+        Parameters
+        ----------
+        main_window : lib.graphic_interface.MainWindow
+        tk_interval : float
+            time (in seconds) between two updates of the window
+        """
+        self.main_window = main_window
+        self.tk_interval = tk_interval
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.current_thread()    # the loop (and the window) can only run in this thread
+        self.wake_up = None     # future that ends the sleep of the loop (before the next update)
+        self.n_wake_ups = 0
+
+    def wait_until(self, condition, timeout=None):
+        """ runs the loop until "condition" is true (or until "timeout" seconds passed)
+
+        Parameters
+        ----------
+        condition : function
+            function without arguments that returns a bool
+        timeout : Union[None, float]
+
+        Returns
+        -------
+        bool
+            whether the condition became true
+        """
+        if condition():
+            return True
+        if self.loop.is_running():      # called by a callback of the loop (e.g., a Tk button) --> cannot be nested
+            return self.wait_until_in_callback(condition, timeout)
+        return self.loop.run_until_complete(self.wait(condition, timeout))
+
+    async def wait(self, condition, timeout):
+        """ coroutine of wait_until: updates the window, and sleeps until the next update or notification, until
+        "condition" is true
+
+        Parameters
+        ----------
+        condition : function
+        timeout : Union[None, float]
+
+        Returns
+        -------
+        bool
+        """
+        deadline = None if timeout is None else self.loop.time() + timeout
+        while True:
+            self.main_window.update()
+            if condition():
+                return True
+            if deadline is not None and self.loop.time() >= deadline:
+                return False
+            self.wake_up = self.loop.create_future()
+            next_update = self.loop.call_later(self.tk_interval, self.set_wake_up, False)
+            if await self.wake_up:
+                self.n_wake_ups += 1
+            next_update.cancel()
+
+    def wait_until_in_callback(self, condition, timeout):
+        """ waits until "condition" is true from inside a callback of the loop (where the loop cannot be run again), by
+        updating the window every self.tk_interval seconds. The timers of the loop only run after the callback.
+
+        Parameters
+        ----------
+        condition : function
+        timeout : Union[None, float]
+
+        Returns
+        -------
+        bool
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not condition():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self.main_window.update()
+            time.sleep(self.tk_interval)
+        return True
+
+    def wait_for_future(self, future, timeout=None):
+        """ runs the loop until "future" (e.g., of a request to Nao or to the chess engine) is done, and returns its
+        result, so that the window and the timers keep running while the future is waited for. In other threads, it
+        just waits for the future
+
+        Parameters
+        ----------
+        future : concurrent.futures.Future
+        timeout : Union[None, float]
+
+        Returns
+        -------
+        Any
+        """
+        if threading.current_thread() is not self.thread:
+            return future.result(timeout)
+        future.add_done_callback(lambda _: self.notify())
+        self.wait_until(future.done, timeout)
+        return future.result(timeout=0)
+
+    def notify(self):
+        """ wakes up the loop, so that the conditions waited for are checked (it can be called from any thread)
+
+        """
+        try:
+            self.loop.call_soon_threadsafe(self.set_wake_up, True)
+        except RuntimeError:    # the loop was closed
+            pass
+
+    def set_wake_up(self, notified):
+        """ ends the sleep of the loop (in the loop)
+
+        Parameters
+        ----------
+        notified : bool
+            whether it was woken up by a notification (or by the time of the next update)
+        """
+        if self.wake_up is not None and not self.wake_up.done():
+            self.wake_up.set_result(notified)
+
+    def get_notifying_callback(self, callback):
+        """ returns "callback" followed by a notification of the loop, to be run by other threads (e.g., the callback of
+        the speech recognition that sets the flags of the requests)
+
+        Parameters
+        ----------
+        callback : function
+
+        Returns
+        -------
+        function
+        """
+        @functools.wraps(callback)
+        def notifying_callback(*args, **kwargs):
+            try:
+                return callback(*args, **kwargs)
+            finally:
+                self.notify()
+        return notifying_callback
+
+    def call_later(self, delay, callback):
+        """ schedules "callback" to be run by the loop after "delay" seconds (it runs while something is waited for)
+
+        Parameters
+        ----------
+        delay : float
+        callback : function
+
+        Returns
+        -------
+        asyncio.TimerHandle
+            handle that can be cancelled
+        """
+        return self.loop.call_later(delay, self.get_notifying_callback(callback))
+
+    def close(self):
+        """ closes the loop
+
+        """
+        self.loop.close()
+
+
+class FutureWaiter:
+    wait_function = None    # function to wait for the futures: default is 'result()'
+
+    def set_function_that_waits_for_futures(self, function_):
+        """ sets the function that waits for the futures of the object (e.g., TkEventLoop.wait_for_future, so that the
+        window keeps running while the requests to Nao, the searches of the engine, etc. are waited for)
+
+        Parameters
+        ----------
+        function_ : function
+            function that receives a concurrent.futures.Future and returns its result
+        """
+        self.wait_function = function_
+
+    def wait_for(self, future):
+        """ returns the result of "future", waiting for it with self.wait_function (if it was set)
+
+        Parameters
+        ----------
+        future : concurrent.futures.Future
+
+        Returns
+        -------
+        Any
+        """
+        return self.wait_function(future) if self.wait_function is not None else future.result()
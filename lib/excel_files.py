@@ -1,9 +1,17 @@
 import os
+import collections
+import threading
 from stat import S_IREAD
 
 import numpy as np
+import openpyxl
 import pandas as pd
 
+from lib import profiling
+
+MAX_CACHE_BYTES = 256 * 2 ** 20             # memory used by the parsed sheets cached in each process
+STREAMING_MIN_FILE_SIZE = 20 * 2 ** 20      # files larger than this are read with the read-only streaming parser
+
 
 def create_excel_file(file_name: str):
     if '.xlsx' not in file_name:
@@ -17,17 +25,16 @@ def close_excel_file(writer):
     os.chmod(writer, S_IREAD)
 
 
+@profiling.profiled('excel open file', 'excel')
 def get_excel_file(path):
-    return pd.ExcelFile(path)
+    input_file = pd.ExcelFile(path)
+    input_file.path = path      # to find its sheets in the sheets cache
+    return input_file
 
 
 def get_data_from_excel(path):
-    input_file = get_excel_file(path)
-    list_of_sheets = []
-    for sheet_name in input_file.sheet_names:
-        df = input_file.parse(sheet_name)
-        list_of_sheets.append(df)
-    return list_of_sheets
+    with LazyWorkbook(path) as workbook:
+        return workbook.get_sheets(workbook.get_sheet_names())
 
 
 def get_sheets_from_excel(path, sheet_names, input_file=None, header=0):
@@ -35,11 +42,36 @@ def get_sheets_from_excel(path, sheet_names, input_file=None, header=0):
         input_file = get_excel_file(path)
     list_of_sheets = []
     for sheet_name in sheet_names:
-        df = input_file.parse(sheet_name, header=header)
+        df = parse_sheet(input_file, sheet_name, header=header)
         list_of_sheets.append(df)
     return list_of_sheets
 
 
+@profiling.profiled('excel parse sheet', 'excel')
+def parse_sheet(input_file, sheet_name, header=0):
+    """ parses one sheet of an excel file opened with get_excel_file, using the sheets cache when the file is in disk
+
+    Parameters
+    ----------
+    input_file : pandas.io.excel._base.ExcelFile
+    sheet_name : str
+    header : int
+
+    Returns
+    -------
+    pandas.core.frame.DataFrame
+    """
+    if not isinstance(getattr(input_file, 'path', None), (str, os.PathLike)):
+        return input_file.parse(sheet_name, header=header)
+    key = (get_file_version(input_file.path), sheet_name, header, 0, None)
+    df = sheets_cache.get(key)
+    if df is None:
+        df = input_file.parse(sheet_name, header=header)
+        sheets_cache.put(key, df)
+    return df.copy()
+
+
+@profiling.profiled('excel save sheet', 'excel')
 def save_df_to_excel_sheet(writer, data_frame, sheet_name, index=True):
     data_frame.to_excel(writer, sheet_name=sheet_name, engine='xlsxwriter', index=index)
     writer.save()
@@ -62,4 +94,278 @@ def add_data_to_existing_excel_sheet(writer, values_to_add: list, data_columns_n
 def add_empty_line_to_df(df):
     empty_data = [None] * df.shape[1]
     df = pd.concat([df, pd.DataFrame([empty_data], columns=df.columns)])
-    return df
\ No newline at end of file
+    return df
+
+
+class SheetsCache:
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        """ cache of the parsed sheets of the excel files (of one process). When the sheets cached use more memory than
+        "max_bytes", the least recently used are evicted.
+
+        Parameters
+        ----------
+        max_bytes : int
+        """
+        self.max_bytes = max_bytes
+        self.sheets = collections.OrderedDict()
+        self.n_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """ returns the sheet cached with "key", or None if it is not cached
+
+        Parameters
+        ----------
+        key : Tuple
+
+        Returns
+        -------
+        Union[None, pandas.core.frame.DataFrame]
+        """
+        with self.lock:
+            if key not in self.sheets:
+                return None
+            self.sheets.move_to_end(key)
+            return self.sheets[key][0]
+
+    def put(self, key, df):
+        """ caches the sheet "df" with "key"
+
+        Parameters
+        ----------
+        key : Tuple
+        df : pandas.core.frame.DataFrame
+        """
+        n_bytes = int(df.memory_usage(deep=True).sum())
+        with self.lock:
+            if n_bytes > self.max_bytes or key in self.sheets:
+                return
+            self.sheets[key] = (df, n_bytes)
+            self.n_bytes += n_bytes
+            while self.n_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self.sheets.popitem(last=False)
+                self.n_bytes -= evicted_bytes
+
+    def clear(self):
+        """ removes all the sheets of the cache
+
+        """
+        with self.lock:
+            self.sheets.clear()
+            self.n_bytes = 0
+
+
+sheets_cache = SheetsCache()
+
+
+class LazyWorkbook:
+    def __init__(self, path, streaming=None):
+        """ excel file from which only the sheets (and the rows of the sheets) requested are read. The sheets read are
+        kept in the sheets cache of the process.
+
+        Parameters
+        ----------
+        path : Union[str, pathlib.Path]
+        streaming : bool
+            whether to use the read-only streaming parser, which reads the rows one by one (instead of pandas). If None,
+            it is used for files larger than STREAMING_MIN_FILE_SIZE
+        """
+        self.path = path
+        self.streaming = streaming if streaming is not None else os.path.getsize(path) > STREAMING_MIN_FILE_SIZE
+        self.sheet_names = None
+        self.file = None        # opened only when a sheet is parsed with pandas
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """ closes the excel file, if it was opened to parse a sheet (the sheets already read stay in the cache)
+
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def get_sheet_names(self):
+        """ returns the names of the sheets of the file (without parsing them)
+
+        Returns
+        -------
+        List[str]
+        """
+        if self.sheet_names is None:
+            workbook = openpyxl.load_workbook(self.path, read_only=True)
+            self.sheet_names = workbook.sheetnames
+            workbook.close()
+        return self.sheet_names
+
+    @profiling.profiled('excel parse sheet', 'excel')
+    def get_sheet(self, sheet_name, first_row=0, n_rows=None):
+        """ returns the rows "first_row" to "first_row" + "n_rows" of the sheet "sheet_name" (the first row of the
+        sheet is its header). The index of the dataframe is the number of each row in the sheet, as if the entire sheet
+        was read and then sliced.
+
+        Parameters
+        ----------
+        sheet_name : str
+        first_row : int
+        n_rows : int
+            if None, until the end of the sheet
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+        """
+        key = (get_file_version(self.path), sheet_name, 0, first_row, n_rows)
+        df = sheets_cache.get(key)
+        if df is None:
+            if self.streaming:
+                df = self.get_sheet_streaming(sheet_name, first_row, n_rows)
+            else:
+                if self.file is None:
+                    self.file = get_excel_file(self.path)
+                df = self.file.parse(sheet_name, skiprows=range(1, first_row + 1), nrows=n_rows)
+            df.index = pd.RangeIndex(first_row, first_row + len(df))
+            sheets_cache.put(key, df)
+        return df.copy()
+
+    def get_sheets(self, sheet_names, first_row=0, n_rows=None):
+        """ returns the same rows of several sheets (see get_sheet)
+
+        Parameters
+        ----------
+        sheet_names : List[str]
+        first_row : int
+        n_rows : int
+
+        Returns
+        -------
+        List[pandas.core.frame.DataFrame]
+        """
+        return [self.get_sheet(sheet_name, first_row, n_rows) for sheet_name in sheet_names]
+
+    def iterate_rows(self, sheet_name, first_row=0, n_rows=None):
+        """ iterates over the rows "first_row" to "first_row" + "n_rows" of the sheet "sheet_name" with the read-only
+        streaming parser, without keeping the sheet in memory
+
+        Parameters
+        ----------
+        sheet_name : str
+        first_row : int
+        n_rows : int
+
+        Returns
+        -------
+        Iterator[Tuple]
+        """
+        workbook = openpyxl.load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            max_row = first_row + n_rows + 1 if n_rows is not None else None
+            yield from workbook[sheet_name].iter_rows(min_row=first_row + 2, max_row=max_row, values_only=True)
+        finally:
+            workbook.close()
+
+    def get_sheet_streaming(self, sheet_name, first_row=0, n_rows=None):
+        """ reads the rows "first_row" to "first_row" + "n_rows" of the sheet "sheet_name" with the read-only streaming
+        parser. The names of the columns follow the same rules of pandas.
+
+        Parameters
+        ----------
+        sheet_name : str
+        first_row : int
+        n_rows : int
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+        """
+        workbook = openpyxl.load_workbook(self.path, read_only=True, data_only=True)
+        header = next(workbook[sheet_name].iter_rows(max_row=1, values_only=True), ())
+        workbook.close()
+        columns = get_column_names(header)
+        return pd.DataFrame([row[:len(columns)] for row in self.iterate_rows(sheet_name, first_row, n_rows)],
+                            columns=columns)
+
+
+def get_column_names(header):
+    """ returns the names that pandas gives to the columns with "header" when it reads an excel file: the empty ones are
+    "Unnamed: <position>", and the repeated ones are renamed "<name>.1", "<name>.2"... skipping the names in the header
+    (the named columns are renamed before the unnamed ones)
+
+    Parameters
+    ----------
+    header : Tuple
+
+    Returns
+    -------
+    List
+    """
+    columns = [name if name is not None else 'Unnamed: {}'.format(i) for i, name in enumerate(header)]
+    unnamed = [i for i, name in enumerate(header) if name is None]
+    counts = collections.defaultdict(int)
+    for i in [i for i in range(len(columns)) if header[i] is not None] + unnamed:
+        repeated_name = name = columns[i]
+        count = counts[name]
+        while count > 0:
+            counts[repeated_name] = count + 1
+            name = '{}.{}'.format(repeated_name, count)
+            count = count + 1 if name in columns else counts[name]
+        columns[i] = name
+        counts[name] = count + 1
+    return columns
+
+
+class ParsedWorkbook:
+    def __init__(self, input_file, header=0):
+        """ excel file whose sheets were all parsed, so that, unlike an open excel file, it can be passed to other
+        processes. It can be read as the files opened with get_excel_file (sheet_names, parse and close).
+
+        Parameters
+        ----------
+        input_file : pandas.io.excel._base.ExcelFile
+        header : int
+        """
+        self.sheet_names = list(input_file.sheet_names)
+        self.header = header
+        self.sheets = {sheet_name: parse_sheet(input_file, sheet_name, header=header)
+                       for sheet_name in self.sheet_names}
+
+    def parse(self, sheet_name, header=0):
+        """ returns a copy of the sheet "sheet_name"
+
+        Parameters
+        ----------
+        sheet_name : str
+        header : int
+            must be the header used to parse the file
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+        """
+        assert header == self.header
+        return self.sheets[sheet_name].copy()
+
+    def close(self):
+        """ nothing to close, the file was closed once parsed
+
+        """
+        pass
+
+
+def get_file_version(path):
+    """ returns an identifier of the current version of the file in "path", used to find its sheets in the cache
+
+    Parameters
+    ----------
+    path : Union[str, pathlib.Path]
+
+    Returns
+    -------
+    Tuple[str, int, int]
+    """
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
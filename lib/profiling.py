@@ -0,0 +1,302 @@
+import os
+import math
+import json
+import time
+import functools
+import threading
+
+MIN_LOG_DURATION = -7       # the bins of the histograms go from 0.1 us ...
+MAX_LOG_DURATION = 3        # ... to 1000 s
+BINS_PER_DECADE = 20
+N_BINS = (MAX_LOG_DURATION - MIN_LOG_DURATION) * BINS_PER_DECADE
+
+
+class Profiler:
+    def __init__(self):
+        """ records the time spent in named spans of the code (e.g., the update of the perception module, the
+        evaluation of the cost function or a request to Nao). While it is disabled, a span costs one check of a flag.
+        When it is enabled, the durations of each span are aggregated in a histogram (with 20 bins per decade), and the
+        spans are kept in a trace (up to "max_trace_events"), which can be exported to the Chrome trace format (to be
+        opened in chrome://tracing or https://ui.perfetto.dev).
+
+        """
+        self.enabled = False
+        self.keep_trace = True
+        self.max_trace_events = 0
+        self.statistics = {}        # name of the span -> SpanStatistics
+        self.trace_events = []      # (name, category, start time, duration, thread id)
+        self.n_dropped_events = 0
+        self.start_time = time.perf_counter()
+
+    def enable(self, keep_trace=True, max_trace_events=10 ** 6):
+        """ starts recording the spans (from scratch)
+
+        Parameters
+        ----------
+        keep_trace : bool
+            whether each span is kept for the trace (otherwise, only the histograms are kept)
+        max_trace_events : int
+            maximum number of spans kept for the trace, so that the memory used is bounded in long runs
+        """
+        self.reset()
+        self.keep_trace = keep_trace
+        self.max_trace_events = max_trace_events
+        self.enabled = True
+
+    def disable(self):
+        """ stops recording the spans (the ones recorded are kept)
+
+        """
+        self.enabled = False
+
+    def reset(self):
+        """ removes the spans recorded
+
+        """
+        self.statistics = {}
+        self.trace_events = []
+        self.n_dropped_events = 0
+        self.start_time = time.perf_counter()
+
+    def span(self, name, category='other'):
+        """ returns the context manager that records the time spent in its block as the span "name"
+
+        Parameters
+        ----------
+        name : str
+        category : str
+            group of the span (e.g., 'model', 'identification', 'excel', 'nao')
+
+        Returns
+        -------
+        Union[Span, NullSpan]
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category)
+
+    def record(self, name, category, start_time, end_time=None):
+        """ records a span that started at "start_time" and ended at "end_time" (both given by time.perf_counter)
+
+        Parameters
+        ----------
+        name : str
+        category : str
+        start_time : float
+        end_time : float
+            if None, the span ends now
+        """
+        if not self.enabled:
+            return
+        duration = (time.perf_counter() if end_time is None else end_time) - start_time
+        statistics = self.statistics.get(name)
+        if statistics is None:
+            statistics = self.statistics.setdefault(name, SpanStatistics(category))
+        statistics.add(duration)
+        if self.keep_trace:
+            if len(self.trace_events) < self.max_trace_events:
+                self.trace_events.append((name, category, start_time, duration, threading.get_ident()))
+            else:
+                self.n_dropped_events += 1
+
+    def get_summary(self):
+        """ returns the summary of each span, sorted by the total time spent in it
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+        """
+        wall_time = time.perf_counter() - self.start_time
+        summary = [{'span': name, 'category': stats.category, 'n': stats.n, 'total (s)': stats.total,
+                    '% of wall time': 100 * stats.total / wall_time, 'mean (ms)': 1000 * stats.total / stats.n,
+                    'p50 (ms)': 1000 * stats.get_percentile(50), 'p95 (ms)': 1000 * stats.get_percentile(95),
+                    'max (ms)': 1000 * stats.max}
+                   for name, stats in list(self.statistics.items())]
+        return sorted(summary, key=lambda row: -row['total (s)'])
+
+    def get_report(self):
+        """ returns the summary of the spans as a table
+
+        Returns
+        -------
+        str
+        """
+        columns = ('span', 'category', 'n', 'total (s)', '% of wall time', 'mean (ms)', 'p50 (ms)', 'p95 (ms)',
+                   'max (ms)')
+        lines = ['{:<40}{:<16}'.format(*columns[:2]) + ''.join('{:>16}'.format(column) for column in columns[2:])]
+        for row in self.get_summary():
+            lines.append('{:<40}{:<16}{:>16}'.format(row['span'][:39], row['category'][:15], row['n']) +
+                         ''.join('{:>16.3f}'.format(row[column]) for column in columns[3:]))
+        if self.n_dropped_events > 0:
+            lines.append('{} spans were not kept in the trace'.format(self.n_dropped_events))
+        return '\n'.join(lines)
+
+    def get_histograms(self):
+        """ returns the histogram of the durations of each span
+
+        Returns
+        -------
+        Dict[str, Dict[str, List[float]]]
+            for each span, the upper edges of the (non-empty) bins, in ms, and the number of spans in each one
+        """
+        histograms = {}
+        for name, stats in list(self.statistics.items()):
+            bins = [i for i, count in enumerate(stats.counts) if count > 0]
+            histograms[name] = {'upper edges (ms)': [1000 * get_upper_edge_of_bin(i) for i in bins],
+                                'counts': [stats.counts[i] for i in bins]}
+        return histograms
+
+    def export_chrome_trace(self, path):
+        """ writes the spans of the trace in a json file with the Chrome trace event format
+
+        Parameters
+        ----------
+        path : Union[str, pathlib.Path]
+        """
+        pid = os.getpid()
+        events = [{'name': name, 'cat': category, 'ph': 'X', 'ts': (start_time - self.start_time) * 1e6,
+                   'dur': duration * 1e6, 'pid': pid, 'tid': thread_id}
+                  for name, category, start_time, duration, thread_id in list(self.trace_events)]
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+    def save(self, path):
+        """ saves the trace ("path".json), and the summary and histograms of the spans ("path"_summary.json), and
+        prints the summary
+
+        Parameters
+        ----------
+        path : Union[str, pathlib.Path]
+            path of the files, without extension
+        """
+        self.export_chrome_trace(str(path) + '.json')
+        with open(str(path) + '_summary.json', 'w') as file:
+            json.dump({'summary': self.get_summary(), 'histograms': self.get_histograms()}, file, indent=1)
+        print(self.get_report())
+
+
+class SpanStatistics:
+    def __init__(self, category):
+        """ aggregated durations of one span: histogram (with logarithmic bins), number, total and maximum
+
+        Parameters
+        ----------
+        category : str
+        """
+        self.category = category
+        self.counts = [0] * N_BINS
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration):
+        """ adds the duration of one span
+
+        Parameters
+        ----------
+        duration : float
+            in seconds
+        """
+        self.n += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        log_duration = math.log10(duration) if duration > 0 else MIN_LOG_DURATION
+        self.counts[min(max(int((log_duration - MIN_LOG_DURATION) * BINS_PER_DECADE), 0), N_BINS - 1)] += 1
+
+    def get_percentile(self, percentile):
+        """ returns the percentile of the durations, estimated by the upper edge of its bin in the histogram
+
+        Parameters
+        ----------
+        percentile : float
+
+        Returns
+        -------
+        float
+        """
+        target, cumulative_count = percentile / 100 * self.n, 0
+        for i, count in enumerate(self.counts):
+            cumulative_count += count
+            if count > 0 and cumulative_count >= target:
+                return min(get_upper_edge_of_bin(i), self.max)
+        return self.max
+
+
+class Span:
+    __slots__ = ('profiler', 'name', 'category', 'start_time')
+
+    def __init__(self, profiler, name, category):
+        """ context manager that records the time spent in its block (see Profiler.span)
+
+        Parameters
+        ----------
+        profiler : Profiler
+        name : str
+        category : str
+        """
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.start_time = None
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.record(self.name, self.category, self.start_time)
+        return False
+
+
+class NullSpan:
+    """ context manager that does nothing, used while the profiler is disabled """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+def get_upper_edge_of_bin(i):
+    """ returns the upper edge (in seconds) of the bin "i" of the histograms
+
+    Parameters
+    ----------
+    i : int
+
+    Returns
+    -------
+    float
+    """
+    return 10 ** (MIN_LOG_DURATION + (i + 1) / BINS_PER_DECADE)
+
+
+def profiled(name=None, category='other'):
+    """ decorator that records each call of the function as a span of the profiler of the process
+
+    Parameters
+    ----------
+    name : str
+        name of the span. If None, the qualified name of the function
+    category : str
+
+    Returns
+    -------
+    function
+    """
+    def decorator(function):
+        span_name = name if name is not None else function.__qualname__
+
+        @functools.wraps(function)
+        def wrapped(*args, **kwargs):
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+            with Span(profiler, span_name, category):
+                return function(*args, **kwargs)
+        return wrapped
+    return decorator
+
+
+NULL_SPAN = NullSpan()
+profiler = Profiler()   # profiler of the process, used by the instrumented code
+span = profiler.span
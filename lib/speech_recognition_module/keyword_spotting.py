@@ -0,0 +1,473 @@
+import os
+import re
+import time
+import queue
+import threading
+import collections
+
+import numpy as np
+import speech_recognition as sr
+
+SAMPLE_WIDTH = 2    # bytes per sample (int16)
+MAX_TEMPLATES = 3   # per keyword
+MIN_N_CALIBRATION_PHRASES = 5   # transcribed phrases with and without keywords needed to calibrate the distance
+
+
+class RingBuffer:
+    def __init__(self, n_samples):
+        """ circular buffer with the last "n_samples" samples of the microphone. The samples are indexed by their
+        absolute position since the start of the stream.
+
+        Parameters
+        ----------
+        n_samples : int
+        """
+        self.samples = np.zeros(n_samples, dtype=np.int16)
+        self.end = 0    # absolute index after the last sample written
+
+    def write(self, samples):
+        if len(samples) > len(self.samples):
+            self.end += len(samples) - len(self.samples)
+            samples = samples[-len(self.samples):]
+        self.samples[np.arange(self.end, self.end + len(samples)) % len(self.samples)] = samples
+        self.end += len(samples)
+
+    def read(self, start, end):
+        """ returns the samples between the absolute indexes "start" and "end" (the ones that are still in the buffer)
+
+        Parameters
+        ----------
+        start : int
+        end : int
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        start = max(start, end - len(self.samples), 0)
+        return self.samples[np.arange(start, end) % len(self.samples)]
+
+
+class KeywordTemplates:
+    def __init__(self, path=None):
+        """ features of the phrases where each keyword was found (up to MAX_TEMPLATES per keyword), and the distance
+        to the templates of the transcribed phrases, with whether they had a keyword (to calibrate the maximum distance
+        of a keyword to its templates). They are kept by the speech recognizer, so that they are not lost when the
+        microphone is reset, and, if "path" is given, they are loaded from and saved to a file, so that they are also
+        kept across the sessions of the participant.
+
+        Parameters
+        ----------
+        path : Union[None, str, pathlib.Path]
+        """
+        self.path = path
+        self.templates = collections.defaultdict(list)     # keyword -> features of the phrases where it was found
+        self.distances = collections.deque(maxlen=1000)    # (distance to the templates, keyword found)
+        self.lock = threading.Lock()        # added by the transcription callbacks, read by the scoring thread
+        if self.path is not None and os.path.exists(self.path):
+            with np.load(self.path, allow_pickle=False) as data:
+                for keyword, name in zip(data['keywords'], data['names']):
+                    self.templates[str(keyword)].append(data[name])
+                self.distances.extend(zip(data['distances'].tolist(), data['keywords_found'].tolist()))
+
+    def add(self, keyword, features):
+        """ adds the features of a phrase where "keyword" was found, if the keyword has less than MAX_TEMPLATES
+
+        Parameters
+        ----------
+        keyword : str
+        features : numpy.ndarray
+        """
+        with self.lock:
+            if len(self.templates[keyword]) < MAX_TEMPLATES:
+                self.templates[keyword].append(features)
+
+    def add_distance(self, distance, keyword_found):
+        """ adds the distance to the templates of a transcribed phrase
+
+        Parameters
+        ----------
+        distance : float
+        keyword_found : bool
+        """
+        with self.lock:
+            self.distances.append((distance, keyword_found))
+
+    def get_calibrated_max_distance(self):
+        """ returns the maximum distance of a keyword to its templates: the smallest distance of the phrases without a
+        keyword, so that only the phrases further than all the phrases transcribed without need are ruled out. If this
+        distance does not separate them from the phrases with a keyword (or there are less than
+        MIN_N_CALIBRATION_PHRASES of each), no phrase can be ruled out, and inf is returned.
+
+        Returns
+        -------
+        float
+        """
+        with self.lock:
+            distances = list(self.distances)
+        distances_keywords = [distance for distance, found in distances if found]
+        distances_others = [distance for distance, found in distances if not found]
+        if min(len(distances_keywords), len(distances_others)) < MIN_N_CALIBRATION_PHRASES or \
+                max(distances_keywords) >= min(distances_others):
+            return float('inf')
+        return min(distances_others)
+
+    def get_distances(self, keywords, features):
+        """ returns the distance between the phrase and the closest template of each keyword (None for the keywords
+        without templates)
+
+        Parameters
+        ----------
+        keywords : List[str]
+        features : numpy.ndarray
+
+        Returns
+        -------
+        Dict[str, Union[None, float]]
+        """
+        with self.lock:
+            templates = {keyword: list(self.templates.get(keyword, [])) for keyword in keywords}
+        return {keyword: min((get_dtw_distance(features, template) for template in keyword_templates), default=None)
+                for keyword, keyword_templates in templates.items()}
+
+    def save(self):
+        """ saves the templates to the file of the templates, if there is one
+
+        """
+        if self.path is None:
+            return
+        with self.lock:
+            items = [(keyword, features) for keyword, templates in self.templates.items() for features in templates]
+            distances = list(self.distances)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        names = ['template_{}'.format(i) for i in range(len(items))]
+        np.savez_compressed(self.path, keywords=np.array([keyword for keyword, _ in items], dtype=str),
+                            names=np.array(names, dtype=str),
+                            distances=np.array([distance for distance, _ in distances], dtype=float),
+                            keywords_found=np.array([found for _, found in distances], dtype=bool),
+                            **{name: features for name, (_, features) in zip(names, items)})
+
+
+class KeywordSpotter:
+    def __init__(self, transcription_worker, keywords, callback, device_index=None, sample_rate=16000,
+                 frame_duration=0.03, energy_threshold=300, min_phrase_duration=0.2, max_phrase_duration=2.5,
+                 pause_duration=0.3, pre_roll=0.2, max_template_distance=None, buffer_duration=10.0, templates=None):
+        """ streaming keyword spotting of the requests of the participant. The audio of the microphone is written to a
+        ring buffer (by the non-blocking callback of the stream), and a thread scores it frame by frame: the speech is
+        detected by its energy, and each phrase is a keyword candidate if it is short enough to be a request and if,
+        for each keyword, it is close to one of the templates of the keyword (the phrases where the keyword was found)
+        or the keyword has no templates yet. Only the candidates are transcribed (by the transcription worker), and
+        "callback" is called with the audio of the candidates once they are transcribed, as in
+        speech_recognition.Recognizer.listen_in_background.
+
+        Parameters
+        ----------
+        transcription_worker : lib.speech_recognition_module.transcription_worker.TranscriptionWorker
+        keywords : List[str]
+            words or phrases of the requests
+        callback : Callable
+            called with (None, audio) for each candidate, with audio : speech_recognition.audio.AudioData
+        device_index : int
+        sample_rate : int
+        frame_duration : float
+            duration (in seconds) of the frames of audio
+        energy_threshold : float
+            minimum energy of the speech (as speech_recognition.Recognizer.energy_threshold)
+        min_phrase_duration : float
+        max_phrase_duration : float
+            phrases that are longer than this (in seconds) are not requests
+        pause_duration : float
+            duration of the silence (in seconds) that ends a phrase
+        pre_roll : float
+            audio (in seconds) before the start of the phrase that is also transcribed
+        max_template_distance : float
+            maximum (dynamic time warping) distance between a phrase and a template of a keyword. If None, it is
+            calibrated with the phrases transcribed (see KeywordTemplates.get_calibrated_max_distance)
+        buffer_duration : float
+            duration (in seconds) of the audio in the ring buffer
+        templates : KeywordTemplates
+            templates of the keywords, which are kept after the spotter is stopped. If None, the templates are only
+            kept while the spotter runs
+        """
+        self.transcription_worker = transcription_worker
+        self.keywords = [keyword.lower() for keyword in keywords]
+        self.keyword_patterns = {keyword: re.compile(r'\b{}\b'.format(re.escape(keyword))) for keyword in self.keywords}
+        self.callback = callback
+        self.device_index = device_index
+        self.sample_rate = sample_rate
+        self.frame_length = int(frame_duration * sample_rate)
+        self.energy_threshold = energy_threshold
+        self.min_phrase_length = int(min_phrase_duration * sample_rate)
+        self.max_phrase_length = int(max_phrase_duration * sample_rate)
+        self.n_pause_frames = max(int(pause_duration / frame_duration), 1)
+        self.pre_roll_length = int(pre_roll * sample_rate)
+        self.max_template_distance = max_template_distance
+        self.ring_buffer = RingBuffer(int(buffer_duration * sample_rate))
+        self.frames = queue.Queue(maxsize=int(buffer_duration / frame_duration))   # ends of the frames to score
+        self.templates = templates if templates is not None else KeywordTemplates()
+        self.filter_bank = get_mel_filter_bank(self.frame_length, sample_rate)
+        self.noise_floor = None
+        self.phrase_start, self.n_voiced_frames, self.n_silent_frames = None, 0, 0
+        self.statistics = collections.Counter()     # updated by the callback of the stream and the scoring thread
+        self.statistics_lock = threading.Lock()
+        self.detection_latencies = collections.deque(maxlen=1000)
+        self.audio, self.stream, self.thread = None, None, None
+        self.running = False
+
+    def start(self):
+        """ starts the stream of the microphone and the thread that scores the frames
+
+        """
+        import pyaudio
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.audio = pyaudio.PyAudio()
+        self.stream = self.audio.open(format=pyaudio.paInt16, channels=1, rate=self.sample_rate, input=True,
+                                      input_device_index=self.device_index, frames_per_buffer=self.frame_length,
+                                      stream_callback=self.on_audio)
+        self.stream.start_stream()
+
+    def on_audio(self, in_data, frame_count, time_info, status):
+        """ callback of the stream of the microphone: writes the samples in the ring buffer (without blocking)
+
+        """
+        import pyaudio
+        self.write(np.frombuffer(in_data, dtype=np.int16))
+        return None, pyaudio.paContinue
+
+    def write(self, samples):
+        """ writes samples of the microphone in the ring buffer and queues their frames to be scored
+
+        Parameters
+        ----------
+        samples : numpy.ndarray
+        """
+        first_frame_end = self.ring_buffer.end + self.frame_length
+        self.ring_buffer.write(samples)
+        for frame_end in range(first_frame_end, self.ring_buffer.end + 1, self.frame_length):
+            try:
+                self.frames.put_nowait(frame_end)
+            except queue.Full:      # the scoring is late: the frame is skipped
+                self.count('n frames skipped')
+
+    def run(self):
+        """ scores the frames of the microphone, one by one
+
+        """
+        while self.running:
+            try:
+                frame_end = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self.score_frame(frame_end)
+
+    def score_frame(self, frame_end):
+        """ detects the start and the end of the phrases with the energy of the frame, and processes the phrases
+
+        Parameters
+        ----------
+        frame_end : int
+        """
+        self.count('n frames')
+        frame = self.ring_buffer.read(frame_end - self.frame_length, frame_end).astype(np.float64)
+        energy = np.sqrt(np.mean(frame ** 2))
+        if self.noise_floor is None:
+            self.noise_floor = energy
+        threshold = max(self.energy_threshold, 2 * self.noise_floor)
+        if energy > threshold:
+            self.n_voiced_frames += 1
+            self.n_silent_frames = 0
+            if self.phrase_start is None and self.n_voiced_frames >= 2:
+                self.phrase_start = frame_end - 2 * self.frame_length
+        else:
+            self.n_voiced_frames = 0
+            if self.phrase_start is None:
+                self.noise_floor = 0.95 * self.noise_floor + 0.05 * energy
+            else:
+                self.n_silent_frames += 1
+                if self.n_silent_frames >= self.n_pause_frames:
+                    phrase_end = frame_end - self.n_silent_frames * self.frame_length
+                    self.process_phrase(self.phrase_start, phrase_end)
+                    self.phrase_start, self.n_silent_frames = None, 0
+
+    def process_phrase(self, start, end):
+        """ transcribes the phrase between "start" and "end" if it is a keyword candidate
+
+        Parameters
+        ----------
+        start : int
+        end : int
+        """
+        self.count('n phrases')
+        if not self.min_phrase_length <= end - start <= self.max_phrase_length:
+            return
+        features = get_features(self.ring_buffer.read(start, end), self.frame_length, self.filter_bank)
+        distances = self.templates.get_distances(self.keywords, features)
+        if not self.is_candidate(distances):
+            self.count('n phrases rejected')
+            return
+        self.count('n candidates')
+        samples = self.ring_buffer.read(start - self.pre_roll_length, end)
+        audio = sr.AudioData(samples.tobytes(), self.sample_rate, SAMPLE_WIDTH)
+        detection_time = time.perf_counter()
+        self.transcription_worker.transcribe(audio).add_done_callback(
+            lambda future: self.on_transcription(future, audio, features, distances, detection_time))
+
+    def is_candidate(self, distances):
+        """ checks whether the phrase may have a keyword: each keyword is checked against its own templates, and the
+        keywords without templates cannot be ruled out
+
+        Parameters
+        ----------
+        distances : Dict[str, Union[None, float]]
+            distance between the phrase and the closest template of each keyword (see KeywordTemplates.get_distances)
+
+        Returns
+        -------
+        bool
+        """
+        max_distance = self.max_template_distance if self.max_template_distance is not None \
+            else self.templates.get_calibrated_max_distance()
+        return any(distance is None or distance <= max_distance for distance in distances.values())
+
+    def on_transcription(self, future, audio, features, distances, detection_time):
+        """ adds the phrase to the templates of the keywords found in it, and calls the callback. The distance of the
+        phrase to the templates is kept with whether a keyword was found, to calibrate the maximum distance.
+
+        Parameters
+        ----------
+        future : concurrent.futures.Future
+        audio : speech_recognition.audio.AudioData
+        features : numpy.ndarray
+        distances : Dict[str, Union[None, float]]
+        detection_time : float
+        """
+        if future.cancelled() or future.exception() is not None:
+            return
+        text = future.result()['text'].lower()
+        keywords_found = [keyword for keyword in self.keywords if self.keyword_patterns[keyword].search(text)]
+        for keyword in keywords_found:
+            self.templates.add(keyword, features)
+        # distance to the templates of the keywords found (or of any keyword, if none was found)
+        known_distances = [distances[keyword] for keyword in (keywords_found if len(keywords_found) > 0
+                                                              else self.keywords) if distances[keyword] is not None]
+        if len(known_distances) > 0:
+            self.templates.add_distance(float(min(known_distances)), len(keywords_found) > 0)
+        self.detection_latencies.append(time.perf_counter() - detection_time)
+        self.callback(None, audio)
+
+    def count(self, name):
+        """ adds one to the statistic "name" (from any thread)
+
+        Parameters
+        ----------
+        name : str
+        """
+        with self.statistics_lock:
+            self.statistics[name] += 1
+
+    def stop(self, wait_for_stop=True):
+        """ stops the stream of the microphone and the thread that scores the frames
+
+        Parameters
+        ----------
+        wait_for_stop : bool
+        """
+        self.running = False
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.audio.terminate()
+        if wait_for_stop and self.thread is not None:
+            self.thread.join()
+        self.templates.save()
+
+    def get_statistics(self):
+        """ returns the number of frames, phrases and keyword candidates, the latency (in seconds) between the end of
+        the candidates and their transcription, and the maximum distance to the templates (see
+        KeywordTemplates.get_calibrated_max_distance)
+
+        Returns
+        -------
+        Dict[str, float]
+        """
+        with self.statistics_lock:
+            statistics = dict(self.statistics)
+        if len(self.detection_latencies) > 0:
+            statistics['mean detection latency'] = float(np.mean(self.detection_latencies))
+        statistics['max template distance'] = self.max_template_distance if self.max_template_distance is not None \
+            else self.templates.get_calibrated_max_distance()
+        return statistics
+
+
+def get_mel_filter_bank(frame_length, sample_rate, n_filters=26):
+    """ returns the triangular mel filters of the spectrum of a frame
+
+    Parameters
+    ----------
+    frame_length : int
+    sample_rate : int
+    n_filters : int
+
+    Returns
+    -------
+    numpy.ndarray
+        (n_filters × frequency) matrix
+    """
+    mel_points = np.linspace(0, 2595 * np.log10(1 + sample_rate / 2 / 700), n_filters + 2)
+    bins = np.floor((frame_length + 1) * 700 * (10 ** (mel_points / 2595) - 1) / sample_rate).astype(int)
+    filter_bank = np.zeros((n_filters, frame_length // 2 + 1))
+    for i in range(n_filters):
+        left, center, right = bins[i], bins[i + 1], bins[i + 2]
+        filter_bank[i, left:center] = (np.arange(left, center) - left) / max(center - left, 1)
+        filter_bank[i, center:right] = (right - np.arange(center, right)) / max(right - center, 1)
+    return filter_bank
+
+
+def get_features(samples, frame_length, filter_bank, n_coefficients=13):
+    """ returns the mel cepstral coefficients of each frame of the samples, normalized by their mean (so that they do
+    not depend on the microphone)
+
+    Parameters
+    ----------
+    samples : numpy.ndarray
+    frame_length : int
+    filter_bank : numpy.ndarray
+    n_coefficients : int
+
+    Returns
+    -------
+    numpy.ndarray
+        (frame × coefficient) matrix
+    """
+    n_frames = len(samples) // frame_length
+    frames = samples[:n_frames * frame_length].reshape(n_frames, frame_length) * np.hamming(frame_length)
+    log_energies = np.log(np.abs(np.fft.rfft(frames)) ** 2 @ filter_bank.T + 1e-10)
+    n_filters = filter_bank.shape[0]
+    dct = np.cos(np.pi / n_filters * (np.arange(n_filters) + 0.5)[None, :] * np.arange(n_coefficients)[:, None])
+    coefficients = log_energies @ dct.T
+    return coefficients - coefficients.mean(axis=0)
+
+
+def get_dtw_distance(features_1, features_2):
+    """ returns the dynamic time warping distance between two sequences of features, normalized by their length
+
+    Parameters
+    ----------
+    features_1 : numpy.ndarray
+    features_2 : numpy.ndarray
+
+    Returns
+    -------
+    float
+    """
+    distances = np.linalg.norm(features_1[:, None, :] - features_2[None, :, :], axis=2)
+    cost = np.full((len(features_1) + 1, len(features_2) + 1), np.inf)
+    cost[0, 0] = 0
+    for i in range(1, len(features_1) + 1):
+        # the moves along the row (insertions) depend on the previous cell of the same row
+        row = distances[i - 1] + np.minimum(cost[i - 1, 1:], cost[i - 1, :-1])
+        for j in range(1, len(features_2) + 1):
+            cost[i, j] = min(row[j - 1], distances[i - 1, j - 1] + cost[i, j - 1])
+    return cost[-1, -1] / (len(features_1) + len(features_2))
@@ -1,10 +1,19 @@
+from concurrent import futures
+
 import speech_recognition as sr
+
+from lib.speech_recognition_module import transcription_worker as tw, keyword_spotting as kws
 PROMPT_LIMIT = 3
 
 
 class SpeechRecognizer:
-    def __init__(self):
+    def __init__(self, use_transcription_worker=True, templates_path=None):
         self.recognizer = sr.Recognizer()
+        # Whisper model loaded once, in a worker that transcribes in the background (otherwise, recognize_whisper)
+        self.transcription_worker = tw.TranscriptionWorker() if use_transcription_worker else None
+        self.callback_executor = futures.ThreadPoolExecutor(max_workers=1)     # runs the background callbacks
+        # templates of the keywords, kept when the mic is reset (and across sessions, if "templates_path" is given)
+        self.keyword_templates = kws.KeywordTemplates(templates_path)
         # self.recognizer.dynamic_energy_adjustment_damping = 0.3
         self.mic = sr.Microphone(device_index=1)
         self.stop_listening_command = None      # for listening in background
@@ -38,10 +47,24 @@ class SpeechRecognizer:
         with self.mic as source:
             self.recognizer.adjust_for_ambient_noise(source)
 
-    def listen_in_background(self, callback, calibrate=True, phrase_time_limit=5):
+    def listen_in_background(self, callback, calibrate=True, phrase_time_limit=5, keywords=None):
         if calibrate:
             with self.mic as source:                # we only need to calibrate once, before start listening
                 self.recognizer.adjust_for_ambient_noise(source)
+        if keywords is not None and self.transcription_worker is not None:
+            # only the phrases that may have one of the keywords are transcribed (see keyword_spotting.KeywordSpotter)
+            spotter = kws.KeywordSpotter(self.transcription_worker, keywords,
+                                         lambda recognizer, audio: self.callback_executor.submit(callback, self.recognizer,
+                                                                                                 audio),
+                                         device_index=self.mic.device_index,
+                                         energy_threshold=self.recognizer.energy_threshold,
+                                         max_phrase_duration=phrase_time_limit, templates=self.keyword_templates)
+            spotter.start()
+            self.stop_listening_command = spotter.stop
+            return
+        if self.transcription_worker is not None:
+            # the transcription starts as soon as the phrase is captured, and the callback runs once it is transcribed
+            callback = self.get_callback_after_transcription(callback)
         # start listening in the background (note that we don't have to do this inside a `with` statement)
         self.stop_listening_command = self.recognizer.listen_in_background(self.mic, callback,
                                                                            phrase_time_limit=phrase_time_limit)
@@ -50,6 +73,12 @@ class SpeechRecognizer:
         assert self.stop_listening_command is not None
         self.stop_listening_command()
 
+    def get_callback_after_transcription(self, callback):
+        def start_transcription(recognizer, audio):
+            self.transcription_worker.transcribe(audio).add_done_callback(
+                lambda _: self.callback_executor.submit(callback, recognizer, audio))
+        return start_transcription
+
     def try_to_recognize_sentence(self, audio):
         # set up the response object
         response = {
@@ -65,7 +94,10 @@ class SpeechRecognizer:
 
         # Try to recognize
         try:
-            response["transcription"] = self.recognizer.recognize_whisper(audio, model="tiny", language="english")
+            if self.transcription_worker is not None:
+                response["transcription"] = self.transcription_worker.transcribe(audio).result()['text']
+            else:
+                response["transcription"] = self.recognizer.recognize_whisper(audio, model="tiny", language="english")
         except sr.RequestError:
             # API was unreachable or unresponsive
             response["success"] = False
@@ -0,0 +1,161 @@
+import time
+import queue
+import threading
+import collections
+from concurrent import futures
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+class TranscriptionWorker:
+    def __init__(self, model='tiny', language='english', max_queue_size=8, max_batch_size=4, max_wait_time=5.0,
+                 n_memorized=16):
+        """ thread that transcribes the audios with a Whisper model, which is loaded (and warmed up) once, when the
+        worker starts. The audios wait in a bounded queue; the ones that are queued at the same time are transcribed
+        in one batch, and the ones that waited for more than "max_wait_time" are discarded, so that the latency of the
+        transcriptions stays bounded. The transcriptions of the last audios are memorized, so that an audio is only
+        transcribed once, even if several words are looked for in it.
+
+        Parameters
+        ----------
+        model : str
+            name of the Whisper model
+        language : str
+        max_queue_size : int
+            when the queue is full, the oldest audio is discarded
+        max_batch_size : int
+        max_wait_time : float
+            maximum time (in seconds) that an audio can wait in the queue
+        n_memorized : int
+            number of audios whose transcription is memorized
+        """
+        import torch
+        import whisper
+        self.torch, self.whisper = torch, whisper
+        self.language = whisper.tokenizer.TO_LANGUAGE_CODE.get(language, language)
+        self.max_batch_size = max_batch_size
+        self.max_wait_time = max_wait_time
+        self.n_memorized = n_memorized
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.lock = threading.Lock()
+        self.memorized = collections.OrderedDict()     # id of the audio -> (audio, future with the transcription)
+        self.n_transcribed, self.n_batches, self.n_discarded = 0, 0, 0
+        self.model = whisper.load_model(model)
+        self.options = whisper.DecodingOptions(language=self.language, without_timestamps=True,
+                                               fp16=self.model.device.type != 'cpu')
+        self.decode([np.zeros(SAMPLE_RATE, dtype=np.float32)])      # warm up
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def transcribe(self, audio):
+        """ queues the audio to be transcribed, unless it was already queued
+
+        Parameters
+        ----------
+        audio : speech_recognition.audio.AudioData
+
+        Returns
+        -------
+        concurrent.futures.Future
+            future with the transcription: a dictionary with the text, the time that the audio waited in the queue and
+            the time of the transcription (in seconds)
+        """
+        with self.lock:
+            if id(audio) in self.memorized and self.memorized[id(audio)][0] is audio:
+                return self.memorized[id(audio)][1]
+            future = futures.Future()
+            self.memorized[id(audio)] = (audio, future)
+            if len(self.memorized) > self.n_memorized:
+                self.memorized.popitem(last=False)
+            while True:
+                try:
+                    self.queue.put_nowait((audio, future, time.perf_counter()))
+                    break
+                except queue.Full:
+                    self.discard(self.queue.get_nowait(), 'Transcription queue is full')
+        return future
+
+    def run(self):
+        """ transcribes the audios of the queue, in batches
+
+        """
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.max_batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            start_time = time.perf_counter()
+            on_time = []
+            for item in batch:
+                if start_time - item[2] > self.max_wait_time:
+                    self.discard(item, 'Transcription waited for too long')
+                elif item[1].set_running_or_notify_cancel():
+                    on_time.append(item)
+            if len(on_time) == 0:
+                continue
+            try:
+                texts = self.decode([get_audio_array(audio) for audio, _, _ in on_time])
+            except Exception as err:
+                for _, future, _ in on_time:
+                    future.set_exception(err)
+                continue
+            transcription_time = time.perf_counter() - start_time
+            self.n_transcribed, self.n_batches = self.n_transcribed + len(on_time), self.n_batches + 1
+            for (_, future, queued_time), text in zip(on_time, texts):
+                future.set_result({'text': text, 'queue time': start_time - queued_time,
+                                   'transcription time': transcription_time})
+
+    def decode(self, audio_arrays):
+        """ transcribes the audios (of up to 30 seconds each) in one batch
+
+        Parameters
+        ----------
+        audio_arrays : List[numpy.ndarray]
+
+        Returns
+        -------
+        List[str]
+        """
+        mel = self.torch.stack([self.whisper.log_mel_spectrogram(self.whisper.pad_or_trim(audio_array),
+                                                                 n_mels=self.model.dims.n_mels)
+                                for audio_array in audio_arrays])
+        results = self.whisper.decode(self.model, mel.to(self.model.device), self.options)
+        return [result.text for result in results]
+
+    def discard(self, item, reason):
+        """ discards a queued audio without transcribing it
+
+        Parameters
+        ----------
+        item : Tuple[speech_recognition.audio.AudioData, concurrent.futures.Future, float]
+        reason : str
+        """
+        self.n_discarded += 1
+        if item[1].set_running_or_notify_cancel():
+            item[1].set_exception(TimeoutError(reason))
+
+    def get_statistics(self):
+        """ returns the number of audios transcribed and discarded, and the average size of the batches
+
+        Returns
+        -------
+        Dict[str, float]
+        """
+        return {'n transcribed': self.n_transcribed, 'n discarded': self.n_discarded,
+                'mean batch size': self.n_transcribed / max(self.n_batches, 1)}
+
+
+def get_audio_array(audio):
+    """ converts the audio captured by the microphone into the audio array used by Whisper (16 kHz, float32)
+
+    Parameters
+    ----------
+    audio : speech_recognition.audio.AudioData
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    raw_data = audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)
+    return np.frombuffer(raw_data, np.int16).flatten().astype(np.float32) / 32768.0
@@ -1,6 +1,9 @@
-import skfuzzy as fuzz
 import numpy as np
 
+from lib.tom_model import config
+
+membership_matrices = {}    # (shape of terms, range, mf type, step) -> (universe, membership matrix), shared by variables
+
 
 def create_membership_functions(terms, value_range, mf_type='default'):
     if mf_type == 'default':
@@ -94,7 +97,139 @@ def create_pos_neg_mf(neg_terms, neutral_terms, positive_terms,  value_range):
     return mf_array
 
 
-def attribute_membership_functions(variable, terms, mf_array, mf_type):
+def get_universe_and_membership_matrix(terms, value_range, mf_type, step=None):
+    """ returns the universe of a variable and the membership of each of its terms over the universe. Variables with
+    the same number of terms, range, type of membership functions and step share the same (read-only) arrays
+
+    Parameters
+    ----------
+    terms : list
+        the verbal terms of the variable (lists of verbal terms for 'neg and pos')
+    value_range : Tuple[float, float]
+    mf_type : str
+    step : float
+        step of the universe. If None, config.STEP
+
+    Returns
+    -------
+    Tuple[numpy.ndarray, numpy.ndarray]
+        universe, and membership matrix (n terms x size of the universe)
+    """
+    step = config.STEP if step is None else step
+    key = (get_shape_of_terms(terms), tuple(value_range), mf_type, step)
+    universe_and_matrix = membership_matrices.get(key)
+    if universe_and_matrix is None:
+        universe = np.arange(value_range[0], value_range[1], step)
+        matrix = get_membership_values(universe, create_membership_functions(terms, value_range, mf_type), mf_type)
+        universe.setflags(write=False)
+        matrix.setflags(write=False)
+        universe_and_matrix = membership_matrices.setdefault(key, (universe, matrix))
+    return universe_and_matrix
+
+
+def evaluate_memberships(values, terms, value_range, mf_type, step=None):
+    """ returns the membership of each crisp value of "values" in each term of a variable, interpolated from the cached
+    membership matrix of the variable as the FIS fuzzifies its inputs (values outside the universe are clipped to it)
+
+    Parameters
+    ----------
+    values : Union[float, numpy.ndarray]
+    terms : list
+    value_range : Tuple[float, float]
+    mf_type : str
+    step : float
+        step of the universe. If None, config.STEP
+
+    Returns
+    -------
+    numpy.ndarray
+        n terms x number of values
+    """
+    universe, matrix = get_universe_and_membership_matrix(terms, value_range, mf_type, step)
+    x = np.clip(np.atleast_1d(np.asarray(values, dtype=float)), universe[0], universe[-1])
+    i = np.clip(np.searchsorted(universe, x, side='right') - 1, 0, len(universe) - 2)
+    t = (x - universe[i]) / (universe[i + 1] - universe[i])
+    return matrix[:, i] * (1 - t) + matrix[:, i + 1] * t
+
+
+def get_membership_values(x, mf_array, mf_type):
+    """ evaluates all the membership functions of "mf_array" (see create_membership_functions) at the points "x" at once
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+    mf_array : numpy.ndarray
+    mf_type : str
+
+    Returns
+    -------
+    numpy.ndarray
+        n membership functions x size of "x"
+    """
+    x = x[np.newaxis, :]
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        if mf_type == 'binary':
+            a, b, c, d = (mf_array[:, [i]] for i in range(4))
+            y = np.where(x <= b, get_trimf_values(x, a, b, b), 1.0)
+            y = np.where(x >= c, get_trimf_values(x, c, c, d), y)
+            return np.where((x < a) | (x > d), 0.0, y)
+        elif mf_type == 'sig and bell':
+            is_sigmoid = np.zeros((len(mf_array), 1), dtype=bool)
+            is_sigmoid[[0, -1]] = True
+            sigmoid = 1. / (1. + np.exp(- mf_array[:, [1]] * (x - mf_array[:, [0]])))
+            bell = 1. / (1. + np.abs((x - mf_array[:, [2]]) / mf_array[:, [0]]) ** (2 * mf_array[:, [1]]))
+            return np.where(is_sigmoid, sigmoid, bell)
+        return get_trimf_values(x, mf_array[:, [0]], mf_array[:, [1]], mf_array[:, [2]])
+
+
+def get_trimf_values(x, a, b, c):
+    """ evaluates the triangular membership functions with vertices "a", "b" and "c" (column vectors) at the points "x"
+    (row vector), as skfuzzy.trimf does for each one
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+    a : numpy.ndarray
+    b : numpy.ndarray
+    c : numpy.ndarray
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    y = np.where((a < x) & (x < b), (x - a) / (b - a), 0.0)
+    y = np.where((b < x) & (x < c), (c - x) / (c - b), y)
+    return np.where(x == b, 1.0, y)
+
+
+def get_shape_of_terms(terms):
+    """ returns the number of terms in each group of "terms" (which is all the membership functions depend on)
+
+    Parameters
+    ----------
+    terms : list
+
+    Returns
+    -------
+    Tuple[int]
+    """
+    return tuple(len(term) if isinstance(term, (list, tuple)) else 1 for term in terms)
+
+
+def attribute_membership_functions(variable, terms, membership_matrix):
+    """ adds the terms, with their membership functions, to the fuzzy variable
+
+    Parameters
+    ----------
+    variable : Union[skfuzzy.control.Antecedent, skfuzzy.control.Consequent]
+    terms : list
+    membership_matrix : numpy.ndarray
+        membership of each term over the universe of "variable" (see get_universe_and_membership_matrix)
+
+    Returns
+    -------
+    Union[skfuzzy.control.Antecedent, skfuzzy.control.Consequent]
+    """
     list_of_terms = []
     for term in terms:
         if isinstance(term, list):
@@ -104,20 +239,6 @@ def attribute_membership_functions(variable, terms, mf_array, mf_type):
         else:
             assert (isinstance(term, str))
             list_of_terms.append(term)
-    terms = list_of_terms
-    if mf_type == 'default':
-        for i in range(len(terms)):
-            variable[terms[i]] = fuzz.trimf(variable.universe, mf_array[i])
-    elif mf_type == 'binary':
-        for i in range(len(terms)):
-            variable[terms[i]] = fuzz.trapmf(variable.universe, mf_array[i])
-    elif mf_type == 'sig and bell':
-        for i in range(len(terms)):
-            if i == 0 or i == len(terms) - 1:
-                variable[terms[i]] = fuzz.sigmf(variable.universe, mf_array[i][0], mf_array[i][1])
-            else:
-                variable[terms[i]] = fuzz.gbellmf(variable.universe, mf_array[i][0], mf_array[i][1], mf_array[i][2])
-    else:
-        for i in range(len(terms)):
-            variable[terms[i]] = fuzz.trimf(variable.universe, mf_array[i])
+    for i in range(len(list_of_terms)):
+        variable[list_of_terms[i]] = membership_matrix[i]
     return variable
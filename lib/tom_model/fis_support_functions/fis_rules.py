@@ -1,7 +1,5 @@
 from skfuzzy import control as ctrl
 import lib.tom_model.fis_support_functions.fis_membership_functions as msf
-from lib.tom_model import config
-import numpy as np
 
 
 def add_1_set_rules(variable, terms_cons, influencer, terms_ant, about_same_ent=False, weight=None):
@@ -143,9 +141,9 @@ def declare_1_composed_rule(variable, terms_cons, influencers, terms_ant, about_
 
 
 def declare_antecedent(variable_name, terms, value_range, mf_type):
-    antecedent = ctrl.Antecedent(np.arange(value_range[0], value_range[1], config.STEP), variable_name)
-    membership_functions = msf.create_membership_functions(terms, value_range, mf_type)
-    msf.attribute_membership_functions(antecedent, terms, membership_functions, mf_type)
+    universe, membership_matrix = msf.get_universe_and_membership_matrix(terms, value_range, mf_type)
+    antecedent = ctrl.Antecedent(universe, variable_name)
+    msf.attribute_membership_functions(antecedent, terms, membership_matrix)
     return antecedent
 
 
@@ -156,10 +154,9 @@ def declare_consequent(variable_name, terms, value_range, mf_type):
         dfzz_method = 'mom'
     else:
         dfzz_method = 'centroid'
-    consequent = ctrl.Consequent(np.arange(value_range[0], value_range[1], config.STEP), variable_name,
-                                 defuzzify_method=dfzz_method)
-    membership_functions = msf.create_membership_functions(terms, value_range, mf_type)
-    msf.attribute_membership_functions(consequent, terms, membership_functions, mf_type)
+    universe, membership_matrix = msf.get_universe_and_membership_matrix(terms, value_range, mf_type)
+    consequent = ctrl.Consequent(universe, variable_name, defuzzify_method=dfzz_method)
+    msf.attribute_membership_functions(consequent, terms, membership_matrix)
     return consequent
 
 
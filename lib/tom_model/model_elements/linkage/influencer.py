@@ -1,4 +1,3 @@
-from lib.tom_model.fis_support_functions import fis_rules as rules
 from lib.tom_model.model_elements.variables import cognitive_variables
 from lib.tom_model.model_elements.linkage.scheduled_weight import ScheduledWeight
 from lib.tom_model import config
@@ -14,6 +13,7 @@ class Influencer:
         if config.FRAMEWORK == "FCM":
             setattr(cls, "connection_type", [int, float, ScheduledWeight])
         if config.FRAMEWORK == "FIS":
+            from lib.tom_model.fis_support_functions import fis_rules as rules     # skfuzzy is only needed by FIS
             setattr(cls, "connection_type", [rules.RuleSet])
 
     def __init__(self, inf_var, inf_w, side_linkage=False, side_linkage_variable=None, boundary_values=(-1, 1)):
@@ -1,12 +1,118 @@
+import bisect
+
+import numpy as np
+
+
 class ScheduledWeight:
     def __init__(self, weights=None, changing_points=(0,), boundary_values=(-1, 1)):
+        """ weight of a linkage that depends on the value of the influencer: weights[i] is active while the value is in
+        [changing_points[i-1], changing_points[i]) (the first and the last weights are active below the first changing
+        point, and from the last changing point on)
+
+        Parameters
+        ----------
+        weights : Union[List[float], numpy.ndarray]
+        changing_points : Tuple[float]
+            sorted values of the influencer in which the active weight changes
+        boundary_values : Tuple[float, float]
+        """
         if weights is None:
             weights = [0.0, 0.0]
         assert len(weights) == len(changing_points) + 1
+        assert all(changing_points[i] < changing_points[i + 1] for i in range(len(changing_points) - 1))
         self.weights = weights
         self.changing_points = changing_points
         self.boundary_values = boundary_values
 
+    @property
+    def weights(self):
+        return self._weights
+
+    @weights.setter
+    def weights(self, weights):
+        self._weights = np.array(weights, dtype=float)
+
+    @property
+    def changing_points(self):
+        return self._changing_points
+
+    @changing_points.setter
+    def changing_points(self, changing_points):
+        self._changing_points = np.array(changing_points, dtype=float)
+        self._changing_points_list = self._changing_points.tolist()     # bisect is faster than numpy for 1 value
+
     def get_active_weight(self, value_of_influencer: float):   # return weight whose domain contains value_of_inf...
-        index = next((i for i, limit_value in enumerate(self.changing_points) if value_of_influencer < limit_value), -1)
-        return self.weights[index], index
+        index = self.get_active_index(value_of_influencer)
+        return self._weights[index], index
+
+    def get_weight(self, value_of_influencer: float):
+        """ returns the weight whose domain contains "value_of_influencer"
+
+        Parameters
+        ----------
+        value_of_influencer : float
+
+        Returns
+        -------
+        float
+        """
+        return self._weights[bisect.bisect_right(self._changing_points_list, value_of_influencer)]
+
+    def get_active_index(self, value_of_influencer):
+        """ returns the index of the weight whose domain contains each value of "value_of_influencer"
+
+        Parameters
+        ----------
+        value_of_influencer : Union[float, numpy.ndarray]
+
+        Returns
+        -------
+        Union[int, numpy.ndarray]
+        """
+        if np.ndim(value_of_influencer) == 0:
+            return bisect.bisect_right(self._changing_points_list, value_of_influencer)
+        return np.searchsorted(self._changing_points, value_of_influencer, side='right')
+
+
+def get_active_weights(scheduled_weights, values_of_influencers):
+    """ returns the active weight of each scheduled weight for each value of its influencer, all at once
+
+    Parameters
+    ----------
+    scheduled_weights : List[ScheduledWeight]
+    values_of_influencers : numpy.ndarray
+        values of the influencer of each scheduled weight (n scheduled weights, or n scheduled weights x batch size)
+
+    Returns
+    -------
+    numpy.ndarray
+        same shape as "values_of_influencers"
+    """
+    values = np.asarray(values_of_influencers, dtype=float)
+    batch_size = values.shape[1] if values.ndim > 1 else 1
+    changing_points, weights = get_padded_changing_points_and_weights(scheduled_weights)
+    values_3d = values.reshape(len(scheduled_weights), 1, batch_size)
+    indexes = np.sum(changing_points[:, :, np.newaxis] <= values_3d, axis=1)     # = searchsorted(side='right')
+    return np.take_along_axis(weights, indexes, axis=1).reshape(values.shape)
+
+
+def get_padded_changing_points_and_weights(scheduled_weights):
+    """ returns the changing points and the weights of all the scheduled weights, as matrices. Scheduled weights with
+    less changing points are padded with infinite changing points (which are never reached)
+
+    Parameters
+    ----------
+    scheduled_weights : List[ScheduledWeight]
+
+    Returns
+    -------
+    Tuple[numpy.ndarray, numpy.ndarray]
+        n scheduled weights x max number of changing points, and n scheduled weights x max number of weights
+    """
+    n_points = max((len(sw.changing_points) for sw in scheduled_weights), default=0)
+    changing_points = np.full((len(scheduled_weights), n_points), np.inf)
+    weights = np.zeros((len(scheduled_weights), n_points + 1))
+    for i, sw in enumerate(scheduled_weights):
+        changing_points[i, :len(sw.changing_points)] = sw.changing_points
+        weights[i, :len(sw.weights)] = sw.weights
+    return changing_points, weights
@@ -1,5 +1,7 @@
 from abc import ABCMeta
 
+import numpy as np
+
 from lib.tom_model.model_elements.variables import fst_dynamics_variables as fst_dyn, \
     decision_making_variables as dm_vars
 from lib.tom_model.model_elements.processes import process
@@ -153,6 +155,35 @@ class IntentionSelectorThreshold(IntentionSelector):
         intention.activate()
         self.active_intentions.append(intention)
 
+    def compile_intentions(self, intentions=None):
+        """ returns the intentions compiled into arrays, with the current values of their thresholds (see
+        CompiledIntentions)
+
+        Parameters
+        ----------
+        intentions : Tuple[lib.tom_model.model_elements.variables.dm_variables.IntentionThreshold]
+            intentions to compile. If None, all the intentions of the selector
+
+        Returns
+        -------
+        CompiledIntentions
+        """
+        return CompiledIntentions(self.outputs if intentions is None else intentions)
+
+    def activate_intentions_from_array(self, active):
+        """ activates the intentions of the selector that are active in "active", and deactivates the others
+
+        Parameters
+        ----------
+        active : numpy.ndarray
+            whether each intention (in the order of self.outputs) is active
+        """
+        self.active_intentions = []
+        for intention, is_active in zip(self.outputs, active.tolist()):
+            intention.active = is_active
+            if is_active:
+                self.active_intentions.append(intention)
+
     def check_if_influencers_of_intentions_are_inputs(self):
         """ checks if the 'beliefs' and 'goals' associated to each 'intention' in 'self.outputs' are an input of the
         intention selector. This is important to run if function in usage is 'activate_intentions_by_threshold_fast'
@@ -164,6 +195,79 @@ class IntentionSelectorThreshold(IntentionSelector):
                 assert intention.belief in self.inputs
 
 
+class CompiledIntentions:
+    def __init__(self, intentions):
+        """ intentions with thresholds compiled into arrays: threshold, belief contribution, and index of the goal and
+        belief of each intention. All the intentions, for all the time steps (or members of a batch), are then selected
+        with one boolean array expression, with the same result as IntentionSelectorThreshold.
+        The thresholds are copied when the intentions are compiled: "update_parameters" copies them again after they
+        change.
+
+        Parameters
+        ----------
+        intentions : Tuple[lib.tom_model.model_elements.variables.dm_variables.IntentionThreshold]
+        """
+        self.intentions = tuple(intentions)
+        self.inputs = []        # goals and beliefs of the intentions
+        indexes = {}
+        for intention in self.intentions:
+            for var in (intention.goal, intention.belief):
+                if var is not None and id(var) not in indexes:
+                    indexes[id(var)] = len(self.inputs)
+                    self.inputs.append(var)
+        self.goal_indexes = np.array([indexes[id(intention.goal)] for intention in self.intentions], dtype=int)
+        self.belief_indexes = np.array([indexes[id(intention.belief if intention.belief is not None else
+                                                   intention.goal)] for intention in self.intentions], dtype=int)
+        self.larger_than_threshold = np.array([intention.larger_than_threshold for intention in self.intentions],
+                                              dtype=bool)
+        self.thresholds, self.belief_contributions = None, None
+        self.update_parameters()
+
+    def update_parameters(self):
+        """ copies the current thresholds and belief contributions of the intentions
+
+        """
+        self.thresholds = np.array([intention.threshold for intention in self.intentions], dtype=float)
+        self.belief_contributions = np.array([intention.belief_contribution if intention.belief is not None else 0.
+                                              for intention in self.intentions], dtype=float)
+
+    def get_input_values(self, steps=None):
+        """ returns the values of the goals and beliefs of the intentions (in the order of self.inputs)
+
+        Parameters
+        ----------
+        steps : List[int]
+            time steps of the values (saved in the attribute 'values' of each variable). If None, the current values
+
+        Returns
+        -------
+        numpy.ndarray
+            n inputs, or n inputs x n steps
+        """
+        if steps is None:
+            return np.array([var.value for var in self.inputs], dtype=float)
+        return np.array([np.asarray(var.values, dtype=float)[steps] for var in self.inputs])
+
+    def get_active_intentions(self, input_values):
+        """ returns whether each intention is active for the values of the goals and beliefs "input_values"
+
+        Parameters
+        ----------
+        input_values : numpy.ndarray
+            n inputs, or n inputs x n steps (see get_input_values)
+
+        Returns
+        -------
+        numpy.ndarray
+            boolean, n intentions, or n intentions x n steps
+        """
+        shape = (-1, ) + (1, ) * (input_values.ndim - 1)
+        goals = input_values[self.goal_indexes]
+        thresholds = self.thresholds.reshape(shape) + input_values[self.belief_indexes] * \
+            self.belief_contributions.reshape(shape)
+        return np.where(self.larger_than_threshold.reshape(shape), goals > thresholds, goals < thresholds)
+
+
 def is_value_over_threshold(value, threshold, larger_than_threshold=True):
     if larger_than_threshold:
         if value > threshold:
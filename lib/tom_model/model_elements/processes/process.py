@@ -194,7 +194,7 @@ class DecisionMakingProcess(Process):
         not yet updated. This can be done with "update_value()".
 
         """
-        self.next_output = copy.copy(self.current_output)
+        self.next_output = self.current_output      # the outputs are selected, not modified: no need to copy them
         self.function(self)
 
     def update_value(self):
@@ -204,4 +204,4 @@ class DecisionMakingProcess(Process):
          object
 
          """
-        self.current_output = copy.copy(self.next_output)
+        self.current_output = self.next_output
@@ -1,7 +1,7 @@
 from abc import ABCMeta
 from lib.tom_model.model_elements.linkage import influencer
-from lib.tom_model.fis_support_functions import fis_rules as rules
 from lib.tom_model import config
+from lib.tom_model.fis_support_functions import fis_membership_functions as msf
 
 
 class CognitiveVariable:
@@ -30,8 +30,10 @@ class CognitiveVariable:
         self.object_of_variable = None  # if there are multiple B,G,E about mult entities, the entity this var is about
         self.tag = CognitiveVariable.next_tag
         self.terms = verbal_terms
+        self.mf_type = mf_type
         self.update_rate = update_rate
         if config.FRAMEWORK == 'FIS':
+            from lib.tom_model.fis_support_functions import fis_rules as rules     # skfuzzy is only needed by FIS
             [self.consequent, self.antecedent] = rules.declare_antecedent_and_consequent(self.name, verbal_terms,
                                                                                          range_values, mf_type)
         CognitiveVariable.next_tag += 1
@@ -119,6 +121,23 @@ class CognitiveVariable:
             string2return += '  Value: ' + str_value
         return string2return
 
+    def get_memberships(self, value=None):
+        """ returns the membership of "value" in each verbal term of the variable, as the FIS fuzzifies it (FIS only)
+
+        Parameters
+        ----------
+        value : float
+            if None, the value of the variable
+
+        Returns
+        -------
+        Dict[str, float]
+        """
+        assert config.FRAMEWORK == 'FIS'
+        memberships = msf.evaluate_memberships(self.value if value is None else value, self.terms,
+                                               (self.minimum_value, self.maximum_value), self.mf_type)
+        return dict(zip(self.antecedent.terms.keys(), memberships[:, 0].tolist()))
+
     def show_membership_functions(self):
         self.antecedent.view()
 
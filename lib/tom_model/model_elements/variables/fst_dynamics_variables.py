@@ -4,13 +4,11 @@ from enum import Enum
 
 import deprecation
 import numpy
-from skfuzzy import control as ctrl
 
 import lib.tom_model.model_elements.variables.perception_variables
 from lib.tom_model.model_elements.linkage import influencer
 from lib.tom_model.model_elements.linkage.scheduled_weight import ScheduledWeight
 from lib.tom_model.model_elements.variables import slow_dynamics_variables as slow_dyn, cognitive_variables
-from lib.tom_model.fis_support_functions import fis_rules as rules
 from lib.tom_model import config
 
 
@@ -26,6 +24,7 @@ class FastDynamicsVariable(cognitive_variables.CognitiveVariable):
         for new_inf in initial_influencers:
             self.add_one_influencer(new_inf)
         if config.FRAMEWORK == 'FIS':
+            from lib.tom_model.fis_support_functions import fis_rules as rules     # skfuzzy is only needed by FIS
             self.terms = verbal_terms
             [self.consequent, self.antecedent] = rules.declare_antecedent_and_consequent(self.name, verbal_terms,
                                                                                          range_values, mf_type)
@@ -52,6 +51,7 @@ class FastDynamicsVariable(cognitive_variables.CognitiveVariable):
 
     def compute_variable_value_fis(self):
         assert config.FRAMEWORK == 'FIS'
+        from skfuzzy import control as ctrl
         var_fis = ctrl.ControlSystemSimulation(self.control_system)
         for inf in self.influencers:
             var_fis.input[inf.influencer_variable.name] = inf.influencer_variable.value
@@ -70,7 +70,7 @@ class FastDynamicsVariable(cognitive_variables.CognitiveVariable):
             value += self.incremental_value * self.value
         for inf in self.influencers:
             if isinstance(inf.influencer_linkage, ScheduledWeight):
-                weight, i = inf.influencer_linkage.get_active_weight(inf.influencer_variable.value)
+                weight = inf.influencer_linkage.get_weight(inf.influencer_variable.value)
             else:
                 weight = inf.influencer_linkage
             if not inf.has_side_linkage:
@@ -84,6 +84,7 @@ class FastDynamicsVariable(cognitive_variables.CognitiveVariable):
             self.next_value = min(max(self.next_value, self.minimum_value), self.maximum_value)
 
     def define_fis_control_system(self):
+        from skfuzzy import control as ctrl
         set_of_rules = []
         for ele in self.influencers:
             one_influencer_rules = ele.influencer_linkage.rules
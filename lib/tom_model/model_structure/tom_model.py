@@ -1,3 +1,4 @@
+from lib import profiling
 from lib.tom_model.model_structure import cognitive_module, perception_module, decision_making_module
 
 
@@ -63,11 +64,14 @@ class TomModel:
         only interested in estimating mental states, we can set this variable to False.
         """
         # 1. Input module: Needs 2 time steps to converge
-        self.perception_module.compute_and_update_module_in_1_go()
-        for k in range(self.time_steps4convergence):
-            self.cognitive_module.compute_and_update_module()
+        with profiling.span('perception update', 'model'):
+            self.perception_module.compute_and_update_module_in_1_go()
+        with profiling.span('cognitive update', 'model'):
+            for k in range(self.time_steps4convergence):
+                self.cognitive_module.compute_and_update_module()
         if compute_optimal_action:
-            self.decision_making_module.compute_and_update_module_in_1_go()
+            with profiling.span('decision-making update', 'model'):
+                self.decision_making_module.compute_and_update_module_in_1_go()
 
     def get_all_variables(self, get_raw_data=False):
         """ Returns the variables from the model_structure (i.e., variables from cognitive module and from modules module)
@@ -0,0 +1,41 @@
+import os
+import argparse
+from experimentNao.model_ID import batch_identification as b_id, identification_cache
+from experimentNao.model_ID.configs import model_configs, train_test_config, id_cog_modes
+
+
+if __name__ == '__main__':
+    CLI = argparse.ArgumentParser()
+    CLI.add_argument('--participant', nargs='*', type=str, default=[])
+    CLI.add_argument('--model_config', nargs='*', type=str, default=['SIMPLEST_W_BIAS'])
+    CLI.add_argument('--training_set', nargs='*', type=str, default=['A', 'B'])
+    CLI.add_argument('--id_cog_mode', nargs='*', type=str, default=['SEP_PER_2', 'SEP_PER_3'])
+    CLI.add_argument('--simple_dyn', nargs='*', type=str, default=['YES'])
+    CLI.add_argument('--incremental', nargs='*', type=str, default=['YES'])
+    CLI.add_argument('--n_horizon', nargs='*', type=int, default=[1, 2])
+    CLI.add_argument('--normalise_rld', nargs='*', type=str, default=['NO'])
+    CLI.add_argument('--n_parallel_jobs', nargs='*', type=int, default=[None])
+    # job array (e.g., SLURM): each job runs one shard of the sweep
+    CLI.add_argument('--shard_index', nargs='*', type=int, default=[int(os.environ.get('SLURM_ARRAY_TASK_ID', 0)) -
+                                                                    int(os.environ.get('SLURM_ARRAY_TASK_MIN', 0))])
+    CLI.add_argument('--n_shards', nargs='*', type=int, default=[int(os.environ.get('SLURM_ARRAY_TASK_COUNT', 1))])
+    CLI.add_argument('--results_file', nargs='*', type=str, default=['batch_identification'])
+    CLI.add_argument('--only_consolidate', nargs='*', type=str, default=['NO'])    # after all the jobs of an array
+    CLI.add_argument('--id_cache', nargs='*', type=str, default=['YES'])
+    args = CLI.parse_args()
+    # Sweep
+    sweep = b_id.IdentificationSweep(args.participant,
+                                     [model_configs.ModelConfigs[name] for name in args.model_config],
+                                     [id_cog_modes.IdCogModes[name] for name in args.id_cog_mode],
+                                     [train_test_config.TrainingSets[name] for name in args.training_set],
+                                     simplified_dynamics=[option != 'NO' for option in args.simple_dyn],
+                                     incremental=[option != 'NO' for option in args.incremental],
+                                     n_horizons=args.n_horizon,
+                                     normalise_rld=[option != 'NO' for option in args.normalise_rld])
+    id_configs = sweep.get_id_configs()
+    if args.only_consolidate[0] == 'NO':
+        b_id.run_sweep(id_configs, n_parallel_jobs=args.n_parallel_jobs[0], shard_index=args.shard_index[0],
+                       n_shards=args.n_shards[0],
+                       id_cache=identification_cache.IdentificationCache() if args.id_cache[0] == 'YES' else None)
+    if args.n_shards[0] == 1 or args.only_consolidate[0] == 'YES':
+        b_id.write_consolidated_results(id_configs, args.results_file[0])
@@ -0,0 +1,55 @@
+import sys
+import pathlib
+import argparse
+import tempfile
+
+from benchmarks import model_benchmarks as mb, synthetic_data, timing, import_time, fis_memberships
+from experimentNao.model_ID.configs.model_configs import ModelConfigs
+
+
+if __name__ == '__main__':
+    CLI = argparse.ArgumentParser()
+    CLI.add_argument('--model_config', nargs='*', type=str, default=[config.name for config in ModelConfigs])
+    CLI.add_argument('--simplified_dynamics', nargs='*', type=str, default=['YES', 'NO'])
+    CLI.add_argument('--benchmarks', nargs='*', type=str, default=None)    # e.g., 'cost function' (default: all)
+    CLI.add_argument('--n_repeats', nargs='*', type=int, default=[5])
+    CLI.add_argument('--seed', nargs='*', type=int, default=[0])
+    CLI.add_argument('--output', nargs='*', type=str, default=[None])             # json file with the results
+    CLI.add_argument('--compare_to', nargs='*', type=str, default=[None])         # json file of a previous run
+    CLI.add_argument('--max_regression', nargs='*', type=float, default=[1.2])    # fails if a median gets slower
+    CLI.add_argument('--max_import_time', nargs='*', type=float, default=[import_time.MAX_IMPORT_TIME])  # in ms
+    args = CLI.parse_args()
+    id_configs = [synthetic_data.get_id_config(ModelConfigs[model_config], simplified_dynamics == 'YES')
+                  for simplified_dynamics in args.simplified_dynamics for model_config in args.model_config]
+    with tempfile.TemporaryDirectory() as folder:
+        results = mb.run_benchmarks(id_configs, pathlib.Path(folder), args.n_repeats[0],
+                                    benchmark_names=args.benchmarks, seed=args.seed[0])
+    import_failures, membership_failures = [], []
+    if args.benchmarks is None or 'imports' in args.benchmarks:     # imports of the entry points (in new interpreters)
+        import_results, import_failures = import_time.run_import_benchmarks(args.n_repeats[0], args.max_import_time[0])
+        results.update(import_results)
+    if args.benchmarks is None or 'memberships' in args.benchmarks:     # FIS memberships, checked against skfuzzy
+        membership_results, membership_failures = fis_memberships.run_membership_benchmarks(args.n_repeats[0],
+                                                                                           seed=args.seed[0])
+        results.update(membership_results)
+    # Output
+    output = args.output[0]
+    if output is None:
+        commit = timing.get_environment()['commit']
+        output = timing.get_results_folder() / 'benchmarks_{}.json'.format(commit[:10] if commit else 'no_commit')
+    timing.save_results(output, results, vars(args))
+    print('Results saved in', output)
+    if args.compare_to[0] is not None:
+        ratios, regressions = timing.compare_results(results, timing.load_results(args.compare_to[0])['results'],
+                                                     args.max_regression[0])
+        for name, ratio in ratios.items():
+            print('{:<70} x{:.2f}{}'.format(name, ratio, '  <-- regression' if name in regressions else ''))
+        if len(regressions) > 0:
+            print('{} benchmarks are more than {} times slower'.format(len(regressions), args.max_regression[0]))
+            sys.exit(1)
+    if len(membership_failures) > 0:
+        print('{} types of membership functions differ from skfuzzy'.format(len(membership_failures)))
+    if len(import_failures) > 0:
+        print('{} entry points are over the import budget'.format(len(import_failures)))
+    if len(import_failures) > 0 or len(membership_failures) > 0:
+        sys.exit(1)
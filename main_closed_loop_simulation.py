@@ -0,0 +1,42 @@
+import sys
+import argparse
+from experimentNao import folder_path, participant
+from experimentNao.behaviour_controllers.best_configs_per_participant import get_best_id_config
+from experimentNao.behaviour_controllers.mbc import model_based_controller as mbc, prediction_cache as pc
+from experimentNao.simulation import closed_loop_simulation as cls, simulated_participant as sp
+from lib import profiling
+
+
+if __name__ == '__main__':
+    CLI = argparse.ArgumentParser()
+    CLI.add_argument('--participant', nargs='*', type=str, default=[None])          # model used by the controller
+    CLI.add_argument('--simulated_participant', nargs='*', type=str, default=[None])  # model used as participant
+    CLI.add_argument('--n_puzzles', nargs='*', type=int, default=[200])
+    CLI.add_argument('--seed', nargs='*', type=int, default=[0])
+    CLI.add_argument('--prediction_cache', nargs='*', type=str, default=['NO'])
+    CLI.add_argument('--track_memory', nargs='*', type=str, default=['YES'])
+    CLI.add_argument('--max_p95_latency', nargs='*', type=float, default=[None])      # in ms, fails if exceeded
+    CLI.add_argument('--profile', nargs='*', type=str, default=['NO'])     # saves a trace of the simulation
+    args = CLI.parse_args()
+    if args.profile[0] == 'YES':
+        profiling.profiler.enable()
+    # Controller and simulated participant
+    participant_id = participant.participant_identifier if args.participant[0] is None else args.participant[0]
+    simulated_id = participant_id if args.simulated_participant[0] is None else args.simulated_participant[0]
+    prediction_cache = pc.PredictionCache() if args.prediction_cache[0] == 'YES' else None
+    controller = mbc.ModelBasedController(get_best_id_config(participant_id), verbose=0, for_interaction=False,
+                                          prediction_cache=prediction_cache)
+    simulated_participant = sp.get_simulated_participant(get_best_id_config(simulated_id), seed=args.seed[0])
+    # Closed loop simulation
+    simulation = cls.ClosedLoopSimulation(controller, simulated_participant, n_puzzles=args.n_puzzles[0],
+                                          track_memory=args.track_memory[0] == 'YES', seed=args.seed[0])
+    summary = simulation.run()
+    print(simulation.get_report())
+    simulation.save('simulation_{}_{}_{}'.format(participant_id, simulated_id, args.seed[0]))
+    if args.profile[0] == 'YES':
+        profiling.profiler.disable()
+        profiling.profiler.save(folder_path.output_folder_path / 'profiles' /
+                                'simulation_{}_{}_{}'.format(participant_id, simulated_id, args.seed[0]))
+    if args.max_p95_latency[0] is not None and summary['decision latency p95 [ms]'] > args.max_p95_latency[0]:
+        print('p95 decision latency above {} ms'.format(args.max_p95_latency[0]))
+        sys.exit(1)
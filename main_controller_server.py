@@ -0,0 +1,61 @@
+import time
+import argparse
+import threading
+from experimentNao.behaviour_controllers.best_configs_per_participant import get_best_id_config
+from experimentNao.controller_service import controller_service as cs, controller_server as c_server, \
+    controller_client as cc
+from experimentNao.simulation import closed_loop_simulation as cls, simulated_participant as sp
+
+
+def run_simulated_station(address, station, participant_id, n_puzzles, summaries):
+    """ runs a simulated robot station, whose participant is simulated by the model of "participant_id", against the
+    controller server
+
+    Parameters
+    ----------
+    address : str
+    station : int
+    participant_id : str
+    n_puzzles : int
+    summaries : Dict[int, Dict[str, float]]
+    """
+    client = cc.ControllerClient(address)
+    controller = cc.RemoteController(client, 'station_{}_{}'.format(station, participant_id), participant_id)
+    participant = sp.get_simulated_participant(get_best_id_config(participant_id), seed=station)
+    simulation = cls.ClosedLoopSimulation(controller, participant, n_puzzles=n_puzzles, track_memory=False,
+                                          seed=station)
+    summaries[station] = simulation.run()
+    controller.close()
+    client.close()
+
+
+if __name__ == '__main__':
+    CLI = argparse.ArgumentParser()
+    CLI.add_argument('--port', nargs='*', type=int, default=[18862])
+    CLI.add_argument('--n_workers', nargs='*', type=int, default=[None])
+    CLI.add_argument('--max_sessions_per_worker', nargs='*', type=int, default=[8])
+    CLI.add_argument('--prediction_cache', nargs='*', type=str, default=['NO'])
+    CLI.add_argument('--simulated_stations', nargs='*', type=str, default=[])   # participants of simulated stations
+    CLI.add_argument('--n_puzzles', nargs='*', type=int, default=[50])
+    args = CLI.parse_args()
+    service = cs.ControllerService(n_workers=args.n_workers[0],
+                                   max_sessions_per_worker=args.max_sessions_per_worker[0],
+                                   use_prediction_cache=args.prediction_cache[0] == 'YES')
+    server = c_server.ControllerServer(service, port=args.port[0])
+    server.start()
+    if len(args.simulated_stations) == 0:
+        server.wait_for_termination()
+    else:   # load test with simulated robot stations
+        st = time.time()
+        summaries = {}
+        stations = [threading.Thread(target=run_simulated_station,
+                                     args=('localhost:{}'.format(args.port[0]), i, participant_id,
+                                           args.n_puzzles[0], summaries))
+                    for i, participant_id in enumerate(args.simulated_stations)]
+        for station in stations:
+            station.start()
+        for station in stations:
+            station.join()
+        print('Statistics of the service: ', service.get_statistics())
+        print('Decisions per second: ', sum(summary['n puzzles'] for summary in summaries.values()) / (time.time() - st))
+        server.stop()
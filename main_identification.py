@@ -1,10 +1,11 @@
 import time
 import argparse
-from experimentNao import participant
-from experimentNao.model_ID import identification as id_
+from experimentNao import folder_path, participant
+from experimentNao.model_ID import identification as id_, identification_cache
 from experimentNao.model_ID.configs import model_configs, train_test_config, id_cog_modes, overall_config
 from experimentNao.model_ID.decision_making import identification_dm as id_dm
 from experimentNao.model_ID.data_processing import excel_data_processing
+from lib import profiling
 from lib.init_my_random import init_random
 
 
@@ -18,7 +19,11 @@ if __name__ == '__main__':
     CLI.add_argument('--n_horizon', nargs='*', type=int, default=[1])
     CLI.add_argument('--participant', nargs='*', type=str, default=[None])
     CLI.add_argument('--normalise_rld', nargs='*', type=str, default=['NO'])
+    CLI.add_argument('--id_cache', nargs='*', type=str, default=['YES'])
+    CLI.add_argument('--profile', nargs='*', type=str, default=['NO'])     # saves a trace of the identification
     args = CLI.parse_args()
+    if args.profile[0] == 'YES':
+        profiling.profiler.enable()
     # Parameters and Configs
     my_random = init_random(seed=42)
     participant_id = participant.participant_identifier if args.participant[0] is None else args.participant[0]
@@ -31,13 +36,24 @@ if __name__ == '__main__':
                                                 n_horizon=args.n_horizon[0], cog_2_id=True,
                                                 normalise_rld_mid_steps=False if args.normalise_rld[0] == 'NO' else True,
                                                 online_data_sets_division=True)
-    writer, reader_files, n_puzzles = excel_data_processing.preprocess(overall_id_config)
-    # Identification
-    st = time.time()
-    if overall_id_config.cog_2_id:
-        id_.train_and_validate_cognitive_module(writer, reader_files, n_puzzles, my_random, overall_id_config,
-                                                delft_blue=False, short_mode=False)
+    # Identification (unless the same identification is in the cache)
+    id_cache = identification_cache.IdentificationCache() if args.id_cache[0] == 'YES' else None
+    id_key = identification_cache.get_identification_key(overall_id_config, seed=42) if id_cache is not None else None
+    if id_cache is not None and id_cache.get(id_key) is not None:
+        id_cache.restore(id_key, overall_id_config)
+        print('Identification restored from the cache: ', overall_id_config.get_model_id_file_name())
     else:
-        id_.train_and_valid_dm(writer, reader_files, n_puzzles, overall_id_config, my_random,
-                               train_mode=id_dm.OptMode.GENETIC_ALGORITHM)
-    print('TOTAL TIME: ', time.time() - st)
+        writer, reader_files, n_puzzles = excel_data_processing.preprocess(overall_id_config)
+        st = time.time()
+        if overall_id_config.cog_2_id:
+            id_.train_and_validate_cognitive_module(writer, reader_files, n_puzzles, my_random, overall_id_config,
+                                                    delft_blue=False, short_mode=False)
+        else:
+            id_.train_and_valid_dm(writer, reader_files, n_puzzles, overall_id_config, my_random,
+                                   train_mode=id_dm.OptMode.GENETIC_ALGORITHM)
+        print('TOTAL TIME: ', time.time() - st)
+        if id_cache is not None and overall_id_config.cog_2_id:
+            id_cache.add(id_key, overall_id_config, seed=42)
+    if args.profile[0] == 'YES':
+        profiling.profiler.disable()
+        profiling.profiler.save(folder_path.output_folder_path / 'profiles' / overall_id_config.get_model_id_file_name())
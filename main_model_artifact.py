@@ -0,0 +1,24 @@
+import time
+import argparse
+from experimentNao import participant
+from experimentNao.behaviour_controllers.best_configs_per_participant import get_best_configs_per_participant
+from experimentNao.declare_model import model_artifact as ma
+from experimentNao.model_ID.configs import overall_config as oc
+
+
+if __name__ == '__main__':
+    CLI = argparse.ArgumentParser()
+    CLI.add_argument('--participant', nargs='*', type=str, default=[None])
+    args = CLI.parse_args()
+    # Parameters and Configs
+    participant_id = participant.participant_identifier if args.participant[0] is None else args.participant[0]
+    id_mode, model_config, train_set, n_h = get_best_configs_per_participant(participant_id)
+    id_config = oc.IDConfig(model_config, participant_id, id_mode, train_set,
+                            simplified_dynamics=True, incremental=True, n_horizon=n_h, cog_2_id=True)
+    # Artifact of the identified model
+    artifact = ma.build_model_artifact(id_config)
+    artifact.save(ma.get_model_artifact_path(id_config))
+    print('Model artifact saved in {}'.format(ma.get_model_artifact_path(id_config)))
+    st = time.time()
+    ma.ModelArtifact.load(ma.get_model_artifact_path(id_config)).declare_model(id_config)
+    print('TIME TO LOAD AND DECLARE THE MODEL: ', time.time() - st)
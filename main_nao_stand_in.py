@@ -0,0 +1,59 @@
+import threading
+import argparse
+from experimentNao.interaction.nao_behaviour import nao_stand_in_server as nsis, nao_load_test as nlt, nao_requests, \
+    async_nao_requests
+
+
+def run_load_test_station(address, station, async_client, n_puzzles, results):
+    """ runs the requests of one robot station against the stand-in Nao server
+
+    Parameters
+    ----------
+    address : str
+    station : int
+    async_client : bool
+    n_puzzles : int
+    results : Dict[int, Dict[str, Any]]
+    """
+    nao_client = async_nao_requests.AsyncNaoClient(address) if async_client else nao_requests.NaoClient(address)
+    results[station] = nlt.run_station(nao_client, n_puzzles=n_puzzles, seed=station)
+    if async_client:
+        nao_client.wait_until_idle()
+        results[station]['rpc latencies'] = nao_client.get_latency_statistics()
+        nao_client.close()
+
+
+if __name__ == '__main__':
+    CLI = argparse.ArgumentParser()
+    CLI.add_argument('--port', nargs='*', type=int, default=[18861])
+    CLI.add_argument('--time_scale', nargs='*', type=float, default=[1.0])     # < 1 to simulate faster than real time
+    CLI.add_argument('--latency', nargs='*', type=float, default=[0.005])
+    CLI.add_argument('--failure_rate', nargs='*', type=float, default=[0.0])
+    CLI.add_argument('--verbose', nargs='*', type=str, default=['NO'])
+    CLI.add_argument('--load_test_stations', nargs='*', type=int, default=[0])  # number of simulated stations
+    CLI.add_argument('--async_client', nargs='*', type=str, default=['YES'])
+    CLI.add_argument('--n_puzzles', nargs='*', type=int, default=[10])
+    args = CLI.parse_args()
+    times = nsis.SimulatedTimes(latency=args.latency[0], failure_rate=args.failure_rate[0]).scale(args.time_scale[0])
+    servicer = nsis.NaoStandInServicer(times, verbose=args.verbose[0] == 'YES')
+    address = 'localhost:{}'.format(args.port[0])
+    server = nsis.NaoStandInServer(servicer, address)
+    server.start()
+    if args.load_test_stations[0] == 0:
+        server.wait_for_termination()
+    else:   # load test with simulated robot stations
+        results = {}
+        stations = [threading.Thread(target=run_load_test_station,
+                                     args=(address, i, args.async_client[0] == 'YES', args.n_puzzles[0], results))
+                    for i in range(args.load_test_stations[0])]
+        for station in stations:
+            station.start()
+        for station in stations:
+            station.join()
+        print('Summary of the load test: ', nlt.get_summary(list(results.values())))
+        if args.async_client[0] == 'YES':
+            for station, result in sorted(results.items()):
+                if 'rpc latencies' in result:   # not when the station failed
+                    print('Latencies of the requests of station {} (ms): '.format(station), result['rpc latencies'])
+        print('Statistics of the server: ', servicer.get_statistics())
+        server.stop()
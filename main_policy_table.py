@@ -0,0 +1,31 @@
+import time
+import argparse
+from experimentNao import participant
+from experimentNao.behaviour_controllers.best_configs_per_participant import get_best_configs_per_participant
+from experimentNao.behaviour_controllers.mbc import model_based_controller as mbc, policy_table as pt
+from experimentNao.model_ID.configs import overall_config as oc
+
+
+if __name__ == '__main__':
+    CLI = argparse.ArgumentParser()
+    CLI.add_argument('--participant', nargs='*', type=str, default=[None])
+    CLI.add_argument('--n_state_points', nargs='*', type=int, default=[None])   # None: the most within the budget
+    CLI.add_argument('--n_validation_points', nargs='*', type=int, default=[pt.N_VALIDATION_POINTS])
+    CLI.add_argument('--max_n_evaluations', nargs='*', type=int, default=[pt.MAX_N_EVALUATIONS])  # size of the grid
+    args = CLI.parse_args()
+    # Parameters and Configs
+    participant_id = participant.participant_identifier if args.participant[0] is None else args.participant[0]
+    id_mode, model_config, train_set, n_h = get_best_configs_per_participant(participant_id)
+    id_config = oc.IDConfig(model_config, participant_id, id_mode, train_set,
+                            simplified_dynamics=True, incremental=True, n_horizon=n_h, cog_2_id=True)
+    controller = mbc.ModelBasedController(id_config, verbose=0, for_interaction=False)
+    # Sweep of the predictive model
+    st = time.time()
+    policy_table = pt.build_policy_table(controller, n_state_points=args.n_state_points[0],
+                                         n_validation_points=args.n_validation_points[0],
+                                         max_n_evaluations=args.max_n_evaluations[0])
+    policy_table.save(pt.get_policy_table_path(id_config))
+    print('Policy table of {} nodes saved in {}'.format(policy_table.costs[..., 0].size,
+                                                        pt.get_policy_table_path(id_config)))
+    print('Validation: ', policy_table.validation)
+    print('TOTAL TIME: ', time.time() - st)
@@ -3,6 +3,7 @@ import pandas as pd
 from experimentNao import participant
 from experimentNao.data_analysis.post_id_analysis import files_of_comparison
 from experimentNao.data_analysis.post_id_analysis import paths_and_files
+from experimentNao.model_ID import identification_cache
 from experimentNao.model_ID.configs import overall_config
 from experimentNao.model_ID.configs.train_test_config import TrainingSets
 from lib import excel_files
@@ -26,10 +27,16 @@ class ResultsDf:
             self.test = pd.concat([self.test, new_row_test])
 
 
-def process_one_id(general_path_, id_config_, dfs_all_performances_, dfs_individual_costs_):
+def process_one_id(general_path_, id_config_, dfs_all_performances_, dfs_individual_costs_, id_cache_=None):
     try:
-        df_performance_t, df_performance_v, df_individual_costs_t, df_individual_costs_v, df_params \
-            = paths_and_files.get_dfs_from_file(general_path_, id_config_)
+        file_path = general_path_ + id_config_.get_model_id_file_name() + '.xlsx'
+        cache_entry = id_cache_.find(file_path) if id_cache_ is not None else None
+        if cache_entry is not None:     # same workbook in the cache: no need to parse it
+            df_performance_t, df_performance_v, df_individual_costs_t, df_individual_costs_v, df_params \
+                = identification_cache.get_dfs_from_entry(cache_entry)
+        else:
+            df_performance_t, df_performance_v, df_individual_costs_t, df_individual_costs_v, df_params \
+                = paths_and_files.get_dfs_from_file(general_path_, id_config_)
         # Remove the cost / data points columns
         # n_train_points = round(df_performance_t.loc[0, 'Train Cost']/df_performance_t.loc[0, 'Train cost / steps'])
         # n_test_points = round(df_performance_t.loc[0, 'Test Cost']/df_performance_t.loc[0, 'Test Cost / steps'])
@@ -60,6 +67,7 @@ def process_one_id(general_path_, id_config_, dfs_all_performances_, dfs_individ
 # ***********************************************  Process ******************************************************
 participant_id = participant.participant_identifier
 comparison_round = 4
+use_id_cache = False    # read the results from the index of the identification cache (instead of the workbooks)
 comparisons = ['prelim_official',                 # 0
                'simple_model',                    # 1 <- set best sep_per
                'special_incr', 'extra_simple',    # 2 3 <- set best sep_per
@@ -72,6 +80,7 @@ dfs_all_performances, dfs_individual_costs = ResultsDf(), ResultsDf()
 dfs_all_performances.add_empty_line()
 dfs_all_individuals = pd.DataFrame()
 general_path = paths_and_files.get_folder_path_new(current_folder, participant_id)
+id_cache = identification_cache.IdentificationCache() if use_id_cache else None
 for train_set in [TrainingSets.A, TrainingSets.B]:
     for config in model_configs:
         for id_mode in id_modes:
@@ -83,7 +92,8 @@ for train_set in [TrainingSets.A, TrainingSets.B]:
                                                                 incremental=incr, n_horizon=n_horizon, cog_2_id=True,
                                                                 normalise_rld_mid_steps=normalise_rld_mid_steps)
                             file_name = id_config.get_model_id_file_name()
-                            process_one_id(general_path, id_config, dfs_all_performances, dfs_individual_costs)
+                            process_one_id(general_path, id_config, dfs_all_performances, dfs_individual_costs,
+                                           id_cache)
     dfs_all_performances.add_empty_line()
     dfs_individual_costs.add_empty_line()
     dfs_all_individuals = pd.concat([dfs_all_individuals, dfs_individual_costs.train, dfs_individual_costs.test])